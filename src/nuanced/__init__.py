@@ -1,3 +1,5 @@
 from nuanced.code_graph import CodeGraph as CodeGraph
+from nuanced.federated_code_graph import FederatedCodeGraph as FederatedCodeGraph
+from nuanced.frozen_code_graph import FrozenCodeGraph as FrozenCodeGraph
 
 __version__ = "0.1.9"
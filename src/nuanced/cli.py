@@ -1,10 +1,15 @@
+from contextlib import contextmanager
 import json
 import os
+import sys
 import typer
 from rich import print
 from rich.console import Console
-from nuanced import CodeGraph, __version__
-from nuanced.code_graph import CodeGraphResult, DEFAULT_INIT_TIMEOUT_SECONDS
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+from nuanced import CodeGraph, FederatedCodeGraph, __version__
+from nuanced.code_graph import CodeGraphResult, DEFAULT_INIT_TIMEOUT_SECONDS, DEFAULT_SEARCH_LIMIT
+from nuanced.lib import call_graph, encoders, graph_stats, module_graph, profiling, tracer
+from nuanced.lib.pruning import PruningPolicy
 from typing_extensions import Annotated, Optional
 
 
@@ -34,9 +39,27 @@ def enrich(
     file_path: Annotated[str, typer.Argument(help="Path to file containing function definition.")],
     function_name: Annotated[str, typer.Argument(help="Partial or fully qualified name of function.")],
     include_builtins: Annotated[bool, typer.Option("--include-builtins", help="Include callees defined in Python's builtins module.")] = False,
+    include_source: Annotated[bool, typer.Option("--include-source", help="Include the source code of each function.")] = False,
+    format: Annotated[str, typer.Option("--format", "-f", help="Output format: json, compact (JSON with a shared file table) or msgpack.")] = encoders.DEFAULT_FORMAT,
+    federated: Annotated[bool, typer.Option("--federated", help="Load every graph found under the current directory and follow calls across them.")] = False,
+    max_nodes: Annotated[Optional[int], typer.Option("--max-nodes", help="Keep only the entry point and the most important functions, up to this many nodes.")] = None,
+    sort_by_importance: Annotated[bool, typer.Option("--sort-by-importance", help="Order functions by importance, after the entry point.")] = False,
+    at: Annotated[Optional[str], typer.Option("--at", help="Answer against the graph recorded in .nuanced/history at this git revision.")] = None,
 ) -> None:
     err_console = Console(stderr=True)
-    code_graph_result = _find_code_graph(file_path)
+
+    if format not in encoders.ENCODERS:
+        err_console.print(f"Unsupported format \"{format}\", expected one of: {', '.join(encoders.ENCODERS)}")
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    if at and federated:
+        err_console.print("--at is not supported with --federated")
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    if federated:
+        code_graph_result = FederatedCodeGraph.load(directory=os.getcwd())
+    else:
+        code_graph_result = _find_code_graph(file_path)
 
     if len(code_graph_result.errors) > 0:
         for error in code_graph_result.errors:
@@ -44,11 +67,32 @@ def enrich(
         raise typer.Exit(code=ERROR_EXIT_CODE)
 
     code_graph = code_graph_result.code_graph
-    result = code_graph.enrich(
-        file_path=file_path,
-        function_name=function_name,
-        include_builtins=include_builtins
-    )
+
+    if at:
+        historical_code_graph_result = code_graph.at(at)
+
+        if len(historical_code_graph_result.errors) > 0:
+            for error in historical_code_graph_result.errors:
+                err_console.print(str(error))
+            raise typer.Exit(code=ERROR_EXIT_CODE)
+
+        code_graph = historical_code_graph_result.code_graph
+
+        if code_graph.metadata["commit"] != code_graph.metadata["requested_commit"]:
+            err_console.print(f"No graph recorded at {at}, using the graph recorded at ancestor {code_graph.metadata['commit']}")
+
+    if include_builtins and code_graph.metadata.get("pruning", {}).get("drop_builtins"):
+        err_console.print("Builtin callees were removed from this graph by nuanced init --drop-builtins")
+
+    with code_graph:
+        result = code_graph.enrich(
+            file_path=file_path,
+            function_name=function_name,
+            include_builtins=include_builtins,
+            include_source=include_source,
+            max_nodes=max_nodes,
+            sort_by_importance=sort_by_importance,
+        )
 
     if len(result.errors) > 0:
         for error in result.errors:
@@ -59,25 +103,381 @@ def enrich(
         err_console.print(err_msg)
         raise typer.Exit(code=ERROR_EXIT_CODE)
     else:
-        print(json.dumps(result.result, indent=2))
+        try:
+            output = encoders.encode(result.result, format)
+        except ModuleNotFoundError as error:
+            err_console.print(str(error))
+            raise typer.Exit(code=ERROR_EXIT_CODE)
+
+        if format in encoders.BINARY_FORMATS:
+            typer.echo(output, nl=False)
+        else:
+            typer.echo(output.decode("utf-8"))
 
 
 @app.command(help="Initialize analysis.")
 def init(
    path: Annotated[str, typer.Argument(help="Path to directory containing Python code.")],
-   timeout_seconds: Annotated[Optional[int], typer.Option("--timeout-seconds", "-t", help="Timeout in seconds.")]=DEFAULT_INIT_TIMEOUT_SECONDS
+   timeout_seconds: Annotated[Optional[int], typer.Option("--timeout-seconds", "-t", help="Timeout in seconds, estimated from file sizes and previous timings by default.")]=None,
+   memory_limit_mb: Annotated[Optional[int], typer.Option("--memory-limit-mb", help="Maximum memory of each analysis process in megabytes.")]=None,
+   max_chunk_files: Annotated[Optional[int], typer.Option("--max-chunk-files", help="Analyze packages with more files than this in sub-package chunks.")]=None,
+   drop_builtins: Annotated[bool, typer.Option("--drop-builtins", help="Remove callees defined in Python's builtins module from the graph.")]=False,
+   exclude_tests: Annotated[bool, typer.Option("--exclude-tests", help="Exclude test modules from the graph.")]=False,
+   exclude_generated: Annotated[bool, typer.Option("--exclude-generated", help="Exclude generated modules from the graph.")]=False,
+   collapse_hubs_above: Annotated[Optional[int], typer.Option("--collapse-hubs-above", help="Remove the callees of functions called from more than this many functions.")]=None,
+   shard: Annotated[Optional[str], typer.Option("--shard", help="Analyze only shard i of N (e.g. 2/4) and write it to .nuanced/shards for nuanced merge.")]=None,
+   quarantine_above: Annotated[Optional[float], typer.Option("--quarantine-above", help="If analysis fails, quarantine files slower than this many seconds and retry without them.")]=None,
+   workers: Annotated[Optional[int], typer.Option("--workers", help="Number of analysis processes, estimated from file sizes and previous timings by default.")]=None,
+   plan: Annotated[bool, typer.Option("--plan", help="Print the estimated cost, timeout, worker count and schedule as JSON without analyzing.")]=False,
+   rev: Annotated[Optional[str], typer.Option("--rev", help="Analyze the files of a git revision instead of the working tree, without checking it out.")]=None,
+   precision: Annotated[str, typer.Option("--precision", help="Analysis precision: coarse (smaller graph without edges to modules and external functions, not faster), default or precise (follows imports into dependencies, slower).")]=call_graph.DEFAULT_PRECISION,
+) -> None:
+    err_console = Console(stderr=True)
+    abspath = os.path.abspath(path)
+    pruning_policy = PruningPolicy(
+        drop_builtins=drop_builtins,
+        exclude_tests=exclude_tests,
+        exclude_generated=exclude_generated,
+        hub_fan_in_threshold=collapse_hubs_above,
+    )
+
+    if workers is not None and workers < 1:
+        err_console.print(f"Invalid worker count {workers}, expected a positive integer")
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    if rev and (plan or shard or quarantine_above is not None):
+        err_console.print("--rev cannot be combined with --plan, --shard or --quarantine-above")
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    if precision not in call_graph.PRECISION_LEVELS:
+        err_console.print(f"Unsupported precision \"{precision}\", expected one of: {', '.join(call_graph.PRECISION_LEVELS)}")
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    if shard and precision != call_graph.DEFAULT_PRECISION:
+        err_console.print("--precision cannot be combined with --shard")
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    if plan:
+        plan_result = CodeGraph.plan(
+            abspath,
+            timeout_seconds=timeout_seconds,
+            pruning_policy=pruning_policy,
+            workers=workers,
+            precision=precision,
+        )
+
+        if len(plan_result.errors) > 0:
+            for error in plan_result.errors:
+                err_console.print(str(error))
+            raise typer.Exit(code=ERROR_EXIT_CODE)
+
+        typer.echo(json.dumps(plan_result.result, indent=2))
+        return
+
+    if shard:
+        shard_index, _separator, shard_count = shard.partition("/")
+
+        if not shard_index.isdigit() or not shard_count.isdigit():
+            err_console.print(f"Invalid shard \"{shard}\", expected i/N")
+            raise typer.Exit(code=ERROR_EXIT_CODE)
+
+        print(f"Initializing shard {shard} of {abspath}")
+
+        with _init_progress(err_console) as on_progress:
+            result = CodeGraph.init_shard(
+                abspath,
+                int(shard_index),
+                int(shard_count),
+                timeout_seconds=timeout_seconds or DEFAULT_INIT_TIMEOUT_SECONDS,
+                memory_limit_mb=memory_limit_mb,
+                max_chunk_files=max_chunk_files,
+                pruning_policy=pruning_policy,
+                progress=on_progress,
+            )
+    else:
+        print(f"Initializing {abspath} at {rev}" if rev else f"Initializing {abspath}")
+
+        with _init_progress(err_console) as on_progress:
+            result = CodeGraph.init(
+                abspath,
+                timeout_seconds=timeout_seconds,
+                memory_limit_mb=memory_limit_mb,
+                max_chunk_files=max_chunk_files,
+                pruning_policy=pruning_policy,
+                quarantine_above_seconds=quarantine_above,
+                progress=on_progress,
+                workers=workers,
+                rev=rev,
+                precision=precision,
+            )
+
+        if result.code_graph and result.code_graph.metadata.get("quarantined"):
+            quarantined = result.code_graph.metadata["quarantined"]
+            err_console.print(f"Skipped {len(quarantined)} quarantined files, see {CodeGraph.NUANCED_DIRNAME}/{CodeGraph.NUANCED_QUARANTINE_FILENAME}")
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+    else:
+        print("Done")
+
+@app.command(help="Time the analysis of each package, attribute slow packages to files and print the report as JSON.")
+def profile(
+    path: Annotated[str, typer.Argument(help="Path to directory containing Python code.")],
+    timeout_seconds: Annotated[int, typer.Option("--timeout-seconds", "-t", help="Timeout in seconds for each measurement.")]=DEFAULT_INIT_TIMEOUT_SECONDS,
+    file_budget_seconds: Annotated[Optional[float], typer.Option("--file-budget-seconds", help="Bisect packages slower than this many seconds to find the files responsible.")]=None,
+    max_chunk_files: Annotated[Optional[int], typer.Option("--max-chunk-files", help="Analyze packages with more files than this in sub-package chunks.")]=None,
+    quarantine: Annotated[bool, typer.Option("--quarantine", help="Exclude files over the budget from later runs of nuanced init until they change.")]=False,
+    top: Annotated[int, typer.Option("--top", help="Number of slowest files to list.")]=profiling.DEFAULT_TOP,
+    precision: Annotated[str, typer.Option("--precision", help="Analysis precision to measure: coarse, default or precise.")]=call_graph.DEFAULT_PRECISION,
+) -> None:
+    err_console = Console(stderr=True)
+    result = CodeGraph.profile(
+        os.path.abspath(path),
+        timeout_seconds=timeout_seconds,
+        file_budget_seconds=file_budget_seconds,
+        max_chunk_files=max_chunk_files,
+        quarantine=quarantine,
+        top=top,
+        precision=precision,
+    )
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        typer.echo(json.dumps(result.result, indent=2))
+
+@app.command(help="Merge the shards written by nuanced init --shard into a single graph.")
+def merge(
+   path: Annotated[str, typer.Argument(help="Path to directory containing Python code.")],
 ) -> None:
     err_console = Console(stderr=True)
     abspath = os.path.abspath(path)
-    print(f"Initializing {abspath}")
-    result = CodeGraph.init(abspath, timeout_seconds=timeout_seconds)
+    print(f"Merging shards of {abspath}")
+    result = CodeGraph.merge_shards(abspath)
 
     if len(result.errors) > 0:
         for error in result.errors:
             err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
     else:
         print("Done")
 
+@app.command(help="Print the functions added, removed and moved and the calls added and removed between two graphs as JSON.")
+def diff(
+   old: Annotated[str, typer.Argument(help="Old nuanced-graph.json, or a directory containing a .nuanced graph.")],
+   new: Annotated[str, typer.Argument(help="New nuanced-graph.json, or a directory containing a .nuanced graph.")],
+) -> None:
+    err_console = Console(stderr=True)
+    result = CodeGraph.diff(old, new)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        typer.echo(json.dumps(result.result, indent=2))
+
+@app.command(help="Export the graph as a compressed bundle named after the commit it was built from.")
+def export(
+    output: Annotated[Optional[str], typer.Option("--output", "-o", help="Bundle file path, or directory to write nuanced-<commit>.tar.gz to.")] = None,
+    commit: Annotated[Optional[str], typer.Option("--commit", help="Commit to name the bundle after, defaults to the commit the graph was built from.")] = None,
+) -> None:
+    err_console = Console(stderr=True)
+    code_graph_result = CodeGraph.load(directory=os.getcwd())
+
+    if len(code_graph_result.errors) > 0:
+        for error in code_graph_result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    result = code_graph_result.code_graph.export_bundle(output, commit=commit)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        print(result.result)
+
+@app.command(name="import", help="Import a graph bundle created by nuanced export.")
+def import_bundle(
+    bundle_path: Annotated[str, typer.Argument(help="Bundle file, or directory containing nuanced-<commit>.tar.gz for the current commit.")],
+    path: Annotated[str, typer.Argument(help="Path to directory containing Python code.")] = ".",
+    force: Annotated[bool, typer.Option("--force", help="Import the bundle even if it was built at a different commit.")] = False,
+) -> None:
+    err_console = Console(stderr=True)
+    abspath = os.path.abspath(path)
+    print(f"Importing {bundle_path} into {abspath}")
+    result = CodeGraph.import_bundle(bundle_path, abspath, force=force)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        print("Done")
+
+@app.command(help="Search the graph for functions by full, partial or approximate name and print ranked matches as JSON.")
+def search(
+    query: Annotated[str, typer.Argument(help="Full, partial or approximate name of function.")],
+    limit: Annotated[int, typer.Option("--limit", "-n", help="Maximum number of matches.")] = DEFAULT_SEARCH_LIMIT,
+    federated: Annotated[bool, typer.Option("--federated", help="Search every graph found under the current directory.")] = False,
+) -> None:
+    err_console = Console(stderr=True)
+
+    if federated:
+        code_graph_result = FederatedCodeGraph.load(directory=os.getcwd())
+    else:
+        code_graph_result = CodeGraph.load(directory=os.getcwd())
+
+    if len(code_graph_result.errors) > 0:
+        for error in code_graph_result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    result = code_graph_result.code_graph.search(query, limit=limit)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        typer.echo(json.dumps(result.result, indent=2))
+
+@app.command(help="Print node and edge counts, fan-in and fan-out distributions, cycles and package sizes of the graph as JSON.")
+def stats(
+    top: Annotated[int, typer.Option("--top", help="Number of hub functions, unresolved callees and cycles to list.")] = graph_stats.DEFAULT_TOP,
+    package_depth: Annotated[int, typer.Option("--package-depth", help="Number of leading name segments that identify a package.")] = graph_stats.DEFAULT_PACKAGE_DEPTH,
+) -> None:
+    err_console = Console(stderr=True)
+    code_graph_result = CodeGraph.load(directory=os.getcwd())
+
+    if len(code_graph_result.errors) > 0:
+        for error in code_graph_result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    result = code_graph_result.code_graph.stats(top=top, package_depth=package_depth)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        typer.echo(json.dumps(result.result, indent=2))
+
+@app.command(help="Print the modules or packages a module or package calls into and is called from, weighted by function calls, as JSON.")
+def deps(
+    name: Annotated[str, typer.Argument(help="Fully qualified module or package name.")],
+    level: Annotated[Optional[str], typer.Option("--level", help="Resolve the name as a module or a package, defaults to package when both exist.")] = None,
+) -> None:
+    err_console = Console(stderr=True)
+
+    if level is not None and level not in module_graph.LEVELS:
+        err_console.print(f"Unsupported level \"{level}\", expected one of: {', '.join(module_graph.LEVELS)}")
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    code_graph_result = CodeGraph.load(directory=os.getcwd())
+
+    if len(code_graph_result.errors) > 0:
+        for error in code_graph_result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    result = code_graph_result.code_graph.deps(name, level=level)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        typer.echo(json.dumps(result.result, indent=2))
+
+@app.command(help="Print the functions that cannot be reached from the given entry points as JSON.")
+def unreachable(
+    entry: Annotated[Optional[list[str]], typer.Option("--entry", "-e", help="Glob over qualified names (e.g. 'app.cli.*') or over file paths (e.g. 'tests/**.py') selecting entry points, repeatable.")] = None,
+    module_entries: Annotated[bool, typer.Option("--module-entries", help="Treat the top-level code of every module as an entry point.")] = False,
+) -> None:
+    err_console = Console(stderr=True)
+    code_graph_result = CodeGraph.load(directory=os.getcwd())
+
+    if len(code_graph_result.errors) > 0:
+        for error in code_graph_result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    result = code_graph_result.code_graph.unreachable(entry or [], module_entries=module_entries)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+    else:
+        typer.echo(json.dumps(result.result, indent=2))
+
+@app.command(name="affected-tests", help="Print the pytest node IDs of the tests that can reach the functions changed by a diff.")
+def affected_tests(
+    diff: Annotated[str, typer.Option("--diff", help="Unified diff or whitespace-separated file:line and file:start-end entries, as a file path, inline or - to read from stdin.")],
+) -> None:
+    err_console = Console(stderr=True)
+
+    if diff == "-":
+        diff = sys.stdin.read()
+    elif os.path.isfile(diff):
+        with open(diff, "r") as diff_file:
+            diff = diff_file.read()
+
+    code_graph_result = CodeGraph.load(directory=os.getcwd())
+
+    if len(code_graph_result.errors) > 0:
+        for error in code_graph_result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    result = code_graph_result.code_graph.affected_tests(diff)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    for filepath in result.result["unmapped_files"]:
+        err_console.print(f"{filepath} is not in the graph, its changes are not covered")
+
+    for test_node_id in result.result["tests"]:
+        typer.echo(test_node_id)
+
+@app.command(help="Run a Python script or module under a call tracer and merge the calls it makes into the graph.")
+def trace(
+    command: Annotated[list[str], typer.Argument(help="Script or module to run and its arguments, e.g. nuanced trace -- pytest -x.")],
+    max_edges: Annotated[int, typer.Option("--max-edges", help="Maximum number of distinct caller and callee pairs to record.")] = tracer.DEFAULT_MAX_EDGES,
+) -> None:
+    err_console = Console(stderr=True)
+    code_graph_result = CodeGraph.load(directory=os.getcwd())
+
+    if len(code_graph_result.errors) > 0:
+        for error in code_graph_result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    code_graph = code_graph_result.code_graph
+    call_tracer = tracer.CallTracer(code_graph.root, max_edges=max_edges)
+    exit_code = tracer.run(command, call_tracer)
+    result = code_graph.merge_trace(call_tracer)
+
+    if len(result.errors) > 0:
+        for error in result.errors:
+            err_console.print(str(error))
+        raise typer.Exit(code=ERROR_EXIT_CODE)
+
+    typer.echo(json.dumps(result.result, indent=2))
+
+    if exit_code != 0:
+        raise typer.Exit(code=exit_code)
+
 @app.callback(invoke_without_command=True)
 def cli(
     ctx: typer.Context,
@@ -93,6 +493,36 @@ def cli(
         print(f"nuanced {__version__}")
         raise typer.Exit()
 
+@contextmanager
+def _init_progress(console: Console):
+    if not console.is_terminal:
+        yield None
+        return
+
+    progress_bar = Progress(
+        TextColumn("{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TextColumn("files"),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+        transient=True,
+    )
+
+    with progress_bar:
+        task_id = progress_bar.add_task("Analyzing", total=None)
+
+        def on_progress(event) -> None:
+            progress_bar.update(
+                task_id,
+                description=f"Analyzing {event.dir_path} ({event.groups_done}/{event.groups_total} groups)",
+                total=event.files_total,
+                completed=event.files_done,
+            )
+
+        yield on_progress
+
 def _find_code_graph(file_path: str) -> CodeGraphResult:
     code_graph_result = CodeGraph.load(directory=os.getcwd())
 
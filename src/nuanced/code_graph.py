@@ -1,28 +1,462 @@
 from collections import namedtuple
-from itertools import groupby
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 import errno
 import glob
+import hashlib
 import json
 import os
-from nuanced.lib import call_graph
-from nuanced.lib.utils import with_timeout
+import shutil
+import tempfile
+from nuanced.lib import atomic, bundle, call_graph, git, graph_diff, graph_stats, history, impact, importance, module_graph, planning, profiling, pruning, reachability, revision, tracer
+from nuanced.lib.progress import ProgressAggregator
+from nuanced.lib.pruning import PruningPolicy
+from nuanced.lib.result_cache import ResultCache
+from nuanced.lib.source_reader import SourceReader
+from nuanced.lib.symbol_index import SymbolIndex
+from nuanced.lib.utils import WithTimeoutResult, with_timeout, with_timeouts
+from nuanced.lib.worker_pool import WorkerPool
 
 CodeGraphResult = namedtuple("CodeGraphResult", ["errors", "code_graph"])
 EnrichmentResult = namedtuple("EnrichmentResult", ["errors", "result"])
+SearchResult = namedtuple("SearchResult", ["errors", "result"])
+StatsResult = namedtuple("StatsResult", ["errors", "result"])
+TraceResult = namedtuple("TraceResult", ["errors", "result"])
+ShardResult = namedtuple("ShardResult", ["errors", "result"])
+BundleResult = namedtuple("BundleResult", ["errors", "result"])
+ProfileResult = namedtuple("ProfileResult", ["errors", "result"])
+DepsResult = namedtuple("DepsResult", ["errors", "result"])
+PlanResult = namedtuple("PlanResult", ["errors", "result"])
+UnreachableResult = namedtuple("UnreachableResult", ["errors", "result"])
+AffectedTestsResult = namedtuple("AffectedTestsResult", ["errors", "result"])
+DiffResult = namedtuple("DiffResult", ["errors", "result"])
 
 DEFAULT_INIT_TIMEOUT_SECONDS = 60
+DEFAULT_SEARCH_LIMIT = 10
 
 class CodeGraph():
     ELIGIBLE_FILE_TYPE_PATTERN = "*.py"
     NUANCED_DIRNAME = ".nuanced"
     NUANCED_GRAPH_FILENAME = "nuanced-graph.json"
+    NUANCED_SYMBOL_INDEX_FILENAME = "nuanced-symbol-index.json"
+    NUANCED_METADATA_FILENAME = "nuanced-metadata.json"
+    NUANCED_MODULE_GRAPH_FILENAME = "nuanced-module-graph.json"
+    NUANCED_CACHE_DIRNAME = "cache"
+    NUANCED_LOCK_FILENAME = "nuanced.lock"
+    NUANCED_SHARDS_DIRNAME = "shards"
+    NUANCED_HISTORY_DIRNAME = "history"
+    NUANCED_QUARANTINE_FILENAME = "nuanced-quarantine.json"
+    NUANCED_PROFILE_REPORT_FILENAME = "nuanced-profile-report.json"
 
     @classmethod
-    def init(cls, path: str, *, timeout_seconds: int=DEFAULT_INIT_TIMEOUT_SECONDS) -> CodeGraphResult:
-        errors = []
+    def init(
+        cls,
+        path: str,
+        *,
+        timeout_seconds: int | None=None,
+        memory_limit_mb: int | None=None,
+        max_chunk_files: int | None=None,
+        pruning_policy: PruningPolicy | None=None,
+        quarantine_above_seconds: float | None=None,
+        progress=None,
+        workers: int | None=None,
+        rev: str | None=None,
+        worker_pool: WorkerPool | None=None,
+        precision: str=call_graph.DEFAULT_PRECISION,
+    ) -> CodeGraphResult:
         code_graph = None
+        commit = None
+        absolute_path_to_package = os.path.abspath(path)
+        nuanced_dirpath = f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}'
+
+        if precision not in call_graph.PRECISION_LEVELS:
+            error = ValueError(f"Unsupported precision \"{precision}\", expected one of: {', '.join(call_graph.PRECISION_LEVELS)}")
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        if rev is not None:
+            if quarantine_above_seconds is not None:
+                error = ValueError("Quarantining files is not supported when analyzing a revision")
+                return CodeGraphResult(code_graph=None, errors=[error])
+
+            commit = git.rev_parse(absolute_path_to_package, rev)
+
+            if commit is None:
+                error = ValueError(f"Cannot resolve revision {rev} in {absolute_path_to_package}")
+                return CodeGraphResult(code_graph=None, errors=[error])
+
+        with ExitStack() as exit_stack:
+            analysis_path = absolute_path_to_package
+
+            # The revision's files are read from the object database into a temporary tree mirroring the
+            # package layout, so module names match and file paths are mapped back to the package afterwards
+            if commit is not None:
+                analysis_path = exit_stack.enter_context(tempfile.TemporaryDirectory(prefix="nuanced-"))
+
+                try:
+                    revision.materialize(absolute_path_to_package, commit, analysis_path)
+                except ValueError as error:
+                    return CodeGraphResult(code_graph=None, errors=[error])
+
+            eligible_absolute_filepaths, excluded_filepaths, quarantined_filepaths, errors = cls._eligible_filepaths(
+                analysis_path,
+                pruning_policy,
+                nuanced_dirpath=nuanced_dirpath,
+            )
+
+            if len(errors) == 0:
+                plan = cls._plan(
+                    eligible_absolute_filepaths,
+                    analysis_path,
+                    nuanced_dirpath=nuanced_dirpath,
+                    workers=workers,
+                    timeout_seconds=timeout_seconds,
+                    precision=precision,
+                )
+                call_graph_result, timings = cls._generate(
+                    eligible_absolute_filepaths,
+                    analysis_path,
+                    plan=plan,
+                    memory_limit_mb=memory_limit_mb,
+                    max_chunk_files=max_chunk_files,
+                    progress=progress,
+                    worker_pool=worker_pool,
+                    precision=precision,
+                )
+                aborted = any(isinstance(e, InterruptedError) for e in call_graph_result.errors)
+
+                if len(call_graph_result.errors) > 0 and not aborted and quarantine_above_seconds is not None:
+                    profile_result = cls.profile(
+                        analysis_path,
+                        timeout_seconds=plan["timeout_seconds"],
+                        file_budget_seconds=quarantine_above_seconds,
+                        max_chunk_files=max_chunk_files,
+                        quarantine=True,
+                        pruning_policy=pruning_policy,
+                        precision=precision,
+                    )
+
+                    if profile_result.result and profile_result.result["quarantined"]:
+                        eligible_absolute_filepaths, excluded_filepaths, quarantined_filepaths, errors = cls._eligible_filepaths(
+                            analysis_path,
+                            pruning_policy,
+                            nuanced_dirpath=nuanced_dirpath,
+                        )
+
+                        if len(errors) == 0:
+                            call_graph_result, timings = cls._generate(
+                                eligible_absolute_filepaths,
+                                analysis_path,
+                                plan=cls._plan(
+                                    eligible_absolute_filepaths,
+                                    analysis_path,
+                                    nuanced_dirpath=nuanced_dirpath,
+                                    workers=workers,
+                                    timeout_seconds=timeout_seconds,
+                                    precision=precision,
+                                ),
+                                memory_limit_mb=memory_limit_mb,
+                                max_chunk_files=max_chunk_files,
+                                progress=progress,
+                                worker_pool=worker_pool,
+                                precision=precision,
+                            )
+
+                call_graph_dict = call_graph_result.value
+
+                if len(call_graph_result.errors) > 0:
+                    errors = errors + call_graph_result.errors
+
+                if call_graph_dict:
+                    metadata = {
+                        "timings": {**cls._read_timings(nuanced_dirpath), precision: timings},
+                        "precision": precision,
+                    }
+
+                    if quarantined_filepaths:
+                        metadata["quarantined"] = sorted(os.path.relpath(p, analysis_path) for p in quarantined_filepaths)
+
+                    if analysis_path != absolute_path_to_package:
+                        call_graph_dict = call_graph.resolve_filepaths(
+                            call_graph.relativized(call_graph_dict, analysis_path),
+                            absolute_path_to_package,
+                        )
+                        excluded_filepaths = {
+                            os.path.join(absolute_path_to_package, os.path.relpath(p, analysis_path))
+                            for p in excluded_filepaths
+                        }
+
+                    code_graph = cls._finalize(
+                        nuanced_dirpath,
+                        call_graph_dict,
+                        pruning_policy,
+                        excluded_filepaths,
+                        metadata,
+                        commit=commit,
+                    )
+
+        return CodeGraphResult(code_graph=code_graph, errors=errors)
+
+    @classmethod
+    def plan(
+        cls,
+        path: str,
+        *,
+        timeout_seconds: int | None=None,
+        pruning_policy: PruningPolicy | None=None,
+        workers: int | None=None,
+        precision: str=call_graph.DEFAULT_PRECISION,
+    ) -> PlanResult:
+        if precision not in call_graph.PRECISION_LEVELS:
+            error = ValueError(f"Unsupported precision \"{precision}\", expected one of: {', '.join(call_graph.PRECISION_LEVELS)}")
+            return PlanResult(errors=[error], result=None)
+
+        absolute_path_to_package = os.path.abspath(path)
+        eligible_absolute_filepaths, _excluded_filepaths, _quarantined_filepaths, errors = cls._eligible_filepaths(
+            absolute_path_to_package,
+            pruning_policy,
+        )
+
+        if len(errors) > 0:
+            return PlanResult(errors=errors, result=None)
+
+        plan = cls._plan(
+            eligible_absolute_filepaths,
+            absolute_path_to_package,
+            workers=workers,
+            timeout_seconds=timeout_seconds,
+            precision=precision,
+        )
+
+        return PlanResult(errors=[], result=plan)
+
+    @classmethod
+    def profile(
+        cls,
+        path: str,
+        *,
+        timeout_seconds: int=DEFAULT_INIT_TIMEOUT_SECONDS,
+        file_budget_seconds: float | None=None,
+        max_chunk_files: int | None=None,
+        quarantine: bool=False,
+        pruning_policy: PruningPolicy | None=None,
+        top: int=profiling.DEFAULT_TOP,
+        precision: str=call_graph.DEFAULT_PRECISION,
+    ) -> ProfileResult:
+        if quarantine and file_budget_seconds is None:
+            error = ValueError("Quarantining files requires a per-file budget")
+            return ProfileResult(errors=[error], result=None)
+
+        if precision not in call_graph.PRECISION_LEVELS:
+            error = ValueError(f"Unsupported precision \"{precision}\", expected one of: {', '.join(call_graph.PRECISION_LEVELS)}")
+            return ProfileResult(errors=[error], result=None)
+
+        absolute_path_to_package = os.path.abspath(path)
+        nuanced_dirpath = f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}'
+        eligible_absolute_filepaths, _excluded_filepaths, _quarantined_filepaths, errors = cls._eligible_filepaths(
+            absolute_path_to_package,
+            pruning_policy,
+        )
+
+        if len(errors) > 0:
+            return ProfileResult(errors=errors, result=None)
+
+        report = profiling.profile(
+            eligible_absolute_filepaths,
+            package_path=absolute_path_to_package,
+            timeout_seconds=timeout_seconds,
+            file_budget_seconds=file_budget_seconds,
+            max_chunk_files=max_chunk_files,
+            top=top,
+            precision=precision,
+        )
+        os.makedirs(nuanced_dirpath, exist_ok=True)
+        report["quarantined"] = []
+
+        if quarantine:
+            report["quarantined"] = profiling.quarantine_files(
+                f'{nuanced_dirpath}/{cls.NUANCED_QUARANTINE_FILENAME}',
+                report,
+                absolute_path_to_package,
+            )
+
+        atomic.write_atomic(f'{nuanced_dirpath}/{cls.NUANCED_PROFILE_REPORT_FILENAME}', json.dumps(report, indent=2))
+
+        return ProfileResult(errors=[], result=report)
+
+    @classmethod
+    def init_shard(
+        cls,
+        path: str,
+        shard_index: int,
+        shard_count: int,
+        *,
+        timeout_seconds: int=DEFAULT_INIT_TIMEOUT_SECONDS,
+        memory_limit_mb: int | None=None,
+        max_chunk_files: int | None=None,
+        pruning_policy: PruningPolicy | None=None,
+        progress=None,
+    ) -> ShardResult:
+        if shard_count < 1 or not 1 <= shard_index <= shard_count:
+            error = ValueError(f"Invalid shard {shard_index}/{shard_count}, expected i/N with 1 <= i <= N")
+            return ShardResult(errors=[error], result=None)
+
+        shard_filepath = None
+        absolute_path_to_package = os.path.abspath(path)
+        eligible_absolute_filepaths, excluded_filepaths, _quarantined_filepaths, errors = cls._eligible_filepaths(
+            absolute_path_to_package,
+            pruning_policy,
+        )
+
+        if len(errors) == 0:
+            shard_result = with_timeout(
+                target=call_graph.generate_shard,
+                args=(eligible_absolute_filepaths),
+                kwargs=({
+                    "shard_index": shard_index,
+                    "shard_count": shard_count,
+                    "package_path": absolute_path_to_package,
+                    "max_chunk_files": max_chunk_files,
+                }),
+                timeout=timeout_seconds,
+                memory_limit_bytes=memory_limit_mb * 1024 * 1024 if memory_limit_mb else None,
+                progress=progress,
+            )
+
+            if len(shard_result.errors) > 0:
+                errors = errors + shard_result.errors
+            else:
+                shards_dirpath = f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}/{cls.NUANCED_SHARDS_DIRNAME}'
+                shard_filepath = f'{shards_dirpath}/shard-{shard_index}-of-{shard_count}.json'
+                shard = {
+                    "shard_index": shard_index,
+                    "shard_count": shard_count,
+                    "pruning_policy": pruning_policy._asdict() if pruning.is_enabled(pruning_policy) else None,
+                    "excluded_filepaths": sorted(_relative_filepath(p, absolute_path_to_package) for p in excluded_filepaths),
+                    "groups": [
+                        {**g, "graph": call_graph.relativized(g["graph"], absolute_path_to_package)}
+                        for g in shard_result.value
+                    ],
+                }
+                os.makedirs(shards_dirpath, exist_ok=True)
+                atomic.write_atomic(shard_filepath, json.dumps(shard))
+
+        return ShardResult(errors=errors, result=shard_filepath)
+
+    @classmethod
+    def merge_shards(cls, path: str) -> CodeGraphResult:
+        absolute_path_to_package = os.path.abspath(path)
+        nuanced_dirpath = f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}'
+        shards_dirpath = f'{nuanced_dirpath}/{cls.NUANCED_SHARDS_DIRNAME}'
+        shards = []
+
+        for shard_filepath in sorted(glob.glob(f'{shards_dirpath}/shard-*-of-*.json')):
+            with open(shard_filepath, "r") as shard_file:
+                shards.append(json.load(shard_file))
+
+        if len(shards) == 0:
+            error = FileNotFoundError(f"No shards found in {shards_dirpath}")
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        shard_counts = {s["shard_count"] for s in shards}
+        shard_indices = {s["shard_index"] for s in shards}
+
+        if len(shard_counts) > 1:
+            error = ValueError(f"Shards in {shards_dirpath} were created with different shard counts: {sorted(shard_counts)}")
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        shard_count = shard_counts.pop()
+        missing_shard_indices = sorted(set(range(1, shard_count + 1)) - shard_indices)
+
+        if missing_shard_indices:
+            missing_shards = ", ".join(f"{i}/{shard_count}" for i in missing_shard_indices)
+            error = ValueError(f"Missing shards in {shards_dirpath}: {missing_shards}")
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        group_graphs = sorted((g for s in shards for g in s["groups"]), key=lambda g: g["index"])
+        graph = call_graph.combine([
+            (
+                call_graph.CallGraphGroup(g["kind"], g["dir_path"], []),
+                call_graph.resolve_filepaths(g["graph"], absolute_path_to_package),
+            )
+            for g in group_graphs
+        ])
+        pruning_policy = PruningPolicy(**shards[0]["pruning_policy"]) if shards[0]["pruning_policy"] else None
+        excluded_filepaths = {os.path.join(absolute_path_to_package, p) for s in shards for p in s["excluded_filepaths"]}
+        code_graph = cls._finalize(nuanced_dirpath, graph, pruning_policy, excluded_filepaths)
+        shutil.rmtree(shards_dirpath, ignore_errors=True)
+
+        return CodeGraphResult(code_graph=code_graph, errors=[])
+
+    @classmethod
+    def diff(cls, old_path: str, new_path: str) -> DiffResult:
+        graph_paths = []
+
+        for path in (old_path, new_path):
+            if os.path.isdir(path):
+                path = os.path.join(path, cls.NUANCED_DIRNAME, cls.NUANCED_GRAPH_FILENAME)
+
+            if not os.path.isfile(path):
+                error = FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+                return DiffResult(errors=[error], result=None)
+
+            graph_paths.append(path)
+
+        try:
+            result = graph_diff.diff_files(*graph_paths)
+        except (OSError, ValueError) as error:
+            return DiffResult(errors=[error], result=None)
+
+        return DiffResult(errors=[], result=result)
+
+    @classmethod
+    def import_bundle(cls, bundle_path: str, path: str, *, force: bool=False) -> CodeGraphResult:
         absolute_path_to_package = os.path.abspath(path)
+        commit = bundle.current_commit(absolute_path_to_package)
+
+        if os.path.isdir(bundle_path):
+            if not commit:
+                error = ValueError(f"Cannot select a bundle from {bundle_path}: {absolute_path_to_package} is not a git checkout")
+                return CodeGraphResult(code_graph=None, errors=[error])
+
+            bundle_path = os.path.join(bundle_path, bundle.bundle_filename(commit))
+
+        if not os.path.isfile(bundle_path):
+            error = FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), bundle_path)
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        try:
+            manifest, files = bundle.read(bundle_path)
+            graph = json.loads(files[cls.NUANCED_GRAPH_FILENAME])
+            metadata = json.loads(files[cls.NUANCED_METADATA_FILENAME])
+        except (OSError, KeyError, ValueError) as error:
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        if commit and manifest["commit"] != commit and not force:
+            error = ValueError(f"Bundle {bundle_path} was built at commit {manifest['commit']} but {absolute_path_to_package} is at {commit}")
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        graph = call_graph.resolve_filepaths(graph, absolute_path_to_package)
+        metadata = {k: v for k, v in metadata.items() if k not in ("digest", "modules", "generation", "root")}
+        metadata["commit"] = manifest["commit"]
+        nuanced_dirpath = f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}'
+        cls._record_history(nuanced_dirpath, graph, manifest["commit"])
+
+        return CodeGraphResult(code_graph=cls._persist(nuanced_dirpath, graph, metadata), errors=[])
+
+    @classmethod
+    def _eligible_filepaths(
+        cls,
+        absolute_path_to_package: str,
+        pruning_policy: PruningPolicy | None,
+        *,
+        nuanced_dirpath: str | None=None,
+    ) -> tuple[list[str], set[str], set[str], list]:
+        nuanced_dirpath = nuanced_dirpath or f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}'
+        errors = []
+        eligible_absolute_filepaths = []
+        excluded_filepaths = set()
+        quarantined_filepaths = set()
 
         if not os.path.isdir(absolute_path_to_package):
             error = FileNotFoundError(
@@ -32,37 +466,240 @@ class CodeGraph():
             )
             errors.append(error)
         else:
-            eligible_filepaths = glob.glob(
+            eligible_filepaths = sorted(glob.glob(
                     f'**/{cls.ELIGIBLE_FILE_TYPE_PATTERN}',
                     root_dir=absolute_path_to_package,
                     recursive=True
-                )
+                ))
             eligible_absolute_filepaths = [absolute_path_to_package + "/" + p for p in eligible_filepaths]
 
+            if pruning.is_enabled(pruning_policy):
+                excluded_filepaths = pruning.excluded_filepaths(
+                    eligible_absolute_filepaths,
+                    pruning_policy,
+                    root=absolute_path_to_package,
+                )
+                eligible_absolute_filepaths = [p for p in eligible_absolute_filepaths if p not in excluded_filepaths]
+
+            quarantine = profiling.load_quarantine(f'{nuanced_dirpath}/{cls.NUANCED_QUARANTINE_FILENAME}')
+            quarantined_filepaths = profiling.quarantined_filepaths(quarantine, absolute_path_to_package)
+            eligible_absolute_filepaths = [p for p in eligible_absolute_filepaths if p not in quarantined_filepaths]
+
             if len(eligible_absolute_filepaths) == 0:
                 error = ValueError(f"No eligible files found in {absolute_path_to_package}")
                 errors.append(error)
-            else:
-                call_graph_result = with_timeout(
-                    target=call_graph.generate,
-                    args=(eligible_absolute_filepaths),
-                    kwargs=({"package_path": absolute_path_to_package}),
-                    timeout=timeout_seconds,
+
+        return eligible_absolute_filepaths, excluded_filepaths, quarantined_filepaths, errors
+
+    @classmethod
+    def _plan(
+        cls,
+        eligible_absolute_filepaths: list[str],
+        absolute_path_to_package: str,
+        *,
+        nuanced_dirpath: str | None=None,
+        workers: int | None,
+        timeout_seconds: int | None,
+        precision: str=call_graph.DEFAULT_PRECISION,
+    ) -> dict:
+        nuanced_dirpath = nuanced_dirpath or f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}'
+
+        return planning.plan(
+            eligible_absolute_filepaths,
+            root=absolute_path_to_package,
+            timings=cls._read_timings(nuanced_dirpath).get(precision),
+            workers=workers,
+            timeout_seconds=timeout_seconds,
+        )
+
+    # Timings are kept per precision level since the levels run at very different speeds, timings
+    # recorded before levels existed are not keyed by level and are not used
+    @classmethod
+    def _read_timings(cls, nuanced_dirpath: str) -> dict[str, dict[str, float]]:
+        timings = cls._read_metadata(nuanced_dirpath).get("timings") or {}
+
+        return {
+            level: level_timings for level, level_timings in timings.items()
+            if level in call_graph.PRECISION_LEVELS and isinstance(level_timings, dict)
+        }
+
+    @classmethod
+    def _generate(
+        cls,
+        eligible_absolute_filepaths: list[str],
+        absolute_path_to_package: str,
+        *,
+        plan: dict,
+        memory_limit_mb: int | None,
+        max_chunk_files: int | None,
+        progress=None,
+        worker_pool: WorkerPool | None=None,
+        precision: str=call_graph.DEFAULT_PRECISION,
+    ) -> tuple[WithTimeoutResult, dict[str, float]]:
+        worker_group_indices = planning.worker_group_indices(plan)
+        aggregator = ProgressAggregator(
+            progress,
+            groups_total=len(plan["groups"]),
+            files_total=sum(g["files"] for g in plan["groups"]),
+            worker_count=len(worker_group_indices),
+        )
+        memory_limit_bytes = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+
+        if len(worker_group_indices) == 1:
+            call_graph_result = with_timeout(
+                target=call_graph.generate,
+                args=(eligible_absolute_filepaths),
+                kwargs=({
+                    "package_path": absolute_path_to_package,
+                    "max_chunk_files": max_chunk_files,
+                    "order": worker_group_indices[0],
+                    "precision": precision,
+                }),
+                timeout=plan["timeout_seconds"],
+                memory_limit_bytes=memory_limit_bytes,
+                progress=aggregator.for_worker(0),
+                pool=worker_pool,
+            )
+
+            return call_graph_result, aggregator.timings
+
+        worker_calls = [
+            (
+                call_graph.generate_groups,
+                eligible_absolute_filepaths,
+                {
+                    "group_indices": group_indices,
+                    "package_path": absolute_path_to_package,
+                    "max_chunk_files": max_chunk_files,
+                    "precision": precision,
+                },
+                aggregator.for_worker(worker),
+            )
+            for worker, group_indices in enumerate(worker_group_indices)
+        ]
+
+        if worker_pool is None:
+            worker_results = with_timeouts(worker_calls, plan["timeout_seconds"], memory_limit_bytes=memory_limit_bytes)
+        else:
+            # Pooled workers come from the pool's forkserver, so they can be started from the executor's threads
+            def run_in_pool(worker_call: tuple) -> WithTimeoutResult:
+                target, args, kwargs, progress = worker_call
+
+                return with_timeout(
+                    target=target,
+                    args=args,
+                    kwargs=kwargs,
+                    timeout=plan["timeout_seconds"],
+                    memory_limit_bytes=memory_limit_bytes,
+                    progress=progress,
+                    pool=worker_pool,
                 )
-                call_graph_dict = call_graph_result.value
 
-                if len(call_graph_result.errors) > 0:
-                    errors = errors + call_graph_result.errors
+            with ThreadPoolExecutor(max_workers=len(worker_calls)) as executor:
+                worker_results = list(executor.map(run_in_pool, worker_calls))
 
-                if call_graph_dict:
-                    nuanced_dirpath = f'{absolute_path_to_package}/{cls.NUANCED_DIRNAME}'
-                    os.makedirs(nuanced_dirpath, exist_ok=True)
+        errors = [e for r in worker_results for e in r.errors]
 
-                    nuanced_graph_file = open(f'{nuanced_dirpath}/{cls.NUANCED_GRAPH_FILENAME}', "w+")
-                    nuanced_graph_file.write(json.dumps(call_graph_dict))
-                    code_graph = cls(graph=call_graph_dict)
+        if len(errors) > 0:
+            return WithTimeoutResult(errors=errors, value=None), aggregator.timings
 
-        return CodeGraphResult(code_graph=code_graph, errors=errors)
+        all_groups = call_graph.groups(eligible_absolute_filepaths)
+        group_graphs = sorted((g for r in worker_results for g in r.value), key=lambda g: g["index"])
+        graph = call_graph.combine([(all_groups[g["index"]], g["graph"]) for g in group_graphs])
+
+        return WithTimeoutResult(errors=[], value=graph), aggregator.timings
+
+    @classmethod
+    def _finalize(
+        cls,
+        nuanced_dirpath: str,
+        graph: dict,
+        pruning_policy: PruningPolicy | None,
+        excluded_filepaths: set[str],
+        metadata: dict | None=None,
+        *,
+        commit: str | None=None,
+    ) -> "CodeGraph":
+        metadata = {**(metadata or {})}
+        commit = commit or bundle.clean_commit(os.path.dirname(nuanced_dirpath))
+
+        if commit:
+            metadata["commit"] = commit
+
+        if pruning.is_enabled(pruning_policy):
+            graph, metadata["pruning"] = pruning.prune(
+                graph,
+                pruning_policy,
+                excluded=excluded_filepaths,
+            )
+
+        if commit:
+            cls._record_history(nuanced_dirpath, graph, commit)
+
+        return cls._persist(nuanced_dirpath, graph, metadata)
+
+    @classmethod
+    def _record_history(cls, nuanced_dirpath: str, graph: dict, commit: str) -> None:
+        root = os.path.dirname(os.path.abspath(nuanced_dirpath))
+        os.makedirs(nuanced_dirpath, exist_ok=True)
+
+        with atomic.exclusive_lock(f'{nuanced_dirpath}/{cls.NUANCED_LOCK_FILENAME}'):
+            history.record(
+                f'{nuanced_dirpath}/{cls.NUANCED_HISTORY_DIRNAME}',
+                commit,
+                call_graph.relativized(graph, root),
+            )
+
+    @classmethod
+    def _persist(cls, nuanced_dirpath: str, graph: dict, metadata: dict | None=None) -> "CodeGraph":
+        os.makedirs(nuanced_dirpath, exist_ok=True)
+        root = os.path.dirname(os.path.abspath(nuanced_dirpath))
+        graph_json = json.dumps(call_graph.relativized(graph, root))
+        metadata = {
+            **(metadata or {}),
+            "digest": hashlib.sha256(graph_json.encode("utf-8")).hexdigest(),
+            "modules": call_graph.module_names(graph),
+            "root": root,
+        }
+        symbol_index = SymbolIndex.build(graph)
+        symbol_index_dict = symbol_index.to_dict()
+        symbol_index_dict["files"] = [_relative_filepath(f, root) for f in symbol_index.files]
+        module_graph_dict = module_graph.compute(graph, root=root)
+
+        with atomic.exclusive_lock(f'{nuanced_dirpath}/{cls.NUANCED_LOCK_FILENAME}'):
+            metadata["generation"] = cls._read_metadata(nuanced_dirpath).get("generation", 0) + 1
+            ResultCache(f'{nuanced_dirpath}/{cls.NUANCED_CACHE_DIRNAME}').clear()
+            atomic.write_atomic(
+                f'{nuanced_dirpath}/{cls.NUANCED_SYMBOL_INDEX_FILENAME}',
+                json.dumps(symbol_index_dict),
+            )
+            atomic.write_atomic(f'{nuanced_dirpath}/{cls.NUANCED_MODULE_GRAPH_FILENAME}', json.dumps(module_graph_dict))
+            atomic.write_atomic(f'{nuanced_dirpath}/{cls.NUANCED_GRAPH_FILENAME}', graph_json)
+            atomic.write_atomic(f'{nuanced_dirpath}/{cls.NUANCED_METADATA_FILENAME}', json.dumps(metadata))
+
+        code_graph = cls(
+            graph=graph,
+            nuanced_dirpath=nuanced_dirpath,
+            symbol_index=symbol_index,
+            metadata=metadata,
+        )
+        code_graph._module_graph = module_graph_dict
+        code_graph._graph_stat = code_graph._stat_graph_file()
+
+        return code_graph
+
+    @classmethod
+    def _read_metadata(cls, nuanced_dirpath: str | None) -> dict:
+        metadata_path = f'{nuanced_dirpath}/{cls.NUANCED_METADATA_FILENAME}'
+
+        if not nuanced_dirpath or not os.path.isfile(metadata_path):
+            return {}
+
+        with open(metadata_path, "r") as metadata_file:
+            try:
+                return json.load(metadata_file)
+            except ValueError:
+                return {}
 
     @classmethod
     def load(cls, directory=str) -> CodeGraphResult:
@@ -76,29 +713,324 @@ class CodeGraph():
             error = ValueError(f"Multiple Nuanced Graphs found in {os.path.abspath(directory)}: {graph_file_paths}")
             errors.append(error)
         elif len(file_paths) == 1:
-            file_path = file_paths[0]
-            graph_file = open(file_path, "r")
-            graph = json.load(graph_file)
-            code_graph = CodeGraph(graph=graph)
+            nuanced_dirpath = os.path.dirname(file_paths[0])
+            code_graph = cls(graph=None, nuanced_dirpath=nuanced_dirpath)
         elif len(file_paths) == 0:
             error = FileNotFoundError(f"Nuanced Graph not found in {os.path.abspath(directory)}")
             errors.append(error)
 
         return CodeGraphResult(code_graph=code_graph, errors=errors)
 
-    def __init__(self, graph: dict | None) -> None:
-        self.graph = graph
+    def __init__(
+        self,
+        graph: dict | None,
+        *,
+        nuanced_dirpath: str | None=None,
+        symbol_index: SymbolIndex | None=None,
+        metadata: dict | None=None,
+    ) -> None:
+        self._graph = graph
+        self._graph_stat = None
+        self._symbol_index = symbol_index
+        self._metadata = metadata
+        self._source_reader = None
+        self._importance_scores = None
+        self._module_graph = None
+        self.nuanced_dirpath = nuanced_dirpath
+        self.result_cache = None
+
+        if nuanced_dirpath:
+            self.result_cache = ResultCache(f'{nuanced_dirpath}/{self.NUANCED_CACHE_DIRNAME}')
+
+    @property
+    def graph(self) -> dict | None:
+        if self._graph is None and self.nuanced_dirpath:
+            with open(f'{self.nuanced_dirpath}/{self.NUANCED_GRAPH_FILENAME}', "r") as graph_file:
+                self._graph_stat = os.fstat(graph_file.fileno())
+                self._graph = call_graph.resolve_filepaths(json.load(graph_file), self.root)
+
+        return self._graph
+
+    @graph.setter
+    def graph(self, graph: dict | None) -> None:
+        self._graph = graph
+        self._symbol_index = None
+        self._importance_scores = None
+        self._module_graph = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._graph is not None
+
+    @property
+    def version(self) -> str | None:
+        stat = self._graph_stat or self._stat_graph_file()
+
+        if stat is None:
+            return None
+
+        fingerprint = f'{self.metadata.get("digest", "")}:{stat.st_size}:{stat.st_mtime_ns}'
+
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:32]
+
+    @property
+    def generation(self) -> int | None:
+        return self.metadata.get("generation")
+
+    @property
+    def is_stale(self) -> bool:
+        if self._graph_stat is None:
+            return False
+
+        stat = self._stat_graph_file()
+
+        return stat is None or _stat_signature(stat) != _stat_signature(self._graph_stat)
+
+    def refresh(self) -> bool:
+        if not self.is_stale:
+            return False
+
+        self._graph = None
+        self._graph_stat = None
+        self._metadata = None
+        self._symbol_index = None
+        self._importance_scores = None
+        self._module_graph = None
+
+        return True
+
+    @property
+    def root(self) -> str | None:
+        if not self.nuanced_dirpath:
+            return None
+
+        return os.path.dirname(os.path.abspath(self.nuanced_dirpath))
+
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = self._read_metadata(self.nuanced_dirpath)
+
+        return self._metadata
+
+    @property
+    def symbol_index(self) -> SymbolIndex:
+        if self._symbol_index is None:
+            self._symbol_index = self._load_symbol_index() or SymbolIndex.build(self.graph)
+
+        return self._symbol_index
+
+    @property
+    def source_reader(self) -> SourceReader:
+        if self._source_reader is None:
+            self._source_reader = SourceReader()
+
+        return self._source_reader
+
+    # Releases the source files kept open by include_source; the graph stays usable and reopens them on demand
+    def close(self) -> None:
+        if self._source_reader is not None:
+            self._source_reader.close()
+            self._source_reader = None
+
+    def __enter__(self) -> "CodeGraph":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def search(self, query: str, limit: int=DEFAULT_SEARCH_LIMIT) -> SearchResult:
+        if not query:
+            error = ValueError("Search query must not be empty")
+            return SearchResult(errors=[error], result=None)
+
+        if limit < 1:
+            error = ValueError(f"Search limit must be a positive integer, got {limit}")
+            return SearchResult(errors=[error], result=None)
+
+        matches = self.symbol_index.search(query, limit=limit)
+
+        return SearchResult(errors=[], result=[m._asdict() for m in matches])
+
+    def stats(self, top: int=graph_stats.DEFAULT_TOP, package_depth: int=graph_stats.DEFAULT_PACKAGE_DEPTH) -> StatsResult:
+        if top < 0 or package_depth < 1:
+            error = ValueError(f"Invalid stats options: top={top}, package_depth={package_depth}")
+            return StatsResult(errors=[error], result=None)
+
+        result = graph_stats.compute(self.graph, top=top, package_depth=package_depth)
+        result["pruning"] = self.metadata.get("pruning")
+
+        return StatsResult(errors=[], result=result)
+
+    def unreachable(self, entry_patterns: list[str], *, module_entries: bool=False) -> UnreachableResult:
+        if not entry_patterns and not module_entries:
+            error = ValueError("At least one entry point pattern is required")
+            return UnreachableResult(errors=[error], result=None)
+
+        result = reachability.unreachable(
+            self.graph,
+            entry_patterns,
+            root=self.root,
+            module_entries=module_entries,
+        )
+
+        if result["entries"] == 0:
+            error = ValueError(f"No functions match the entry point patterns: {', '.join(entry_patterns)}")
+            return UnreachableResult(errors=[error], result=None)
+
+        return UnreachableResult(errors=[], result=result)
+
+    def affected_tests(self, diff: str) -> AffectedTestsResult:
+        try:
+            changes = impact.parse_changes(diff)
+        except ValueError as error:
+            return AffectedTestsResult(errors=[error], result=None)
+
+        result = impact.affected_tests(self.graph, changes, root=self.root or os.getcwd())
+
+        return AffectedTestsResult(errors=[], result=result)
+
+    def module_graph(self) -> dict:
+        if self._module_graph is None:
+            self._module_graph = self._load_module_graph() or module_graph.compute(self.graph, root=self.root)
+
+        return self._module_graph
+
+    def deps(self, name: str, *, level: str | None=None) -> DepsResult:
+        if level is not None and level not in module_graph.LEVELS:
+            error = ValueError(f"Unsupported level \"{level}\", expected one of: {', '.join(module_graph.LEVELS)}")
+            return DepsResult(errors=[error], result=None)
+
+        result = module_graph.dependencies(self.module_graph(), name, level=level)
+
+        if result is None:
+            error = ValueError(f"Module or package \"{name}\" not found")
+            return DepsResult(errors=[error], result=None)
+
+        return DepsResult(errors=[], result=result)
+
+    def at(self, rev: str) -> CodeGraphResult:
+        if not self.nuanced_dirpath:
+            error = ValueError("Only a persisted graph has a history")
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        history_dirpath = f'{self.nuanced_dirpath}/{self.NUANCED_HISTORY_DIRNAME}'
+
+        try:
+            index = history.load_index(history_dirpath)
+        except ValueError as error:
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        candidates = git.rev_list(self.root, rev, max_count=history.DEFAULT_MAX_ANCESTORS)
+
+        if not candidates:
+            candidates = [e["commit"] for e in index["entries"] if e["commit"].startswith(rev)][:1]
+
+        commit = history.recorded_commit(index, candidates)
+
+        if commit is None:
+            error = ValueError(f"No graph recorded in {history_dirpath} at or before {rev}")
+            return CodeGraphResult(code_graph=None, errors=[error])
+
+        graph = call_graph.resolve_filepaths(history.snapshot(history_dirpath, commit, index=index), self.root)
+        metadata = {"commit": commit, "requested_commit": candidates[0]}
+
+        return CodeGraphResult(code_graph=CodeGraph(graph, metadata=metadata), errors=[])
+
+    def export_bundle(self, output_path: str | None=None, *, commit: str | None=None) -> BundleResult:
+        if not self.nuanced_dirpath:
+            error = ValueError("Only a persisted graph can be exported")
+            return BundleResult(errors=[error], result=None)
+
+        commit = commit or self.metadata.get("commit")
+
+        if not commit:
+            error = ValueError(f"The graph in {self.root} was not built from a clean commit, pass one explicitly")
+            return BundleResult(errors=[error], result=None)
+
+        output_path = output_path or os.getcwd()
+
+        if os.path.isdir(output_path):
+            output_path = os.path.join(output_path, bundle.bundle_filename(commit))
+
+        files = {}
+
+        for filename in (self.NUANCED_GRAPH_FILENAME, self.NUANCED_METADATA_FILENAME):
+            with open(f'{self.nuanced_dirpath}/{filename}', "rb") as nuanced_file:
+                files[filename] = nuanced_file.read()
+
+        bundle.write(output_path, commit, files)
+
+        return BundleResult(errors=[], result=output_path)
+
+    def merge_trace(self, call_tracer: tracer.CallTracer) -> TraceResult:
+        if not self.nuanced_dirpath:
+            error = ValueError("Runtime calls can only be merged into a persisted graph")
+            return TraceResult(errors=[error], result=None)
+
+        graph = self.graph
+        edges = tracer.resolve(graph, call_tracer.calls)
+        summary = tracer.merge(graph, edges)
+        summary["dropped_calls"] = call_tracer.dropped_calls
+
+        metadata = {k: v for k, v in self.metadata.items() if k not in ("digest", "modules", "generation")}
+        metadata["trace"] = summary
+        persisted = self._persist(self.nuanced_dirpath, graph, metadata)
+        self._graph_stat = persisted._graph_stat
+        self._metadata = persisted.metadata
+        self._symbol_index = persisted.symbol_index
+        self._importance_scores = None
+        self._module_graph = persisted._module_graph
+
+        return TraceResult(errors=[], result=summary)
 
     def enrich(
         self,
         file_path: str,
         function_name: str,
         include_builtins: bool=False,
+        include_source: bool=False,
+        max_nodes: int | None=None,
+        sort_by_importance: bool=False,
     ) -> EnrichmentResult:
+        if max_nodes is not None and max_nodes < 1:
+            error = ValueError(f"max_nodes must be a positive integer, got {max_nodes}")
+            return EnrichmentResult(errors=[error], result=None)
+
         absolute_filepath = os.path.abspath(file_path)
-        graph_nodes_grouped_by_filepath = {k: [v[0] for v in v] for k, v in groupby(self.graph.items(), lambda x: x[1]["filepath"])}
+        cache_key = {
+            "file_path": absolute_filepath,
+            "function_name": function_name,
+            "include_builtins": include_builtins,
+        }
+        enriched_subgraph = self._cached_result("enrich", cache_key)
+
+        if enriched_subgraph is None:
+            result = self._enrich(absolute_filepath, file_path, function_name, include_builtins)
+
+            if len(result.errors) > 0 or result.result is None:
+                return result
+
+            enriched_subgraph = result.result
+            self._cache_result("enrich", cache_key, enriched_subgraph)
+
+        if max_nodes is not None or sort_by_importance:
+            enriched_subgraph = self._ranked_subgraph(enriched_subgraph, max_nodes)
+
+        if include_source:
+            self._attach_source(enriched_subgraph)
+
+        return EnrichmentResult(errors=[], result=enriched_subgraph)
+
+    def _enrich(
+        self,
+        absolute_filepath: str,
+        file_path: str,
+        function_name: str,
+        include_builtins: bool,
+    ) -> EnrichmentResult:
         entrypoint_node_key = None
-        function_names = graph_nodes_grouped_by_filepath.get(absolute_filepath, [])
+        function_names = self._node_keys_for_filepath(absolute_filepath)
         entrypoint_node_keys = [n for n in function_names if n.endswith(function_name)]
 
         if len(entrypoint_node_keys) > 1:
@@ -129,6 +1061,54 @@ class CodeGraph():
 
         return EnrichmentResult(errors=[], result=enriched_subgraph)
 
+    def _ranked_subgraph(self, enriched_subgraph: dict, max_nodes: int | None) -> dict:
+        # Scores are only computed, and only emitted, when a query asks for ranking
+        if self._importance_scores is None:
+            self._importance_scores = importance.scores(self.graph)
+
+        entrypoint_node_key = next(iter(enriched_subgraph))
+        node_names = [n for n in enriched_subgraph if n != entrypoint_node_key]
+        node_names.sort(key=lambda n: (-self._importance_scores.get(n, 0.0), n))
+        ranked_node_names = [entrypoint_node_key] + node_names
+
+        if max_nodes is not None:
+            ranked_node_names = ranked_node_names[:max_nodes]
+
+        return {
+            n: {**enriched_subgraph[n], importance.IMPORTANCE_ATTR: self._importance_scores.get(n, 0.0)}
+            for n in ranked_node_names
+        }
+
+    def _cached_result(self, operation: str, key: dict):
+        version = self.version
+
+        if not self.result_cache or not version:
+            return None
+
+        return self.result_cache.get(version, {"operation": operation, **key})
+
+    def _cache_result(self, operation: str, key: dict, value) -> None:
+        version = self.version
+
+        if self.result_cache and version:
+            self.result_cache.put(version, {"operation": operation, **key}, value)
+
+    def _attach_source(self, enriched_subgraph: dict) -> None:
+        node_names_by_filepath = {}
+
+        for node_name, node_attrs in enriched_subgraph.items():
+            node_names_by_filepath.setdefault(node_attrs["filepath"], []).append(node_name)
+
+        for filepath, node_names in node_names_by_filepath.items():
+            spans = [(enriched_subgraph[n]["lineno"], enriched_subgraph[n]["end_lineno"]) for n in node_names]
+            sources = self.source_reader.read_spans(filepath, spans)
+
+            for node_name, source in zip(node_names, sources):
+                enriched_subgraph[node_name]["source"] = source
+
+    def _node_keys_for_filepath(self, filepath: str) -> list[str]:
+        return [k for k, v in self.graph.items() if v["filepath"] == filepath]
+
     def _build_subgraph(self, entrypoint_node_key: str) -> dict | None:
         subgraph = dict()
         visited = set()
@@ -154,3 +1134,58 @@ class CodeGraph():
                             callees.update(callee_callees)
 
             return subgraph
+
+    def _stat_graph_file(self) -> os.stat_result | None:
+        if not self.nuanced_dirpath:
+            return None
+
+        try:
+            return os.stat(f'{self.nuanced_dirpath}/{self.NUANCED_GRAPH_FILENAME}')
+        except OSError:
+            return None
+
+    def _load_module_graph(self) -> dict | None:
+        if not self.nuanced_dirpath:
+            return None
+
+        module_graph_path = f'{self.nuanced_dirpath}/{self.NUANCED_MODULE_GRAPH_FILENAME}'
+
+        if not os.path.isfile(module_graph_path):
+            return None
+
+        with open(module_graph_path, "r") as module_graph_file:
+            try:
+                return json.load(module_graph_file)
+            except ValueError:
+                return None
+
+    def _load_symbol_index(self) -> SymbolIndex | None:
+        if not self.nuanced_dirpath:
+            return None
+
+        symbol_index_path = f'{self.nuanced_dirpath}/{self.NUANCED_SYMBOL_INDEX_FILENAME}'
+
+        if not os.path.isfile(symbol_index_path):
+            return None
+
+        with open(symbol_index_path, "r") as symbol_index_file:
+            try:
+                symbol_index = SymbolIndex.from_dict(json.load(symbol_index_file))
+            except ValueError:
+                return None
+
+        symbol_index.files = [os.path.join(self.root, f) for f in symbol_index.files]
+
+        return symbol_index
+
+
+def _stat_signature(stat: os.stat_result) -> tuple[int, int, int, int]:
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def _relative_filepath(filepath: str | None, root: str) -> str | None:
+    root_prefix = root.rstrip(os.sep) + os.sep
+
+    if filepath and filepath.startswith(root_prefix):
+        return filepath[len(root_prefix):]
+
+    return filepath
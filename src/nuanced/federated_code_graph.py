@@ -0,0 +1,55 @@
+from pathlib import Path
+import os
+from nuanced.code_graph import CodeGraph, CodeGraphResult, SearchResult, DEFAULT_SEARCH_LIMIT
+from nuanced.lib.federation import FederatedGraph
+
+
+class FederatedCodeGraph(CodeGraph):
+    @classmethod
+    def load(cls, directory=str) -> CodeGraphResult:
+        errors = []
+        code_graph = None
+        dir_path = Path(directory)
+        file_paths = sorted(dir_path.glob(f"**/{cls.NUANCED_DIRNAME}/{cls.NUANCED_GRAPH_FILENAME}"))
+
+        if len(file_paths) == 0:
+            error = FileNotFoundError(f"Nuanced Graph not found in {os.path.abspath(directory)}")
+            errors.append(error)
+        else:
+            members = [CodeGraph(graph=None, nuanced_dirpath=os.path.abspath(os.path.dirname(fp))) for fp in file_paths]
+            code_graph = cls(members=members)
+
+        return CodeGraphResult(code_graph=code_graph, errors=errors)
+
+    def __init__(self, members: list[CodeGraph]) -> None:
+        super().__init__(graph=FederatedGraph(members))
+        self.members = members
+
+    def close(self) -> None:
+        super().close()
+
+        for member in self.members:
+            member.close()
+
+    def search(self, query: str, limit: int=DEFAULT_SEARCH_LIMIT) -> SearchResult:
+        matches = []
+
+        for member in self.members:
+            result = member.search(query, limit=limit)
+
+            if len(result.errors) > 0:
+                return result
+
+            matches.extend(result.result)
+
+        matches.sort(key=lambda m: (-m["score"], len(m["name"]), m["name"]))
+
+        return SearchResult(errors=[], result=matches[:limit])
+
+    def _node_keys_for_filepath(self, filepath: str) -> list[str]:
+        member = self.graph.member_for_filepath(filepath)
+
+        if member is None:
+            return []
+
+        return member._node_keys_for_filepath(filepath)
@@ -0,0 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+import os
+import threading
+from nuanced.code_graph import CodeGraph, CodeGraphResult, EnrichmentResult
+from nuanced.lib import call_graph, importance, reachability
+from nuanced.lib.source_reader import SourceReader
+
+
+# Indexes are built once in the constructor and never modified: node attributes are stored column-wise
+# in tuples and calls as an integer adjacency, so queries only write to state they allocate themselves.
+# Importance scores are the one exception, computed under a lock by the first ranked query
+class FrozenCodeGraph():
+    @classmethod
+    def load(cls, directory=str) -> CodeGraphResult:
+        result = CodeGraph.load(directory=directory)
+
+        if len(result.errors) > 0:
+            return result
+
+        return CodeGraphResult(code_graph=cls.from_code_graph(result.code_graph), errors=[])
+
+    @classmethod
+    def from_code_graph(cls, code_graph: CodeGraph) -> "FrozenCodeGraph":
+        return cls(code_graph.graph, metadata=code_graph.metadata)
+
+    def __init__(self, graph: dict, *, metadata: dict | None=None) -> None:
+        self._graph = _frozen(graph)
+        self._metadata = _frozen(metadata or {})
+        self._node_keys = tuple(self._graph)
+        self._filepaths = tuple(n.get("filepath") for n in self._graph.values())
+        self._linenos = tuple(n.get("lineno") for n in self._graph.values())
+        self._end_linenos = tuple(n.get("end_lineno") for n in self._graph.values())
+        self._callees = tuple(n.get("callees", ()) for n in self._graph.values())
+        self._callees_without_builtins = tuple(
+            tuple(c for c in callees if not c.startswith(call_graph.BUILTIN_FUNCTION_PREFIX))
+            for callees in self._callees
+        )
+        self._indptr, self._indices = reachability.csr_adjacency(self._graph, list(self._node_keys))
+        self._importance = None
+        self._importance_lock = threading.Lock()
+        node_ids_by_filepath = {}
+
+        for node_id, filepath in enumerate(self._filepaths):
+            node_ids_by_filepath.setdefault(filepath, []).append(node_id)
+
+        self._node_ids_by_filepath = MappingProxyType({f: tuple(ids) for f, ids in node_ids_by_filepath.items()})
+
+    @property
+    def graph(self) -> MappingProxyType:
+        return self._graph
+
+    @property
+    def metadata(self) -> MappingProxyType:
+        return self._metadata
+
+    def enrich(
+        self,
+        file_path: str,
+        function_name: str,
+        include_builtins: bool=False,
+        include_source: bool=False,
+        max_nodes: int | None=None,
+        sort_by_importance: bool=False,
+    ) -> EnrichmentResult:
+        if max_nodes is not None and max_nodes < 1:
+            error = ValueError(f"max_nodes must be a positive integer, got {max_nodes}")
+            return EnrichmentResult(errors=[error], result=None)
+
+        node_ids = self._node_ids_by_filepath.get(os.path.abspath(file_path), ())
+        entrypoint_node_ids = [i for i in node_ids if self._node_keys[i].endswith(function_name)]
+
+        if len(entrypoint_node_ids) > 1:
+            entrypoint_node_keys = ", ".join(self._node_keys[i] for i in entrypoint_node_ids)
+            error = ValueError(f"Multiple definitions for {function_name} found in {file_path}: {entrypoint_node_keys}")
+            return EnrichmentResult(errors=[error], result=None)
+
+        if len(entrypoint_node_ids) == 0:
+            return EnrichmentResult(errors=[], result=None)
+
+        subgraph_node_ids = self._reachable_node_ids(entrypoint_node_ids[0])
+
+        if max_nodes is not None or sort_by_importance:
+            entrypoint_node_id, *callee_node_ids = subgraph_node_ids
+            node_importance = self._node_importance()
+            callee_node_ids.sort(key=lambda i: (-node_importance[i], self._node_keys[i]))
+            subgraph_node_ids = [entrypoint_node_id, *callee_node_ids][:max_nodes]
+
+        enriched_subgraph = {}
+
+        for node_id in subgraph_node_ids:
+            enriched_node_attrs = {
+                "filepath": self._filepaths[node_id],
+                "callees": list(self._callees[node_id] if include_builtins else self._callees_without_builtins[node_id]),
+                "lineno": self._linenos[node_id],
+                "end_lineno": self._end_linenos[node_id],
+            }
+
+            if max_nodes is not None or sort_by_importance:
+                enriched_node_attrs[importance.IMPORTANCE_ATTR] = node_importance[node_id]
+
+            enriched_subgraph[self._node_keys[node_id]] = enriched_node_attrs
+
+        if include_source:
+            _attach_source(enriched_subgraph)
+
+        return EnrichmentResult(errors=[], result=enriched_subgraph)
+
+    def enrich_concurrent(
+        self,
+        queries: list[tuple[str, str]],
+        *,
+        max_workers: int | None=None,
+        **enrich_kwargs,
+    ) -> list[EnrichmentResult]:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda q: self.enrich(*q, **enrich_kwargs), queries))
+
+    def _node_importance(self) -> tuple[float, ...]:
+        with self._importance_lock:
+            if self._importance is None:
+                scores = importance.scores(self._graph)
+                self._importance = tuple(scores.get(k, 0.0) for k in self._node_keys)
+
+        return self._importance
+
+    def _reachable_node_ids(self, entrypoint_node_id: int) -> list[int]:
+        visited = bytearray(len(self._node_keys))
+        visited[entrypoint_node_id] = 1
+        node_ids = [entrypoint_node_id]
+        index = 0
+
+        while index < len(node_ids):
+            node_id = node_ids[index]
+            index += 1
+
+            for callee_node_id in self._indices[self._indptr[node_id]:self._indptr[node_id + 1]]:
+                if not visited[callee_node_id]:
+                    visited[callee_node_id] = 1
+                    node_ids.append(callee_node_id)
+
+        return node_ids
+
+
+# A reader per call keeps the memory maps out of shared state
+def _attach_source(enriched_subgraph: dict) -> None:
+    node_names_by_filepath = {}
+
+    for node_name, node_attrs in enriched_subgraph.items():
+        node_names_by_filepath.setdefault(node_attrs["filepath"], []).append(node_name)
+
+    with SourceReader() as source_reader:
+        for filepath, node_names in node_names_by_filepath.items():
+            spans = [(enriched_subgraph[n]["lineno"], enriched_subgraph[n]["end_lineno"]) for n in node_names]
+            sources = source_reader.read_spans(filepath, spans)
+
+            for node_name, source in zip(node_names, sources):
+                enriched_subgraph[node_name]["source"] = source
+
+def _frozen(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _frozen(v) for k, v in value.items()})
+
+    if isinstance(value, list):
+        return tuple(_frozen(v) for v in value)
+
+    return value
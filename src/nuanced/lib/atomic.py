@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def write_atomic(path: str, data: str | bytes) -> None:
+    dirpath = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=dirpath,
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp",
+    )
+
+    try:
+        with os.fdopen(file_descriptor, "wb") as temporary_file:
+            os.chmod(temporary_path, _file_mode(path))
+            temporary_file.write(data.encode("utf-8") if isinstance(data, str) else data)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+
+    _fsync_directory(dirpath)
+
+@contextmanager
+def exclusive_lock(path: str):
+    file_descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    try:
+        if fcntl:
+            fcntl.flock(file_descriptor, fcntl.LOCK_EX)
+
+        yield
+    finally:
+        if fcntl:
+            fcntl.flock(file_descriptor, fcntl.LOCK_UN)
+
+        os.close(file_descriptor)
+
+def _file_mode(path: str) -> int:
+    try:
+        return os.stat(path).st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+
+        return 0o666 & ~umask
+
+def _fsync_directory(dirpath: str) -> None:
+    try:
+        directory_descriptor = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(directory_descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_descriptor)
@@ -0,0 +1,73 @@
+import io
+import json
+import tarfile
+import time
+from nuanced.lib import git
+
+BUNDLE_VERSION = 1
+MANIFEST_FILENAME = "nuanced-bundle.json"
+
+
+def bundle_filename(commit: str) -> str:
+    return f"nuanced-{commit}.tar.gz"
+
+def current_commit(path: str) -> str | None:
+    return git.rev_parse(path, "HEAD")
+
+# The commit a graph of the working tree can be labelled with, None when the tree has uncommitted changes
+def clean_commit(path: str) -> str | None:
+    commit = current_commit(path)
+
+    if commit is None or git.is_dirty(path):
+        return None
+
+    return commit
+
+def write(bundle_path: str, commit: str, files: dict[str, bytes]) -> dict:
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "commit": commit,
+        "files": sorted(files),
+    }
+    members = {MANIFEST_FILENAME: json.dumps(manifest).encode("utf-8"), **files}
+    modified_at = int(time.time())
+
+    with tarfile.open(bundle_path, "w:gz") as bundle_file:
+        for name, data in members.items():
+            member = tarfile.TarInfo(name)
+            member.size = len(data)
+            member.mtime = modified_at
+            bundle_file.addfile(member, io.BytesIO(data))
+
+    return manifest
+
+def read(bundle_path: str) -> tuple[dict, dict[str, bytes]]:
+    try:
+        return _read(bundle_path)
+    except (tarfile.TarError, EOFError) as error:
+        raise ValueError(f"{bundle_path} is not a valid nuanced bundle: {error}")
+
+def _read(bundle_path: str) -> tuple[dict, dict[str, bytes]]:
+    files = {}
+
+    with tarfile.open(bundle_path, "r:gz") as bundle_file:
+        try:
+            manifest = json.load(bundle_file.extractfile(MANIFEST_FILENAME))
+        except KeyError:
+            raise ValueError(f"{bundle_path} is not a nuanced bundle: {MANIFEST_FILENAME} not found")
+
+        if manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported nuanced bundle version {manifest.get('version')} in {bundle_path}")
+
+        for name in manifest["files"]:
+            try:
+                member = bundle_file.getmember(name)
+            except KeyError:
+                raise ValueError(f"Missing member {name} in nuanced bundle {bundle_path}")
+
+            if not member.isfile():
+                raise ValueError(f"Invalid member {name} in nuanced bundle {bundle_path}")
+
+            files[name] = bundle_file.extractfile(member).read()
+
+    return manifest, files
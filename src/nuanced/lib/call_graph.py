@@ -1,61 +1,389 @@
+from collections import namedtuple
 from jarviscg import formats
 from jarviscg.core import CallGraphGenerator
+from jarviscg.processing.extProcessor import ExtProcessor
+from nuanced.lib.progress import ProgressTracker
 from nuanced.lib.utils import grouped_by_directory, grouped_by_package
 import os
+import sys
 
 
 BUILTIN_FUNCTION_PREFIX = "<builtin>"
 
-def generate(entry_points: list, **kwargs) -> dict:
-    graph = {}
+PACKAGE_GROUP = "package"
+MODULES_GROUP = "modules"
+
+ANALYSIS_LOADER_MODULE = "jarviscg.machinery.imports"
+
+CallGraphGroup = namedtuple("CallGraphGroup", ["kind", "dir_path", "file_paths"])
+
+# jarviscg options per precision level: coarse leaves out edges to modules and external definitions for a
+# smaller graph at the same analysis cost, precise follows imports into dependencies to resolve calls made through them
+PRECISION_LEVELS = {
+    "coarse": {"decy": False, "precision": True},
+    "default": {"decy": False, "precision": False},
+    "precise": {"decy": True, "precision": False},
+}
+DEFAULT_PRECISION = "default"
+
+
+def generate(
+    entry_points: list,
+    max_chunk_files: int | None=None,
+    package_path: str | None=None,
+    progress=None,
+    order: list[int] | None=None,
+    precision: str=DEFAULT_PRECISION,
+    **kwargs,
+) -> dict:
+    all_groups = groups(entry_points)
+    group_indices = order if order is not None else range(len(all_groups))
+    indexed_graphs = _generate_indexed(all_groups, group_indices, max_chunk_files, package_path, progress, precision)
+
+    return combine([(all_groups[i], graph) for i, graph in sorted(indexed_graphs, key=lambda ig: ig[0])])
+
+def generate_groups(
+    entry_points: list,
+    *,
+    group_indices: list[int],
+    package_path: str,
+    max_chunk_files: int | None=None,
+    progress=None,
+    precision: str=DEFAULT_PRECISION,
+) -> list[dict]:
+    all_groups = groups(entry_points)
+
+    return [
+        {
+            "index": group_index,
+            "kind": all_groups[group_index].kind,
+            "dir_path": os.path.relpath(all_groups[group_index].dir_path, package_path),
+            "graph": graph,
+        }
+        for group_index, graph in _generate_indexed(all_groups, group_indices, max_chunk_files, package_path, progress, precision)
+    ]
+
+def generate_shard(
+    entry_points: list,
+    *,
+    shard_index: int,
+    shard_count: int,
+    package_path: str,
+    max_chunk_files: int | None=None,
+    progress=None,
+    precision: str=DEFAULT_PRECISION,
+) -> list[dict]:
+    return generate_groups(
+        entry_points,
+        group_indices=shard_group_indices(groups(entry_points), shard_index, shard_count, root=package_path),
+        package_path=package_path,
+        max_chunk_files=max_chunk_files,
+        progress=progress,
+        precision=precision,
+    )
+
+def groups(entry_points: list) -> list[CallGraphGroup]:
     files_by_package_dir = grouped_by_package(entry_points)
     flattened = set([item for sublist in files_by_package_dir.values() for item in sublist])
-    modules_by_dir = grouped_by_directory(list(set(entry_points).difference(flattened)))
+    modules_by_dir = grouped_by_directory([p for p in entry_points if p not in flattened])
+
+    return [CallGraphGroup(PACKAGE_GROUP, d, f) for d, f in files_by_package_dir.items()] + \
+        [CallGraphGroup(MODULES_GROUP, d, f) for d, f in modules_by_dir.items()]
+
+def generate_group(
+    group: CallGraphGroup,
+    max_chunk_files: int | None=None,
+    root: str | None=None,
+    precision: str=DEFAULT_PRECISION,
+) -> dict:
+    root = root or os.getcwd()
 
-    for dir_path, file_paths in files_by_package_dir.items():
-        package_call_graph = _generate_package_call_graph(
-            file_paths=file_paths,
-            package_dir_path=dir_path
+    if group.kind == MODULES_GROUP:
+        return _generate_modules_call_graph(file_paths=group.file_paths, root=root, precision=precision)
+
+    if max_chunk_files and len(group.file_paths) > max_chunk_files:
+        return _generate_chunked_package_call_graph(
+            file_paths=group.file_paths,
+            package_dir_path=group.dir_path,
+            max_chunk_files=max_chunk_files,
+            root=root,
+            precision=precision,
         )
+
+    return _generate_package_call_graph(
+        file_paths=group.file_paths,
+        package_dir_path=group.dir_path,
+        root=root,
+        precision=precision,
+    )
+
+def combine(group_graphs: list[tuple[CallGraphGroup, dict]]) -> dict:
+    graph = {}
+    package_group_graphs = [(g, gg) for g, gg in group_graphs if g.kind == PACKAGE_GROUP]
+    modules_group_graphs = [(g, gg) for g, gg in group_graphs if g.kind == MODULES_GROUP]
+
+    for _group, package_call_graph in package_group_graphs:
         graph.update(package_call_graph)
 
-    for file_paths in modules_by_dir.values():
-        modules_call_graph = _generate_modules_call_graph(file_paths=file_paths)
+    for _group, modules_call_graph in modules_group_graphs:
         modules_call_graph.update(graph)
         graph = modules_call_graph
 
     return graph
 
-def _generate_package_call_graph(*, file_paths=list[str], package_dir_path: str) -> dict:
+def shard_group_indices(all_groups: list[CallGraphGroup], shard_index: int, shard_count: int, *, root: str) -> list[int]:
+    shard_sizes = [0] * shard_count
+    indices_by_shard = [[] for _ in range(shard_count)]
+    ordered_group_indices = sorted(
+        range(len(all_groups)),
+        key=lambda i: (-len(all_groups[i].file_paths), os.path.relpath(all_groups[i].dir_path, root), all_groups[i].kind),
+    )
+
+    for group_index in ordered_group_indices:
+        smallest_shard = min(range(shard_count), key=lambda s: (shard_sizes[s], s))
+        shard_sizes[smallest_shard] += len(all_groups[group_index].file_paths)
+        indices_by_shard[smallest_shard].append(group_index)
+
+    return sorted(indices_by_shard[shard_index - 1])
+
+def relativized(graph: dict, root: str) -> dict:
+    root_prefix = root.rstrip(os.sep) + os.sep
+    relative_graph = {}
+
+    for node_key, node_attrs in graph.items():
+        filepath = node_attrs.get("filepath")
+
+        if filepath and filepath.startswith(root_prefix):
+            node_attrs = {**node_attrs, "filepath": filepath[len(root_prefix):]}
+
+        relative_graph[node_key] = node_attrs
+
+    return relative_graph
+
+def resolve_filepaths(graph: dict, root: str) -> dict:
+    for node_attrs in graph.values():
+        filepath = node_attrs.get("filepath")
+
+        if filepath and not os.path.isabs(filepath):
+            node_attrs["filepath"] = os.path.join(root, filepath)
+
+    return graph
+
+def module_names(graph: dict) -> list[str]:
+    return sorted(set(module_names_by_filepath(graph).values()))
+
+def module_names_by_filepath(graph: dict) -> dict[str, str]:
+    module_names = {}
+
+    for node_name, node_attrs in graph.items():
+        filepath = node_attrs.get("filepath")
+        module_name = module_names.get(filepath)
+
+        if module_name is None or len(node_name) < len(module_name):
+            module_names[filepath] = node_name
+
+    return module_names
+
+def chunked(file_paths: list[str], dir_path: str, max_chunk_files: int) -> list[list[str]]:
+    if len(file_paths) <= max_chunk_files:
+        return [file_paths]
+
+    files_by_subdir = {}
+
+    for path in file_paths:
+        relative_parts = path[len(dir_path) + 1:].split("/")
+        subdir = relative_parts[0] if len(relative_parts) > 1 else ""
+        files_by_subdir.setdefault(subdir, []).append(path)
+
+    chunks = []
+    chunk = []
+
+    for subdir in sorted(files_by_subdir):
+        subdir_file_paths = files_by_subdir[subdir]
+
+        if len(subdir_file_paths) > max_chunk_files:
+            if subdir:
+                chunks.extend(chunked(subdir_file_paths, f"{dir_path}/{subdir}", max_chunk_files))
+            else:
+                sorted_file_paths = sorted(subdir_file_paths)
+                chunks.extend(sorted_file_paths[i:i + max_chunk_files] for i in range(0, len(sorted_file_paths), max_chunk_files))
+        elif len(chunk) + len(subdir_file_paths) > max_chunk_files:
+            chunks.append(chunk)
+            chunk = list(subdir_file_paths)
+        else:
+            chunk.extend(subdir_file_paths)
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+def stitched(graph: dict) -> dict:
+    node_keys_by_name = {}
+    unresolved = set()
+
+    for node_attrs in graph.values():
+        unresolved.update(c for c in node_attrs["callees"] if c not in graph and not c.startswith(BUILTIN_FUNCTION_PREFIX))
+
+    # A class called from another chunk is a callee by its own name, while the chunk defining it has its __init__
+    constructor_names = {f"{name}.__init__": name for name in unresolved}
+
+    for node_key in graph:
+        segments = node_key.split(".")
+
+        for i in range(1, len(segments) - 1):
+            name = ".".join(segments[i:])
+
+            if name in unresolved or name in constructor_names:
+                node_keys_by_name.setdefault(name, set()).add(node_key)
+
+    resolved = {name: node_keys.pop() for name, node_keys in node_keys_by_name.items() if len(node_keys) == 1}
+    # Modules list the classes they define, which are not nodes themselves
+    classes = {c for node_key, node_attrs in graph.items() for c in node_attrs["callees"] if c in unresolved and c.rsplit(".", 1)[0] == node_key}
+    constructors = {}
+
+    for constructor_name, name in constructor_names.items():
+        constructor = constructor_name if constructor_name in graph else resolved.get(constructor_name)
+
+        if name not in resolved and constructor is not None:
+            constructors[name] = constructor
+
+    for node_key, node_attrs in graph.items():
+        callees = []
+
+        for callee in node_attrs["callees"]:
+            constructor = constructors.get(callee)
+
+            # The scope defining a class lists the class itself, as it does in an unchunked graph
+            if constructor is not None and constructor.rsplit(".", 2)[0] != node_key:
+                callee = constructor
+            elif callee in classes and callee.rsplit(".", 1)[0] != node_key:
+                # Calls to a class without __init__ have no edge in an unchunked graph either
+                continue
+            else:
+                callee = resolved.get(callee, callee)
+
+            if callee not in callees:
+                callees.append(callee)
+
+        node_attrs["callees"] = callees
+
+    return graph
+
+def _generate_indexed(
+    all_groups: list[CallGraphGroup],
+    group_indices: list[int],
+    max_chunk_files: int | None,
+    root: str | None,
+    progress,
+    precision: str=DEFAULT_PRECISION,
+) -> list[tuple[int, dict]]:
+    tracker = ProgressTracker([all_groups[i] for i in group_indices], progress, root=root)
+    indexed_graphs = []
+
+    for group_index in group_indices:
+        group = all_groups[group_index]
+        tracker.group_started(group)
+        indexed_graphs.append((group_index, generate_group(group, max_chunk_files=max_chunk_files, root=root, precision=precision)))
+        tracker.group_finished(group)
+
+    return indexed_graphs
+
+def _generate_chunked_package_call_graph(
+    *,
+    file_paths=list[str],
+    package_dir_path: str,
+    max_chunk_files: int,
+    root: str,
+    precision: str=DEFAULT_PRECISION,
+) -> dict:
+    graph = {}
+    package_init_path = f"{package_dir_path}/__init__.py"
+
+    for chunk in chunked(file_paths, package_dir_path, max_chunk_files):
+        if package_init_path in file_paths and package_init_path not in chunk:
+            chunk = [package_init_path] + chunk
+
+        chunk_call_graph = _generate_package_call_graph(
+            file_paths=chunk,
+            package_dir_path=package_dir_path,
+            root=root,
+            precision=precision,
+        )
+
+        for node_key, node_attrs in chunk_call_graph.items():
+            if node_key in graph:
+                callees = graph[node_key]["callees"]
+                callees.extend(c for c in node_attrs["callees"] if c not in callees)
+            else:
+                graph[node_key] = node_attrs
+
+    return stitched(graph)
+
+def _generate_package_call_graph(*, file_paths=list[str], package_dir_path: str, root: str, precision: str=DEFAULT_PRECISION) -> dict:
     package_path_parts = package_dir_path.split(os.sep)
     package_parent_path = os.sep.join(package_path_parts[0:-1])
     call_graph = CallGraphGenerator(
         file_paths,
         package_parent_path,
-        decy=None,
-        precision=None,
         moduleEntry=None,
+        **PRECISION_LEVELS[precision],
     )
-    call_graph.analyze()
-    graph_root = os.getcwd()
-    path_from_cwd_to_package_dir = os.path.relpath(package_dir_path, graph_root)
+    _analyze(call_graph)
+    path_from_root_to_package_dir = os.path.relpath(package_dir_path, root)
     scope_prefix = None
 
-    if path_from_cwd_to_package_dir.count(os.sep) > 0:
-        scope_prefix = path_from_cwd_to_package_dir.replace(os.sep, ".")
+    if path_from_root_to_package_dir.count(os.sep) > 0:
+        scope_prefix = path_from_root_to_package_dir.replace(os.sep, ".")
 
     formatter = formats.Nuanced(call_graph, scope_prefix=scope_prefix)
-    return formatter.generate()
+    return _analyzed_nodes(formatter.generate(), file_paths, precision)
 
-def _generate_modules_call_graph(*, file_paths=list[str]) -> dict:
+def _generate_modules_call_graph(*, file_paths=list[str], root: str, precision: str=DEFAULT_PRECISION) -> dict:
     call_graph = CallGraphGenerator(
         file_paths,
-        os.getcwd(),
-        decy=None,
-        precision=None,
+        root,
         moduleEntry=None,
+        **PRECISION_LEVELS[precision],
     )
-    call_graph.analyze()
+    _analyze(call_graph)
 
     formatter = formats.Nuanced(call_graph)
-    return formatter.generate()
+    return _analyzed_nodes(formatter.generate(), file_paths, precision)
+
+# Following imports adds nodes for the dependencies' own definitions, calls into them stay as callees
+def _analyzed_nodes(graph: dict, file_paths: list[str], precision: str) -> dict:
+    if not PRECISION_LEVELS[precision]["decy"]:
+        return graph
+
+    file_paths = set(file_paths)
+
+    return {k: v for k, v in graph.items() if v.get("filepath") in file_paths}
+
+def _analyze(call_graph: CallGraphGenerator) -> None:
+    module_names_before = set(sys.modules)
+    _reset_shared_defaults()
+
+    try:
+        call_graph.analyze()
+    finally:
+        if hasattr(call_graph.import_manager, "old_path_hooks"):
+            call_graph.remove_import_hooks()
+
+        _unload_analyzed_modules(module_names_before)
+
+# jarviscg's processor keeps its visited scopes in a mutable default argument, so scopes visited by an
+# earlier analysis in the same process are skipped by later ones and results depend on which groups ran before
+def _reset_shared_defaults() -> None:
+    for default in ExtProcessor.__init__.__defaults__ or ():
+        if isinstance(default, (list, set, dict)):
+            default.clear()
+
+# Modules loaded by jarviscg stay in sys.modules and are then resolved differently by later analyses
+def _unload_analyzed_modules(module_names_before: set[str]) -> None:
+    for module_name in set(sys.modules) - module_names_before:
+        module_spec = getattr(sys.modules[module_name], "__spec__", None)
+        loader = getattr(module_spec, "loader", None)
+
+        if type(loader).__module__ == ANALYSIS_LOADER_MODULE:
+            del sys.modules[module_name]
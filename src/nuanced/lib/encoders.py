@@ -0,0 +1,85 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DEFAULT_FORMAT = "json"
+BINARY_FORMATS = {"msgpack"}
+
+
+def encode(result: dict, format: str=DEFAULT_FORMAT) -> bytes:
+    encoder = ENCODERS.get(format)
+
+    if not encoder:
+        raise ValueError(f"Unsupported format \"{format}\", expected one of: {', '.join(ENCODERS)}")
+
+    return encoder(result)
+
+def register_encoder(format: str, encoder, *, binary: bool=False) -> None:
+    ENCODERS[format] = encoder
+
+    if binary:
+        BINARY_FORMATS.add(format)
+    else:
+        BINARY_FORMATS.discard(format)
+
+def compact(result: dict) -> dict:
+    files = []
+    file_ids = {}
+    nodes = {}
+
+    for node_name, node_attrs in result.items():
+        filepath = node_attrs.get("filepath")
+
+        if filepath not in file_ids:
+            file_ids[filepath] = len(files)
+            files.append(filepath)
+
+        compact_node_attrs = {"file": file_ids[filepath]}
+        compact_node_attrs.update((k, v) for k, v in node_attrs.items() if k != "filepath")
+        nodes[node_name] = compact_node_attrs
+
+    return {"files": files, "nodes": nodes}
+
+def expand(compact_result: dict) -> dict:
+    files = compact_result["files"]
+    result = {}
+
+    for node_name, compact_node_attrs in compact_result["nodes"].items():
+        node_attrs = {"filepath": files[compact_node_attrs["file"]]}
+        node_attrs.update((k, v) for k, v in compact_node_attrs.items() if k != "file")
+        result[node_name] = node_attrs
+
+    return result
+
+def encode_json(result: dict) -> bytes:
+    if orjson:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2)
+
+    return json.dumps(result, indent=2).encode("utf-8")
+
+def encode_compact(result: dict) -> bytes:
+    if orjson:
+        return orjson.dumps(compact(result))
+
+    return json.dumps(compact(result), separators=(",", ":")).encode("utf-8")
+
+def encode_msgpack(result: dict) -> bytes:
+    if not msgpack:
+        raise ModuleNotFoundError("msgpack format requires the msgpack package, install it with: pip install 'nuanced[msgpack]'")
+
+    return msgpack.packb(compact(result), use_bin_type=True)
+
+
+ENCODERS = {
+    "json": encode_json,
+    "compact": encode_compact,
+    "msgpack": encode_msgpack,
+}
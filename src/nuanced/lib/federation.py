@@ -0,0 +1,90 @@
+from collections.abc import Mapping
+import os
+
+
+class FederatedGraph(Mapping):
+    def __init__(self, members: list) -> None:
+        self.members = members
+        self._owners = {}
+        self._members_by_module_name = None
+        self._unrouted_members = None
+
+    def __getitem__(self, node_key: str) -> dict:
+        owner = self.owner(node_key)
+
+        if owner is None:
+            raise KeyError(node_key)
+
+        return owner.graph[node_key]
+
+    def __contains__(self, node_key: object) -> bool:
+        return isinstance(node_key, str) and self.owner(node_key) is not None
+
+    def __iter__(self):
+        for member in self.members:
+            yield from member.graph
+
+    def __len__(self) -> int:
+        return sum(len(member.graph) for member in self.members)
+
+    def member_for_filepath(self, filepath: str):
+        candidates = [m for m in self.members if _is_within(filepath, m.root)]
+
+        if not candidates:
+            return None
+
+        return max(candidates, key=lambda m: len(m.root))
+
+    def owner(self, node_key: str):
+        if node_key in self._owners:
+            return self._owners[node_key]
+
+        owner = None
+        loaded_members = [m for m in self.members if m.is_loaded]
+
+        for member in loaded_members:
+            if node_key in member.graph:
+                owner = member
+                break
+
+        if owner is None:
+            for member in self._candidate_members(node_key):
+                if not member.is_loaded and node_key in member.graph:
+                    owner = member
+                    break
+
+        self._owners[node_key] = owner
+
+        return owner
+
+    def _candidate_members(self, node_key: str) -> list:
+        if self._members_by_module_name is None:
+            self._route_members()
+
+        candidates = []
+        segments = node_key.split(".")
+
+        for i in range(len(segments), 0, -1):
+            for member in self._members_by_module_name.get(".".join(segments[:i]), []):
+                if member not in candidates:
+                    candidates.append(member)
+
+        return candidates + [m for m in self._unrouted_members if m not in candidates]
+
+    def _route_members(self) -> None:
+        self._members_by_module_name = {}
+        self._unrouted_members = []
+
+        for member in self.members:
+            module_names = member.metadata.get("modules")
+
+            if module_names is None:
+                self._unrouted_members.append(member)
+                continue
+
+            for module_name in module_names:
+                self._members_by_module_name.setdefault(module_name, []).append(member)
+
+
+def _is_within(filepath: str, root: str) -> bool:
+    return filepath == root or filepath.startswith(root.rstrip(os.sep) + os.sep)
@@ -0,0 +1,94 @@
+from collections import namedtuple
+import subprocess
+import threading
+from typing import Iterator
+
+TreeEntry = namedtuple("TreeEntry", ["mode", "object_type", "object_id", "path"])
+
+
+def rev_parse(path: str, rev: str="HEAD") -> str | None:
+    output = _run(path, ["rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"])
+
+    if output is None:
+        return None
+
+    return output.strip() or None
+
+# Only Python files are analyzed, so other changes, like the untracked .nuanced directory, don't count
+def is_dirty(path: str) -> bool:
+    output = _run(path, ["status", "--porcelain", "--untracked-files=all", "--", "*.py"])
+
+    return output is None or output.strip() != ""
+
+def rev_list(path: str, rev: str, *, max_count: int) -> list[str]:
+    output = _run(path, ["rev-list", f"--max-count={max_count}", rev, "--"])
+
+    return output.split() if output is not None else []
+
+# Paths are relative to path and limited to its subtree, as git does when run from a subdirectory
+def ls_tree(path: str, rev: str) -> list[TreeEntry] | None:
+    output = _run(path, ["ls-tree", "-r", "-z", rev])
+
+    if output is None:
+        return None
+
+    entries = []
+
+    for record in output.split("\0"):
+        if record:
+            attrs, entry_path = record.split("\t", 1)
+            entries.append(TreeEntry(*attrs.split(), entry_path))
+
+    return entries
+
+def cat_file(path: str, object_ids: list[str]) -> Iterator[tuple[str, bytes]]:
+    process = subprocess.Popen(
+        ["git", "-C", path, "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    writer = threading.Thread(target=_write_object_ids, args=(process.stdin, object_ids), daemon=True)
+    writer.start()
+
+    try:
+        for object_id in object_ids:
+            header = process.stdout.readline().decode("utf-8").split()
+
+            if len(header) != 3:
+                raise ValueError(f"Cannot read git object {object_id} in {path}")
+
+            data = process.stdout.read(int(header[2]))
+            process.stdout.read(1)
+
+            yield object_id, data
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+        writer.join()
+
+def _write_object_ids(stdin, object_ids: list[str]) -> None:
+    try:
+        for object_id in object_ids:
+            stdin.write(f"{object_id}\n".encode("utf-8"))
+
+        stdin.close()
+    except (BrokenPipeError, ValueError):
+        pass
+
+def _run(path: str, args: list[str]) -> str | None:
+    try:
+        completed_process = subprocess.run(
+            ["git", "-C", path, *args],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+
+    if completed_process.returncode != 0:
+        return None
+
+    return completed_process.stdout
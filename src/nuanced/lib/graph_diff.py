@@ -0,0 +1,144 @@
+from collections import namedtuple
+from contextlib import contextmanager
+import gc
+import hashlib
+import json
+from nuanced.lib.history import VOLATILE_ATTRS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NodeDigest = namedtuple("NodeDigest", ["content_hash", "filepath", "lineno", "end_lineno", "callees"])
+
+
+def diff_files(old_graph_path: str, new_graph_path: str) -> dict:
+    # Each graph is reduced to its digest before the next is loaded, so only one full graph is in memory at a time
+    with _cyclic_gc_paused():
+        old_nodes = digest(_load(old_graph_path))
+        new_nodes = digest(_load(new_graph_path))
+
+        return diff(old_nodes, new_nodes)
+
+def digest(graph: dict) -> dict[str, NodeDigest]:
+    return {
+        node_key: NodeDigest(
+            content_hash(node_attrs),
+            node_attrs.get("filepath"),
+            node_attrs.get("lineno"),
+            node_attrs.get("end_lineno"),
+            node_attrs.get("callees", []),
+        )
+        for node_key, node_attrs in graph.items()
+    }
+
+def content_hash(node_attrs: dict) -> bytes:
+    stable_attrs = dict(node_attrs)
+
+    for volatile_attr in VOLATILE_ATTRS:
+        stable_attrs.pop(volatile_attr, None)
+
+    if orjson:
+        encoded_attrs = orjson.dumps(stable_attrs, option=orjson.OPT_SORT_KEYS)
+    else:
+        encoded_attrs = json.dumps(stable_attrs, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    return hashlib.blake2b(encoded_attrs, digest_size=16).digest()
+
+def diff(old_nodes: dict[str, NodeDigest], new_nodes: dict[str, NodeDigest]) -> dict:
+    added, removed, moved = [], [], []
+    old_edges, new_edges = [], []
+
+    for node_key, new_node in new_nodes.items():
+        old_node = old_nodes.get(node_key)
+
+        if old_node is None:
+            added.append(_function(node_key, new_node))
+            new_edges.extend(_edges(node_key, new_node))
+        elif old_node.content_hash != new_node.content_hash:
+            # Nodes with equal hashes have equal callees, so only changed nodes contribute edges to the merge
+            old_edges.extend(_edges(node_key, old_node))
+            new_edges.extend(_edges(node_key, new_node))
+
+            if _span(old_node) != _span(new_node):
+                moved.append({
+                    "name": node_key,
+                    "old": _span(old_node),
+                    "new": _span(new_node),
+                })
+
+    for node_key, old_node in old_nodes.items():
+        if node_key not in new_nodes:
+            removed.append(_function(node_key, old_node))
+            old_edges.extend(_edges(node_key, old_node))
+
+    old_edges.sort()
+    new_edges.sort()
+    edges_added, edges_removed = merge_edges(old_edges, new_edges)
+
+    return {
+        "summary": {
+            "functions_added": len(added),
+            "functions_removed": len(removed),
+            "functions_moved": len(moved),
+            "edges_added": len(edges_added),
+            "edges_removed": len(edges_removed),
+        },
+        "functions_added": sorted(added, key=lambda f: f["name"]),
+        "functions_removed": sorted(removed, key=lambda f: f["name"]),
+        "functions_moved": sorted(moved, key=lambda f: f["name"]),
+        "edges_added": [{"caller": caller, "callee": callee} for caller, callee in edges_added],
+        "edges_removed": [{"caller": caller, "callee": callee} for caller, callee in edges_removed],
+    }
+
+# One pass over both sorted edge lists, like the merge step of a merge sort
+def merge_edges(old_edges: list[tuple[str, str]], new_edges: list[tuple[str, str]]) -> tuple[list, list]:
+    added, removed = [], []
+    old_index, new_index = 0, 0
+
+    while old_index < len(old_edges) and new_index < len(new_edges):
+        old_edge, new_edge = old_edges[old_index], new_edges[new_index]
+
+        if old_edge == new_edge:
+            old_index += 1
+            new_index += 1
+        elif old_edge < new_edge:
+            removed.append(old_edge)
+            old_index += 1
+        else:
+            added.append(new_edge)
+            new_index += 1
+
+    removed.extend(old_edges[old_index:])
+    added.extend(new_edges[new_index:])
+
+    return added, removed
+
+# Decoded JSON cannot form reference cycles, so collections triggered by the millions of allocations find nothing to free
+@contextmanager
+def _cyclic_gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _load(graph_path: str) -> dict:
+    with open(graph_path, "rb") as graph_file:
+        if orjson:
+            return orjson.loads(graph_file.read())
+
+        return json.load(graph_file)
+
+def _edges(node_key: str, node: NodeDigest) -> list[tuple[str, str]]:
+    return [(node_key, callee) for callee in dict.fromkeys(node.callees)]
+
+def _function(node_key: str, node: NodeDigest) -> dict:
+    return {"name": node_key, **_span(node)}
+
+def _span(node: NodeDigest) -> dict:
+    return {"filepath": node.filepath, "lineno": node.lineno, "end_lineno": node.end_lineno}
@@ -0,0 +1,131 @@
+from collections import Counter
+from nuanced.lib.call_graph import BUILTIN_FUNCTION_PREFIX
+
+DEFAULT_TOP = 10
+DEFAULT_PACKAGE_DEPTH = 1
+
+
+def compute(graph: dict, *, top: int=DEFAULT_TOP, package_depth: int=DEFAULT_PACKAGE_DEPTH) -> dict:
+    fan_in = Counter()
+    fan_out = {}
+    package_sizes = Counter()
+    filepaths = set()
+    edge_count = 0
+    builtin_edge_count = 0
+    unresolved_edge_count = 0
+    unresolved_callees = Counter()
+
+    for node_key, node_attrs in graph.items():
+        callees = node_attrs.get("callees", [])
+        fan_out[node_key] = len(callees)
+        edge_count += len(callees)
+        filepaths.add(node_attrs.get("filepath"))
+        package_sizes[".".join(node_key.split(".")[:package_depth])] += 1
+
+        for callee in callees:
+            if callee in graph:
+                fan_in[callee] += 1
+            elif callee.startswith(BUILTIN_FUNCTION_PREFIX):
+                builtin_edge_count += 1
+            else:
+                unresolved_edge_count += 1
+                unresolved_callees[callee] += 1
+
+    fan_in_counts = [fan_in[node_key] for node_key in graph]
+    sccs = strongly_connected_components(graph)
+    cyclic_sccs = sorted((scc for scc in sccs if len(scc) > 1), key=len, reverse=True)
+
+    return {
+        "nodes": len(graph),
+        "edges": edge_count,
+        "internal_edges": edge_count - builtin_edge_count - unresolved_edge_count,
+        "builtin_edges": builtin_edge_count,
+        "unresolved_edges": unresolved_edge_count,
+        "files": len(filepaths),
+        "fan_in": distribution(fan_in_counts),
+        "fan_out": distribution(list(fan_out.values())),
+        "top_fan_in": [{"name": n, "fan_in": c} for n, c in fan_in.most_common(top)],
+        "top_fan_out": [{"name": n, "fan_out": c} for n, c in Counter(fan_out).most_common(top)],
+        "top_unresolved_callees": [{"name": n, "count": c} for n, c in unresolved_callees.most_common(top)],
+        "cyclic_sccs": len(cyclic_sccs),
+        "largest_sccs": [{"size": len(scc), "nodes": sorted(scc)} for scc in cyclic_sccs[:top]],
+        "packages": dict(package_sizes.most_common()),
+    }
+
+def distribution(values: list[int]) -> dict:
+    if not values:
+        return {"min": 0, "max": 0, "mean": 0, "p50": 0, "p90": 0, "p99": 0}
+
+    values = sorted(values)
+
+    return {
+        "min": values[0],
+        "max": values[-1],
+        "mean": round(sum(values) / len(values), 2),
+        "p50": _percentile(values, 50),
+        "p90": _percentile(values, 90),
+        "p99": _percentile(values, 99),
+    }
+
+def strongly_connected_components(graph: dict) -> list[list[str]]:
+    index_by_node = {}
+    lowlink_by_node = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in graph:
+        if root in index_by_node:
+            continue
+
+        index_by_node[root] = lowlink_by_node[root] = len(index_by_node)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root].get("callees", [])))]
+
+        while work:
+            node, callees = work[-1]
+            descended = False
+
+            for callee in callees:
+                if callee not in graph:
+                    continue
+
+                if callee not in index_by_node:
+                    index_by_node[callee] = lowlink_by_node[callee] = len(index_by_node)
+                    stack.append(callee)
+                    on_stack.add(callee)
+                    work.append((callee, iter(graph[callee].get("callees", []))))
+                    descended = True
+                    break
+                elif callee in on_stack:
+                    lowlink_by_node[node] = min(lowlink_by_node[node], index_by_node[callee])
+
+            if descended:
+                continue
+
+            work.pop()
+
+            if work:
+                parent = work[-1][0]
+                lowlink_by_node[parent] = min(lowlink_by_node[parent], lowlink_by_node[node])
+
+            if lowlink_by_node[node] == index_by_node[node]:
+                component = []
+
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+
+                    if member == node:
+                        break
+
+                components.append(component)
+
+    return components
+
+def _percentile(sorted_values: list[int], percentile: int) -> int:
+    rank = max(1, -(-percentile * len(sorted_values) // 100))
+
+    return sorted_values[rank - 1]
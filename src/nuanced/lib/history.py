@@ -0,0 +1,155 @@
+import json
+import os
+from nuanced.lib import atomic
+from nuanced.lib.importance import IMPORTANCE_ATTR
+
+HISTORY_VERSION = 1
+INDEX_FILENAME = "index.json"
+BASE_FILENAME = "base.json"
+DELTAS_DIRNAME = "deltas"
+SNAPSHOTS_DIRNAME = "snapshots"
+# Every Nth commit is stored in full, so rebuilding a snapshot applies fewer than N deltas
+SNAPSHOT_INTERVAL = 16
+DEFAULT_MAX_ANCESTORS = 10_000
+
+# Derived from the whole graph, so they change on almost every node at every commit
+VOLATILE_ATTRS = (IMPORTANCE_ATTR,)
+
+
+def load_index(history_dirpath: str) -> dict:
+    try:
+        with open(f"{history_dirpath}/{INDEX_FILENAME}", "r") as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return {"version": HISTORY_VERSION, "entries": []}
+
+    if index.get("version") != HISTORY_VERSION:
+        raise ValueError(f"Unsupported graph history version {index.get('version')} in {history_dirpath}")
+
+    return index
+
+def record(history_dirpath: str, commit: str, graph: dict) -> dict | None:
+    index = load_index(history_dirpath)
+    entries = index["entries"]
+    commits = [e["commit"] for e in entries]
+    graph = stable(graph)
+
+    if commit in commits[:-1]:
+        return None
+
+    if commit in commits[-1:]:
+        entries.pop()
+
+    os.makedirs(f"{history_dirpath}/{DELTAS_DIRNAME}", exist_ok=True)
+
+    if len(entries) == 0:
+        atomic.write_atomic(f"{history_dirpath}/{BASE_FILENAME}", json.dumps(graph))
+        entry = {"commit": commit, "delta": None, "snapshot": BASE_FILENAME, "nodes": len(graph)}
+    elif len(entries) % SNAPSHOT_INTERVAL == 0:
+        os.makedirs(f"{history_dirpath}/{SNAPSHOTS_DIRNAME}", exist_ok=True)
+        snapshot_filename = f"{SNAPSHOTS_DIRNAME}/{commit}.json"
+        atomic.write_atomic(f"{history_dirpath}/{snapshot_filename}", json.dumps(graph))
+        entry = {"commit": commit, "delta": None, "snapshot": snapshot_filename, "nodes": len(graph)}
+    else:
+        delta = diff(snapshot(history_dirpath, entries[-1]["commit"], index=index), graph)
+        delta_filename = f"{DELTAS_DIRNAME}/{commit}.json"
+        atomic.write_atomic(f"{history_dirpath}/{delta_filename}", json.dumps(delta))
+        entry = {"commit": commit, "delta": delta_filename, "nodes": len(graph)}
+
+    entries.append(entry)
+    atomic.write_atomic(f"{history_dirpath}/{INDEX_FILENAME}", json.dumps(index))
+
+    return entry
+
+def snapshot(history_dirpath: str, commit: str, *, index: dict | None=None) -> dict | None:
+    entries = (index or load_index(history_dirpath))["entries"]
+    commits = [e["commit"] for e in entries]
+
+    if commit not in commits:
+        return None
+
+    position = commits.index(commit)
+    # Entries recorded before periodic snapshots only have the base graph stored in full
+    start = max(i for i in range(position + 1) if i == 0 or entries[i].get("snapshot"))
+
+    with open(f"{history_dirpath}/{entries[start].get('snapshot', BASE_FILENAME)}", "r") as snapshot_file:
+        graph = json.load(snapshot_file)
+
+    for entry in entries[start + 1:position + 1]:
+        with open(f"{history_dirpath}/{entry['delta']}", "r") as delta_file:
+            apply(graph, json.load(delta_file))
+
+    return graph
+
+def recorded_commit(index: dict, candidates: list[str]) -> str | None:
+    commits = set(e["commit"] for e in index["entries"])
+
+    return next((c for c in candidates if c in commits), None)
+
+def stable(graph: dict) -> dict:
+    return {
+        node_key: {a: v for a, v in node_attrs.items() if a not in VOLATILE_ATTRS}
+        for node_key, node_attrs in graph.items()
+    }
+
+def diff(old_graph: dict, new_graph: dict) -> dict:
+    delta = {
+        "nodes_added": {},
+        "nodes_removed": sorted(k for k in old_graph if k not in new_graph),
+        "nodes_changed": {},
+        "edges_added": {},
+        "edges_removed": {},
+    }
+
+    for node_key, node_attrs in new_graph.items():
+        old_attrs = old_graph.get(node_key)
+
+        if old_attrs is None:
+            delta["nodes_added"][node_key] = node_attrs
+            continue
+
+        attrs = {a: v for a, v in node_attrs.items() if a != "callees"}
+
+        if attrs != {a: v for a, v in old_attrs.items() if a != "callees"}:
+            delta["nodes_changed"][node_key] = attrs
+
+        old_callees = old_attrs.get("callees", [])
+        new_callees = node_attrs.get("callees", [])
+
+        if old_callees == new_callees:
+            continue
+
+        new_callee_set = set(new_callees)
+        old_callee_set = set(old_callees)
+        removed = [c for c in old_callees if c not in new_callee_set]
+        added = [c for c in new_callees if c not in old_callee_set]
+
+        # A reordering cannot be expressed as removals and additions, so replace the callees outright
+        if [c for c in old_callees if c in new_callee_set] + added != new_callees:
+            removed, added = old_callees, new_callees
+
+        if removed:
+            delta["edges_removed"][node_key] = removed
+
+        if added:
+            delta["edges_added"][node_key] = added
+
+    return delta
+
+def apply(graph: dict, delta: dict) -> dict:
+    for node_key in delta["nodes_removed"]:
+        graph.pop(node_key, None)
+
+    for node_key, attrs in delta["nodes_changed"].items():
+        graph[node_key] = {**attrs, "callees": graph[node_key].get("callees", [])}
+
+    for node_key, callees in delta["edges_removed"].items():
+        removed = set(callees)
+        graph[node_key]["callees"] = [c for c in graph[node_key]["callees"] if c not in removed]
+
+    for node_key, callees in delta["edges_added"].items():
+        graph[node_key]["callees"] = graph[node_key].get("callees", []) + callees
+
+    graph.update(delta["nodes_added"])
+
+    return graph
@@ -0,0 +1,186 @@
+from fnmatch import fnmatchcase
+import os
+import re
+from nuanced.lib import reachability
+from nuanced.lib.call_graph import module_names_by_filepath
+
+TEST_FILE_PATTERNS = ["test_*.py", "*_test.py"]
+TEST_CLASS_PREFIX = "Test"
+TEST_FUNCTION_PREFIX = "test"
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+_LINE_RANGE = re.compile(r"^(.+?):(\d+)(?:-(\d+))?$")
+
+
+def parse_changes(text: str) -> dict[str, list[tuple[int, int]]]:
+    if any(line.startswith(("+++ ", "@@ ")) for line in text.splitlines()):
+        return _parse_unified_diff(text)
+
+    return _parse_line_ranges(text)
+
+def affected_tests(graph: dict, changes: dict[str, list[tuple[int, int]]], *, root: str | None=None) -> dict:
+    node_keys = list(graph)
+    ids = {k: i for i, k in enumerate(node_keys)}
+    node_keys_by_filepath = _node_keys_by_relative_filepath(graph, root)
+    module_names = module_names_by_filepath(graph)
+    changed_node_keys = set()
+    unmapped_filepaths = []
+
+    for changed_filepath, line_ranges in changes.items():
+        relative_filepath = _resolve_filepath(changed_filepath, node_keys_by_filepath)
+
+        if relative_filepath is None:
+            if changed_filepath.endswith(".py"):
+                unmapped_filepaths.append(changed_filepath)
+            continue
+
+        file_node_keys = node_keys_by_filepath[relative_filepath]
+        module_name = module_names.get(graph[file_node_keys[0]].get("filepath"))
+
+        for start, end in line_ranges:
+            for node_key in _changed_node_keys(graph, file_node_keys, start, end):
+                # Module-level code (imports, constants, class bodies) can change the
+                # behaviour of every function in the file
+                if node_key == module_name:
+                    changed_node_keys.update(file_node_keys)
+                else:
+                    changed_node_keys.add(node_key)
+
+    indptr, indices = reachability.csr_adjacency(graph, node_keys, reverse=True)
+    visited = reachability.reachable(indptr, indices, sorted(ids[k] for k in changed_node_keys))
+    tests = set()
+
+    for node_id, node_key in enumerate(node_keys):
+        test_node_id = pytest_node_id(graph, node_key, module_names, root) if visited[node_id] else None
+
+        if test_node_id is not None:
+            tests.add(test_node_id)
+
+    return {
+        "tests": sorted(tests),
+        "changed_functions": sorted(changed_node_keys),
+        "unmapped_files": sorted(unmapped_filepaths),
+    }
+
+def pytest_node_id(graph: dict, node_key: str, module_names: dict[str, str], root: str | None=None) -> str | None:
+    filepath = graph[node_key].get("filepath")
+    module_name = module_names.get(filepath)
+
+    if not filepath or not module_name or not node_key.startswith(module_name + "."):
+        return None
+
+    if not any(fnmatchcase(os.path.basename(filepath), p) for p in TEST_FILE_PATTERNS):
+        return None
+
+    *class_names, function_name = node_key[len(module_name) + 1:].split(".")
+
+    if not function_name.startswith(TEST_FUNCTION_PREFIX):
+        return None
+
+    if not all(c.startswith(TEST_CLASS_PREFIX) for c in class_names):
+        return None
+
+    return "::".join([_relative_filepath(filepath, root).replace(os.sep, "/"), *class_names, function_name])
+
+def _changed_node_keys(graph: dict, file_node_keys: list[str], start: int, end: int) -> list[str]:
+    changed = []
+
+    for lineno in range(start, end + 1):
+        containing = []
+
+        for node_key in file_node_keys:
+            node_attrs = graph[node_key]
+            node_start, node_end = node_attrs.get("lineno"), node_attrs.get("end_lineno")
+
+            if node_start is not None and node_end is not None and node_start <= lineno <= node_end:
+                containing.append((node_end - node_start, node_key))
+
+        if containing:
+            changed.append(min(containing)[1])
+
+    return changed
+
+def _parse_unified_diff(text: str) -> dict[str, list[tuple[int, int]]]:
+    changes = {}
+    filepath = None
+    new_lineno = None
+
+    for line in text.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:].split("\t")[0].strip()
+            filepath = None if target == "/dev/null" else re.sub(r"^[ab]/", "", target)
+            new_lineno = None
+            continue
+
+        hunk_match = _HUNK_HEADER.match(line)
+
+        if hunk_match:
+            new_lineno = int(hunk_match.group(1))
+            continue
+
+        if filepath is None or new_lineno is None or line.startswith(("--- ", "diff ", "\\")):
+            continue
+
+        if line.startswith("+"):
+            _add_range(changes, filepath, new_lineno, new_lineno)
+            new_lineno += 1
+        elif line.startswith("-"):
+            # Deleted lines have no line number on the new side, so mark the lines on either side
+            _add_range(changes, filepath, max(new_lineno - 1, 1), new_lineno)
+        else:
+            new_lineno += 1
+
+    return changes
+
+def _parse_line_ranges(text: str) -> dict[str, list[tuple[int, int]]]:
+    changes = {}
+
+    for entry in text.split():
+        match = _LINE_RANGE.match(entry)
+
+        if not match:
+            raise ValueError(f'Invalid change "{entry}", expected a unified diff or file:line and file:start-end entries')
+
+        start = int(match.group(2))
+        end = int(match.group(3) or start)
+        _add_range(changes, match.group(1), min(start, end), max(start, end))
+
+    return changes
+
+def _add_range(changes: dict, filepath: str, start: int, end: int) -> None:
+    line_ranges = changes.setdefault(filepath, [])
+
+    if line_ranges and line_ranges[-1][1] >= start - 1:
+        line_ranges[-1] = (line_ranges[-1][0], max(line_ranges[-1][1], end))
+    else:
+        line_ranges.append((start, end))
+
+def _node_keys_by_relative_filepath(graph: dict, root: str | None) -> dict[str, list[str]]:
+    node_keys_by_filepath = {}
+
+    for node_key, node_attrs in graph.items():
+        filepath = node_attrs.get("filepath")
+
+        if filepath:
+            relative_filepath = _relative_filepath(filepath, root).replace(os.sep, "/")
+            node_keys_by_filepath.setdefault(relative_filepath, []).append(node_key)
+
+    return node_keys_by_filepath
+
+# Diff paths are relative to the repository root, which may be above the graph's root
+def _resolve_filepath(filepath: str, node_keys_by_filepath: dict[str, list[str]]) -> str | None:
+    parts = filepath.replace(os.sep, "/").removeprefix("./").split("/")
+
+    for index in range(len(parts)):
+        candidate = "/".join(parts[index:])
+
+        if candidate in node_keys_by_filepath:
+            return candidate
+
+    return None
+
+def _relative_filepath(filepath: str, root: str | None) -> str:
+    if root and os.path.isabs(filepath):
+        return os.path.relpath(filepath, root)
+
+    return filepath
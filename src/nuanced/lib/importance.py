@@ -0,0 +1,114 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_DAMPING = 0.85
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_TOLERANCE = 1e-9
+IMPORTANCE_ATTR = "importance"
+SCORE_PRECISION = 8
+
+
+def annotate(graph: dict, **kwargs) -> dict:
+    ranks = pagerank(graph, **kwargs)
+
+    for node_key, node_attrs in graph.items():
+        node_attrs[IMPORTANCE_ATTR] = ranks[node_key]
+
+    return graph
+
+def scores(graph: dict) -> dict[str, float]:
+    if all(IMPORTANCE_ATTR in node_attrs for node_attrs in graph.values()):
+        return {k: v[IMPORTANCE_ATTR] for k, v in graph.items()}
+
+    return pagerank(graph)
+
+def pagerank(
+    graph: dict,
+    *,
+    damping: float=DEFAULT_DAMPING,
+    max_iterations: int=DEFAULT_MAX_ITERATIONS,
+    tolerance: float=DEFAULT_TOLERANCE,
+) -> dict[str, float]:
+    node_keys = list(graph)
+
+    if not node_keys:
+        return {}
+
+    indptr, indices, out_degree = _csr_adjacency(graph, node_keys)
+
+    if numpy is not None:
+        ranks = _numpy_pagerank(indptr, indices, out_degree, damping, max_iterations, tolerance)
+    else:
+        ranks = _python_pagerank(indptr, indices, out_degree, damping, max_iterations, tolerance)
+
+    return {k: round(float(r), SCORE_PRECISION) for k, r in zip(node_keys, ranks)}
+
+# Rows are callees and columns their callers, so each PageRank step is one pass over the rows
+def _csr_adjacency(graph: dict, node_keys: list[str]) -> tuple[array, array, array]:
+    ids = {k: i for i, k in enumerate(node_keys)}
+    callers_by_callee = [[] for _ in node_keys]
+    out_degree = array("l", [0]) * len(node_keys)
+
+    for caller_id, node_key in enumerate(node_keys):
+        callee_ids = {ids[c] for c in graph[node_key].get("callees", []) if c in ids}
+        out_degree[caller_id] = len(callee_ids)
+
+        for callee_id in callee_ids:
+            callers_by_callee[callee_id].append(caller_id)
+
+    indptr = array("l", [0])
+    indices = array("l")
+
+    for callers in callers_by_callee:
+        indices.extend(callers)
+        indptr.append(len(indices))
+
+    return indptr, indices, out_degree
+
+def _numpy_pagerank(indptr, indices, out_degree, damping, max_iterations, tolerance):
+    node_count = len(out_degree)
+    indptr = numpy.asarray(indptr, dtype=numpy.int64)
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    out_degree = numpy.asarray(out_degree, dtype=numpy.float64)
+    dangling = out_degree == 0
+    inverse_out_degree = numpy.divide(1.0, out_degree, out=numpy.zeros(node_count), where=~dangling)
+    rows = numpy.repeat(numpy.arange(node_count), numpy.diff(indptr))
+    ranks = numpy.full(node_count, 1.0 / node_count)
+
+    for _ in range(max_iterations):
+        contributions = ranks * inverse_out_degree
+        incoming = numpy.bincount(rows, weights=contributions[indices], minlength=node_count)
+        dangling_rank = ranks[dangling].sum()
+        next_ranks = (1.0 - damping) / node_count + damping * (incoming + dangling_rank / node_count)
+        delta = numpy.abs(next_ranks - ranks).sum()
+        ranks = next_ranks
+
+        if delta < tolerance:
+            break
+
+    return ranks.tolist()
+
+def _python_pagerank(indptr, indices, out_degree, damping, max_iterations, tolerance):
+    node_count = len(out_degree)
+    ranks = [1.0 / node_count] * node_count
+    dangling_ids = [i for i, d in enumerate(out_degree) if d == 0]
+
+    for _ in range(max_iterations):
+        contributions = [r / d if d else 0.0 for r, d in zip(ranks, out_degree)]
+        dangling_rank = sum(ranks[i] for i in dangling_ids)
+        base = (1.0 - damping) / node_count + damping * dangling_rank / node_count
+        next_ranks = [
+            base + damping * sum(contributions[j] for j in indices[indptr[i]:indptr[i + 1]])
+            for i in range(node_count)
+        ]
+        delta = sum(abs(a - b) for a, b in zip(next_ranks, ranks))
+        ranks = next_ranks
+
+        if delta < tolerance:
+            break
+
+    return ranks
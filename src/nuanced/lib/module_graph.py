@@ -0,0 +1,94 @@
+from collections import Counter
+import os
+from nuanced.lib.call_graph import module_names_by_filepath
+
+MODULE_LEVEL = "module"
+PACKAGE_LEVEL = "package"
+LEVELS = [MODULE_LEVEL, PACKAGE_LEVEL]
+
+
+def compute(graph: dict, *, root: str | None=None) -> dict:
+    module_names = module_names_by_filepath(graph)
+    package_names = {f: _package_name(m, f) for f, m in module_names.items()}
+    modules = {}
+    packages = {}
+    module_edges = Counter()
+    package_edges = Counter()
+
+    for filepath, module_name in module_names.items():
+        package_name = package_names[filepath]
+        modules[module_name] = {
+            "filepath": os.path.relpath(filepath, root) if root and filepath else filepath,
+            "package": package_name,
+            "functions": 0,
+            "internal_calls": 0,
+        }
+        packages.setdefault(package_name, {"modules": 0, "functions": 0, "internal_calls": 0})
+        packages[package_name]["modules"] += 1
+
+    for node_attrs in graph.values():
+        caller_filepath = node_attrs.get("filepath")
+        caller_module = module_names[caller_filepath]
+        caller_package = package_names[caller_filepath]
+        modules[caller_module]["functions"] += 1
+        packages[caller_package]["functions"] += 1
+
+        for callee in node_attrs.get("callees", []):
+            if callee not in graph:
+                continue
+
+            callee_filepath = graph[callee].get("filepath")
+            callee_module = module_names[callee_filepath]
+            callee_package = package_names[callee_filepath]
+
+            if callee_module == caller_module:
+                modules[caller_module]["internal_calls"] += 1
+            else:
+                module_edges[(caller_module, callee_module)] += 1
+
+            if callee_package == caller_package:
+                packages[caller_package]["internal_calls"] += 1
+            else:
+                package_edges[(caller_package, callee_package)] += 1
+
+    return {
+        "modules": _with_edges(modules, module_edges),
+        "packages": _with_edges(packages, package_edges),
+    }
+
+def dependencies(module_graph: dict, name: str, *, level: str | None=None) -> dict | None:
+    if level is None:
+        level = PACKAGE_LEVEL if name in module_graph["packages"] else MODULE_LEVEL
+
+    nodes = module_graph[f"{level}s"]
+
+    if name not in nodes:
+        return None
+
+    return {
+        "name": name,
+        "level": level,
+        **nodes[name],
+        "callees": _ranked(nodes[name]["callees"]),
+        "callers": _ranked(nodes[name]["callers"]),
+    }
+
+def _package_name(module_name: str, filepath: str | None) -> str:
+    if filepath and os.path.basename(filepath) == "__init__.py":
+        return module_name
+
+    return module_name.rsplit(".", 1)[0]
+
+def _with_edges(nodes: dict, edges: Counter) -> dict:
+    for node_attrs in nodes.values():
+        node_attrs["callees"] = {}
+        node_attrs["callers"] = {}
+
+    for (caller, callee), weight in sorted(edges.items()):
+        nodes[caller]["callees"][callee] = weight
+        nodes[callee]["callers"][caller] = weight
+
+    return dict(sorted(nodes.items()))
+
+def _ranked(weights: dict) -> list[dict]:
+    return [{"name": n, "calls": w} for n, w in sorted(weights.items(), key=lambda i: (-i[1], i[0]))]
@@ -0,0 +1,100 @@
+import math
+import os
+from nuanced.lib import call_graph
+
+# Conservative rates for groups without recorded timings, replaced by the observed rate once any group has been timed
+DEFAULT_SECONDS_PER_MEGABYTE = 20.0
+SECONDS_PER_FILE = 0.05
+CALIBRATED_SAFETY_FACTOR = 2.0
+UNCALIBRATED_SAFETY_FACTOR = 4.0
+MIN_TIMEOUT_SECONDS = 30
+MIN_SECONDS_PER_WORKER = 10.0
+
+
+def plan(
+    entry_points: list[str],
+    *,
+    root: str,
+    timings: dict[str, float] | None=None,
+    workers: int | None=None,
+    timeout_seconds: int | None=None,
+) -> dict:
+    timings = timings or {}
+    all_groups = call_graph.groups(entry_points)
+    group_reports = [_group_report(i, g, root, timings) for i, g in enumerate(all_groups)]
+    timed_reports = [r for r in group_reports if r["previous_seconds"] is not None]
+    timed_megabytes = sum(r["bytes"] for r in timed_reports) / (1024 * 1024)
+    seconds_per_megabyte = DEFAULT_SECONDS_PER_MEGABYTE
+
+    if timed_reports and timed_megabytes > 0:
+        seconds_per_megabyte = sum(r["previous_seconds"] for r in timed_reports) / timed_megabytes
+
+    for group_report in group_reports:
+        group_report["estimated_seconds"] = round(_estimate(group_report, seconds_per_megabyte), 3)
+
+    group_reports.sort(key=lambda r: (-r["estimated_seconds"], -r["files"], r["index"]))
+    total_seconds = sum(r["estimated_seconds"] for r in group_reports)
+
+    if workers is None:
+        workers = max(1, min(os.cpu_count() or 1, len(group_reports), math.floor(total_seconds / MIN_SECONDS_PER_WORKER)))
+
+    worker_seconds = assign(group_reports, workers)
+    calibrated = len(group_reports) > 0 and len(timed_reports) == len(group_reports)
+    safety_factor = CALIBRATED_SAFETY_FACTOR if calibrated else UNCALIBRATED_SAFETY_FACTOR
+
+    if timeout_seconds is None:
+        timeout_seconds = max(MIN_TIMEOUT_SECONDS, math.ceil(max(worker_seconds, default=0) * safety_factor))
+
+    return {
+        "workers": workers,
+        "timeout_seconds": timeout_seconds,
+        "estimated_seconds": round(max(worker_seconds, default=0), 3),
+        "total_estimated_seconds": round(total_seconds, 3),
+        "seconds_per_megabyte": round(seconds_per_megabyte, 3),
+        "calibrated": calibrated,
+        "groups": group_reports,
+    }
+
+def assign(group_reports: list[dict], workers: int) -> list[float]:
+    worker_seconds = [0.0] * workers
+
+    for group_report in group_reports:
+        worker = min(range(workers), key=lambda w: (worker_seconds[w], w))
+        worker_seconds[worker] += group_report["estimated_seconds"]
+        group_report["worker"] = worker
+
+    return worker_seconds
+
+def worker_group_indices(plan: dict) -> list[list[int]]:
+    group_indices = [[] for _ in range(plan["workers"])]
+
+    for group_report in plan["groups"]:
+        group_indices[group_report["worker"]].append(group_report["index"])
+
+    return [indices for indices in group_indices if indices]
+
+def _group_report(index: int, group: call_graph.CallGraphGroup, root: str, timings: dict[str, float]) -> dict:
+    dir_path = os.path.relpath(group.dir_path, root)
+
+    return {
+        "index": index,
+        "kind": group.kind,
+        "dir_path": dir_path,
+        "files": len(group.file_paths),
+        "bytes": sum(_file_size(p) for p in group.file_paths),
+        "previous_seconds": timings.get(dir_path),
+    }
+
+def _estimate(group_report: dict, seconds_per_megabyte: float) -> float:
+    if group_report["previous_seconds"] is not None:
+        return group_report["previous_seconds"]
+
+    megabytes = group_report["bytes"] / (1024 * 1024)
+
+    return max(group_report["files"] * SECONDS_PER_FILE, megabytes * seconds_per_megabyte)
+
+def _file_size(filepath: str) -> int:
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
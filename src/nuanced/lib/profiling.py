@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import time
+from nuanced.lib import atomic, call_graph
+from nuanced.lib.utils import with_timeout
+
+DEFAULT_MAX_PROBES = 64
+DEFAULT_TOP = 10
+
+
+def profile(
+    entry_points: list[str],
+    *,
+    package_path: str,
+    timeout_seconds: float,
+    file_budget_seconds: float | None=None,
+    max_chunk_files: int | None=None,
+    max_probes: int=DEFAULT_MAX_PROBES,
+    top: int=DEFAULT_TOP,
+    precision: str=call_graph.DEFAULT_PRECISION,
+) -> dict:
+    group_reports = []
+    file_reports = []
+    probe_count = 0
+
+    for group in call_graph.groups(entry_points):
+        seconds, failed = measure(group, group.file_paths, package_path, timeout_seconds, max_chunk_files, precision)
+        group_reports.append({
+            "kind": group.kind,
+            "dir_path": os.path.relpath(group.dir_path, package_path),
+            "files": len(group.file_paths),
+            "seconds": seconds,
+            "failed": failed,
+        })
+
+        if file_budget_seconds is not None and (failed or seconds > file_budget_seconds):
+            group_file_reports, group_probe_count = bisect(
+                group,
+                package_path,
+                timeout_seconds,
+                file_budget_seconds,
+                max_chunk_files=max_chunk_files,
+                max_probes=max_probes - probe_count,
+                precision=precision,
+            )
+            file_reports.extend(group_file_reports)
+            probe_count += group_probe_count
+
+    group_reports.sort(key=lambda r: (-r["seconds"], r["dir_path"]))
+    file_reports.sort(key=lambda r: (-r["seconds"], r["filepath"]))
+    over_budget_files = [
+        r for r in file_reports
+        if file_budget_seconds is not None and (r["failed"] or r["seconds"] > file_budget_seconds)
+    ]
+
+    return {
+        "precision": precision,
+        "timeout_seconds": timeout_seconds,
+        "file_budget_seconds": file_budget_seconds,
+        "groups": group_reports,
+        "slowest_files": file_reports[:top],
+        "over_budget_files": over_budget_files,
+        "probes": probe_count,
+        "probes_exhausted": probe_count >= max_probes,
+    }
+
+def measure(
+    group: call_graph.CallGraphGroup,
+    file_paths: list[str],
+    root: str,
+    timeout_seconds: float,
+    max_chunk_files: int | None=None,
+    precision: str=call_graph.DEFAULT_PRECISION,
+) -> tuple[float, bool]:
+    started_at = time.perf_counter()
+    result = with_timeout(
+        target=_timed_generate_group,
+        args=(file_paths),
+        kwargs=({"kind": group.kind, "dir_path": group.dir_path, "root": root, "max_chunk_files": max_chunk_files, "precision": precision}),
+        timeout=timeout_seconds,
+    )
+
+    if len(result.errors) > 0:
+        return round(time.perf_counter() - started_at, 3), True
+
+    return round(result.value, 3), False
+
+def bisect(
+    group: call_graph.CallGraphGroup,
+    root: str,
+    timeout_seconds: float,
+    file_budget_seconds: float,
+    *,
+    max_chunk_files: int | None=None,
+    max_probes: int=DEFAULT_MAX_PROBES,
+    precision: str=call_graph.DEFAULT_PRECISION,
+) -> tuple[list[dict], int]:
+    package_init_path = f"{group.dir_path}/__init__.py"
+    required_file_paths = [package_init_path] if group.kind == call_graph.PACKAGE_GROUP and package_init_path in group.file_paths else []
+    candidate_file_paths = sorted(p for p in group.file_paths if p not in required_file_paths)
+    pending = [candidate_file_paths] if len(candidate_file_paths) > 0 else []
+    file_reports = []
+    probe_count = 0
+
+    if required_file_paths:
+        pending.append(required_file_paths)
+
+    while pending and probe_count < max_probes:
+        file_paths = pending.pop()
+
+        if len(file_paths) > 1:
+            middle = len(file_paths) // 2
+            halves = [file_paths[:middle], file_paths[middle:]]
+        else:
+            halves = [file_paths]
+
+        for half in halves:
+            if probe_count >= max_probes:
+                break
+
+            subset = half if half == required_file_paths else required_file_paths + half
+            seconds, failed = measure(group, subset, root, timeout_seconds, max_chunk_files, precision)
+            probe_count += 1
+
+            if len(half) == 1:
+                file_reports.append({
+                    "filepath": os.path.relpath(half[0], root),
+                    "seconds": seconds,
+                    "failed": failed,
+                })
+            elif failed or seconds > file_budget_seconds:
+                pending.append(half)
+
+    return file_reports, probe_count
+
+def load_quarantine(quarantine_path: str) -> dict:
+    try:
+        with open(quarantine_path, "r") as quarantine_file:
+            return json.load(quarantine_file)
+    except (OSError, ValueError):
+        return {"files": {}}
+
+def quarantined_filepaths(quarantine: dict, root: str) -> set[str]:
+    filepaths = set()
+
+    for relative_filepath, entry in quarantine.get("files", {}).items():
+        filepath = os.path.join(root, relative_filepath)
+
+        if file_digest(filepath) == entry.get("sha256"):
+            filepaths.add(filepath)
+
+    return filepaths
+
+def quarantine_files(quarantine_path: str, report: dict, root: str) -> list[str]:
+    quarantine = load_quarantine(quarantine_path)
+    quarantined = []
+
+    for file_report in report["over_budget_files"]:
+        relative_filepath = file_report["filepath"]
+        digest = file_digest(os.path.join(root, relative_filepath))
+
+        if digest:
+            quarantine["files"][relative_filepath] = {
+                "sha256": digest,
+                "seconds": file_report["seconds"],
+                "failed": file_report["failed"],
+            }
+            quarantined.append(relative_filepath)
+
+    quarantine["files"] = {
+        p: e for p, e in quarantine["files"].items()
+        if file_digest(os.path.join(root, p)) == e.get("sha256")
+    }
+    atomic.write_atomic(quarantine_path, json.dumps(quarantine, indent=2, sort_keys=True))
+
+    return quarantined
+
+def file_digest(filepath: str) -> str | None:
+    try:
+        with open(filepath, "rb") as source_file:
+            return hashlib.sha256(source_file.read()).hexdigest()
+    except OSError:
+        return None
+
+def _timed_generate_group(
+    file_paths: list[str],
+    *,
+    kind: str,
+    dir_path: str,
+    root: str,
+    max_chunk_files: int | None,
+    precision: str=call_graph.DEFAULT_PRECISION,
+) -> float:
+    started_at = time.perf_counter()
+    call_graph.generate_group(
+        call_graph.CallGraphGroup(kind, dir_path, file_paths),
+        max_chunk_files=max_chunk_files,
+        root=root,
+        precision=precision,
+    )
+
+    return time.perf_counter() - started_at
@@ -0,0 +1,107 @@
+from collections import namedtuple
+import os
+import threading
+import time
+
+GROUP_STARTED = "group_started"
+GROUP_FINISHED = "group_finished"
+
+ProgressEvent = namedtuple(
+    "ProgressEvent",
+    [
+        "kind",
+        "dir_path",
+        "groups_done",
+        "groups_total",
+        "files_done",
+        "files_total",
+        "group_seconds",
+        "elapsed_seconds",
+        "eta_seconds",
+    ],
+)
+
+
+class ProgressTracker():
+    def __init__(self, groups: list, progress, *, root: str | None=None) -> None:
+        self.progress = progress
+        self.root = root
+        self.groups_total = len(groups)
+        self.files_total = sum(len(g.file_paths) for g in groups)
+        self.groups_done = 0
+        self.files_done = 0
+        self._started_at = time.perf_counter()
+        self._group_started_at = None
+
+    def group_started(self, group) -> None:
+        self._group_started_at = time.perf_counter()
+        self._emit(GROUP_STARTED, group, None)
+
+    def group_finished(self, group) -> None:
+        group_seconds = time.perf_counter() - self._group_started_at
+        self.groups_done += 1
+        self.files_done += len(group.file_paths)
+        self._emit(GROUP_FINISHED, group, round(group_seconds, 3))
+
+    def _emit(self, kind: str, group, group_seconds: float | None) -> None:
+        if self.progress is None:
+            return
+
+        elapsed_seconds = time.perf_counter() - self._started_at
+
+        self.progress(ProgressEvent(
+            kind=kind,
+            dir_path=os.path.relpath(group.dir_path, self.root) if self.root else group.dir_path,
+            groups_done=self.groups_done,
+            groups_total=self.groups_total,
+            files_done=self.files_done,
+            files_total=self.files_total,
+            group_seconds=group_seconds,
+            elapsed_seconds=round(elapsed_seconds, 3),
+            eta_seconds=eta(elapsed_seconds, self.files_done, self.files_total),
+        ))
+
+
+class ProgressAggregator():
+    def __init__(self, progress, *, groups_total: int, files_total: int, worker_count: int) -> None:
+        self.progress = progress
+        self.groups_total = groups_total
+        self.files_total = files_total
+        self.timings = {}
+        self.aborted = False
+        self._done_by_worker = [(0, 0)] * worker_count
+        self._started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def for_worker(self, worker: int):
+        return lambda event: self._on_event(worker, event)
+
+    def _on_event(self, worker: int, event: ProgressEvent) -> bool | None:
+        with self._lock:
+            if event.kind == GROUP_FINISHED:
+                self.timings[event.dir_path] = event.group_seconds
+
+            self._done_by_worker[worker] = (event.groups_done, event.files_done)
+            groups_done = sum(g for g, _f in self._done_by_worker)
+            files_done = sum(f for _g, f in self._done_by_worker)
+            elapsed_seconds = time.perf_counter() - self._started_at
+
+            if not self.aborted and self.progress is not None:
+                aggregated_event = event._replace(
+                    groups_done=groups_done,
+                    groups_total=self.groups_total,
+                    files_done=files_done,
+                    files_total=self.files_total,
+                    elapsed_seconds=round(elapsed_seconds, 3),
+                    eta_seconds=eta(elapsed_seconds, files_done, self.files_total),
+                )
+                self.aborted = self.progress(aggregated_event) is False
+
+            return False if self.aborted else None
+
+
+def eta(elapsed_seconds: float, files_done: int, files_total: int) -> float | None:
+    if files_done == 0:
+        return None
+
+    return round(elapsed_seconds * (files_total - files_done) / files_done, 3)
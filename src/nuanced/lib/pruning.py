@@ -0,0 +1,96 @@
+from collections import Counter, namedtuple
+from fnmatch import fnmatch
+import os
+from nuanced.lib.call_graph import BUILTIN_FUNCTION_PREFIX
+
+PruningPolicy = namedtuple(
+    "PruningPolicy",
+    ["drop_builtins", "exclude_tests", "exclude_generated", "hub_fan_in_threshold"],
+    defaults=(False, False, False, None),
+)
+
+TEST_FILE_PATTERNS = ["test_*.py", "*_test.py", "tests.py", "conftest.py"]
+TEST_DIRECTORY_NAMES = {"test", "tests"}
+GENERATED_FILE_PATTERNS = ["*_pb2.py", "*_pb2_grpc.py", "*_pb2.pyi", "*_generated.py"]
+GENERATED_FILE_MARKERS = ["@generated", "DO NOT EDIT", "Code generated by", "Autogenerated by", "auto-generated"]
+GENERATED_FILE_HEADER_BYTES = 1024
+
+
+def is_enabled(policy: PruningPolicy | None) -> bool:
+    if not policy:
+        return False
+
+    return policy.drop_builtins or policy.exclude_tests or policy.exclude_generated or policy.hub_fan_in_threshold is not None
+
+def is_test_file(filepath: str) -> bool:
+    directory_names = filepath.split(os.sep)[:-1]
+
+    return any(fnmatch(os.path.basename(filepath), p) for p in TEST_FILE_PATTERNS) or \
+        any(d in TEST_DIRECTORY_NAMES for d in directory_names)
+
+def is_generated_file(filepath: str) -> bool:
+    if any(fnmatch(os.path.basename(filepath), p) for p in GENERATED_FILE_PATTERNS):
+        return True
+
+    try:
+        with open(filepath, "rb") as source_file:
+            header = source_file.read(GENERATED_FILE_HEADER_BYTES).decode("utf-8", errors="replace")
+    except OSError:
+        return False
+
+    return any(marker in header for marker in GENERATED_FILE_MARKERS)
+
+def excluded_filepaths(filepaths: list[str], policy: PruningPolicy, *, root: str="") -> set[str]:
+    excluded = set()
+
+    for filepath in filepaths:
+        relative_filepath = os.path.relpath(filepath, root) if root else filepath
+
+        if policy.exclude_tests and is_test_file(relative_filepath):
+            excluded.add(filepath)
+        elif policy.exclude_generated and is_generated_file(filepath):
+            excluded.add(filepath)
+
+    return excluded
+
+def prune(graph: dict, policy: PruningPolicy, *, excluded: set[str]=frozenset()) -> tuple[dict, dict]:
+    pruned_graph = {}
+    removed_nodes = {k for k, v in graph.items() if v.get("filepath") in excluded}
+    removed_builtin_edge_count = 0
+    removed_edge_count = 0
+
+    for node_key, node_attrs in graph.items():
+        if node_key in removed_nodes:
+            continue
+
+        callees = [c for c in node_attrs["callees"] if c not in removed_nodes]
+        removed_edge_count += len(node_attrs["callees"]) - len(callees)
+
+        if policy.drop_builtins:
+            builtin_callee_count = len(callees)
+            callees = [c for c in callees if not c.startswith(BUILTIN_FUNCTION_PREFIX)]
+            removed_builtin_edge_count += builtin_callee_count - len(callees)
+
+        pruned_graph[node_key] = {**node_attrs, "callees": callees}
+
+    collapsed_hubs = []
+
+    if policy.hub_fan_in_threshold is not None:
+        fan_in = Counter(c for v in pruned_graph.values() for c in set(v["callees"]) if c in pruned_graph)
+        collapsed_hubs = sorted(k for k, c in fan_in.items() if c > policy.hub_fan_in_threshold)
+
+        for node_key in collapsed_hubs:
+            node_attrs = pruned_graph[node_key]
+            removed_edge_count += len(node_attrs["callees"])
+            node_attrs["callees"] = []
+            node_attrs["collapsed"] = True
+
+    summary = {
+        **policy._asdict(),
+        "removed_nodes": len(removed_nodes),
+        "removed_builtin_edges": removed_builtin_edge_count,
+        "removed_edges": removed_edge_count,
+        "collapsed_hubs": collapsed_hubs,
+    }
+
+    return pruned_graph, summary
@@ -0,0 +1,134 @@
+from array import array
+from fnmatch import fnmatchcase
+import os
+from nuanced.lib.call_graph import module_names_by_filepath
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def unreachable(graph: dict, entry_patterns: list[str], *, root: str | None=None, module_entries: bool=False) -> dict:
+    node_keys = list(graph)
+    module_keys = set(module_names_by_filepath(graph).values())
+    entry_ids = [
+        node_id for node_id, node_key in enumerate(node_keys)
+        if (module_entries and node_key in module_keys) or _is_entry(node_key, graph[node_key], entry_patterns, root)
+    ]
+    indptr, indices = csr_adjacency(graph, node_keys)
+    visited = reachable(indptr, indices, entry_ids)
+    function_ids = [i for i, k in enumerate(node_keys) if k not in module_keys]
+    unreachable_functions = []
+
+    for node_id in function_ids:
+        if not visited[node_id]:
+            node_attrs = graph[node_keys[node_id]]
+            unreachable_functions.append({
+                "name": node_keys[node_id],
+                "filepath": _relative_filepath(node_attrs.get("filepath"), root),
+                "lineno": node_attrs.get("lineno"),
+            })
+
+    unreachable_functions.sort(key=lambda f: (f["filepath"] or "", f["lineno"] or 0, f["name"]))
+
+    return {
+        "entry_patterns": entry_patterns,
+        "entries": len(entry_ids),
+        "functions": len(function_ids),
+        "reachable_functions": len(function_ids) - len(unreachable_functions),
+        "unreachable_functions": unreachable_functions,
+    }
+
+def csr_adjacency(graph: dict, node_keys: list[str], *, reverse: bool=False) -> tuple[array, array]:
+    ids = {k: i for i, k in enumerate(node_keys)}
+    neighbours_by_node = [[] for _ in node_keys]
+
+    for node_id, node_key in enumerate(node_keys):
+        for callee in dict.fromkeys(graph[node_key].get("callees", [])):
+            callee_id = ids.get(callee)
+
+            if callee_id is None:
+                continue
+
+            if reverse:
+                neighbours_by_node[callee_id].append(node_id)
+            else:
+                neighbours_by_node[node_id].append(callee_id)
+
+    indptr = array("l", [0])
+    indices = array("l")
+
+    for neighbours in neighbours_by_node:
+        indices.extend(neighbours)
+        indptr.append(len(indices))
+
+    return indptr, indices
+
+def reachable(indptr: array, indices: array, sources: list[int]) -> bytearray:
+    if numpy is not None:
+        return _numpy_reachable(indptr, indices, sources)
+
+    return _python_reachable(indptr, indices, sources)
+
+def _python_reachable(indptr: array, indices: array, sources: list[int]) -> bytearray:
+    visited = bytearray(len(indptr) - 1)
+    stack = array("l")
+
+    for source in sources:
+        if not visited[source]:
+            visited[source] = 1
+            stack.append(source)
+
+    while stack:
+        node_id = stack.pop()
+
+        for neighbour in indices[indptr[node_id]:indptr[node_id + 1]]:
+            if not visited[neighbour]:
+                visited[neighbour] = 1
+                stack.append(neighbour)
+
+    return visited
+
+# Level-synchronous traversal, expanding the whole frontier with one gather per level
+def _numpy_reachable(indptr: array, indices: array, sources: list[int]) -> bytearray:
+    indptr = numpy.asarray(indptr, dtype=numpy.int64)
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    visited = numpy.zeros(len(indptr) - 1, dtype=numpy.uint8)
+    frontier = numpy.unique(numpy.asarray(sources, dtype=numpy.int64))
+    visited[frontier] = 1
+
+    while frontier.size > 0:
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+
+        if total == 0:
+            break
+
+        offsets = numpy.repeat(starts - numpy.cumsum(counts) + counts, counts) + numpy.arange(total)
+        neighbours = indices[offsets]
+        frontier = numpy.unique(neighbours[visited[neighbours] == 0])
+        visited[frontier] = 1
+
+    return bytearray(visited.tobytes())
+
+def _is_entry(node_key: str, node_attrs: dict, entry_patterns: list[str], root: str | None) -> bool:
+    filepath = None
+
+    for pattern in entry_patterns:
+        if pattern.endswith(".py") or os.sep in pattern:
+            filepath = filepath or _relative_filepath(node_attrs.get("filepath"), root) or ""
+
+            if fnmatchcase(filepath, pattern):
+                return True
+        elif fnmatchcase(node_key, pattern):
+            return True
+
+    return False
+
+def _relative_filepath(filepath: str | None, root: str | None) -> str | None:
+    if filepath and root and os.path.isabs(filepath):
+        return os.path.relpath(filepath, root)
+
+    return filepath
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+CACHE_ENTRY_SUFFIX = ".json"
+
+
+class ResultCache():
+    def __init__(
+        self,
+        dirpath: str,
+        *,
+        max_entries: int=DEFAULT_MAX_ENTRIES,
+        max_bytes: int=DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.dirpath = dirpath
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def get(self, graph_version: str, key: dict):
+        entry_path = self._entry_path(graph_version, key)
+
+        try:
+            with open(entry_path, "r") as entry_file:
+                value = json.load(entry_file)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+
+        return value
+
+    def put(self, graph_version: str, key: dict, value) -> None:
+        version_dirpath = os.path.join(self.dirpath, graph_version)
+
+        try:
+            self._remove_stale_versions(graph_version)
+            os.makedirs(version_dirpath, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=version_dirpath, suffix=".tmp")
+
+            with os.fdopen(file_descriptor, "w") as entry_file:
+                entry_file.write(json.dumps(value))
+
+            os.replace(temporary_path, self._entry_path(graph_version, key))
+            self._evict(version_dirpath)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        shutil.rmtree(self.dirpath, ignore_errors=True)
+
+    def _entry_path(self, graph_version: str, key: dict) -> str:
+        key_digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+        return os.path.join(self.dirpath, graph_version, key_digest + CACHE_ENTRY_SUFFIX)
+
+    def _remove_stale_versions(self, graph_version: str) -> None:
+        if not os.path.isdir(self.dirpath):
+            return
+
+        for entry in os.scandir(self.dirpath):
+            if entry.is_dir() and entry.name != graph_version:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _evict(self, version_dirpath: str) -> None:
+        entries = []
+
+        for entry in os.scandir(version_dirpath):
+            if entry.name.endswith(CACHE_ENTRY_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        entries.sort()
+        total_bytes = sum(size for _mtime, size, _path in entries)
+
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _mtime, size, path = entries.pop(0)
+            total_bytes -= size
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,44 @@
+from fnmatch import fnmatchcase
+import os
+from nuanced.lib import git
+
+BLOB_MODES = {"100644", "100755"}
+
+
+def materialize(path: str, rev: str, dest_dirpath: str, *, pattern: str="*.py") -> list[str]:
+    entries = git.ls_tree(path, rev)
+
+    if entries is None:
+        raise ValueError(f"Cannot list the files of revision {rev} in {path}")
+
+    entries = [e for e in entries if _is_eligible(e, pattern)]
+    paths_by_object_id = {}
+
+    for entry in entries:
+        paths_by_object_id.setdefault(entry.object_id, []).append(entry.path)
+
+    written_filepaths = []
+
+    for object_id, data in git.cat_file(path, list(paths_by_object_id)):
+        for entry_path in paths_by_object_id[object_id]:
+            filepath = os.path.join(dest_dirpath, entry_path)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+            with open(filepath, "wb") as file:
+                file.write(data)
+
+            written_filepaths.append(filepath)
+
+    return sorted(written_filepaths)
+
+# Mirrors the files a recursive glob of the working tree would find: regular files only, no hidden directories
+def _is_eligible(entry: git.TreeEntry, pattern: str) -> bool:
+    if entry.object_type != "blob" or entry.mode not in BLOB_MODES:
+        return False
+
+    *dirnames, filename = entry.path.split("/")
+
+    if filename.startswith(".") or any(d.startswith(".") for d in dirnames):
+        return False
+
+    return fnmatchcase(filename, pattern)
@@ -0,0 +1,110 @@
+from array import array
+from collections import OrderedDict
+import mmap
+import os
+
+DEFAULT_MAX_OPEN_FILES = 64
+
+
+class SourceReader():
+    def __init__(self, max_open_files: int=DEFAULT_MAX_OPEN_FILES) -> None:
+        self.max_open_files = max_open_files
+        self._files = OrderedDict()
+
+    def read_spans(self, filepath: str, spans: list[tuple]) -> list[str | None]:
+        source_file = self._open(filepath)
+
+        if source_file is None:
+            return [None for _span in spans]
+
+        return [source_file.read_lines(lineno, end_lineno) for lineno, end_lineno in spans]
+
+    def read_span(self, filepath: str, lineno: int | None, end_lineno: int | None) -> str | None:
+        return self.read_spans(filepath, [(lineno, end_lineno)])[0]
+
+    def close(self) -> None:
+        while self._files:
+            _filepath, source_file = self._files.popitem(last=False)
+            source_file.close()
+
+    def __enter__(self) -> "SourceReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open(self, filepath: str):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        source_file = self._files.get(filepath)
+
+        if source_file and source_file.signature == signature:
+            self._files.move_to_end(filepath)
+            return source_file
+
+        if source_file:
+            self._files.pop(filepath).close()
+
+        try:
+            source_file = _MappedFile(filepath, signature)
+        except OSError:
+            return None
+
+        self._files[filepath] = source_file
+
+        while len(self._files) > self.max_open_files:
+            _filepath, evicted = self._files.popitem(last=False)
+            evicted.close()
+
+        return source_file
+
+
+class _MappedFile():
+    def __init__(self, filepath: str, signature: tuple) -> None:
+        self.signature = signature
+        self._file = open(filepath, "rb")
+        self._mmap = None
+
+        if signature[0] > 0:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._line_offsets = self._build_line_offsets()
+
+    def read_lines(self, lineno: int | None, end_lineno: int | None) -> str | None:
+        line_count = len(self._line_offsets) - 1
+
+        if lineno is None or lineno < 1 or lineno > line_count:
+            return None
+
+        end_lineno = min(end_lineno or lineno, line_count)
+        start = self._line_offsets[lineno - 1]
+        end = self._line_offsets[end_lineno]
+
+        return self._mmap[start:end].decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def _build_line_offsets(self) -> array:
+        offsets = array("Q", [0])
+
+        if self._mmap is None:
+            return offsets
+
+        size = len(self._mmap)
+        position = self._mmap.find(b"\n")
+
+        while position != -1:
+            offsets.append(position + 1)
+            position = self._mmap.find(b"\n", position + 1)
+
+        if offsets[-1] != size:
+            offsets.append(size)
+
+        return offsets
@@ -0,0 +1,239 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from itertools import accumulate
+import base64
+import heapq
+import math
+import sys
+
+SymbolMatch = namedtuple("SymbolMatch", ["name", "score", "filepath", "lineno", "end_lineno"])
+
+SYMBOL_INDEX_VERSION = 2
+EXACT_MATCH_SCORE = 1.0
+NAME_MATCH_SCORE = 0.9
+PREFIX_MATCH_SCORE = 0.8
+SUFFIX_MATCH_SCORE = 0.7
+SUBSTRING_MATCH_SCORE = 0.6
+FUZZY_MATCH_MAX_SCORE = 0.5
+FUZZY_MATCH_MIN_SIMILARITY = 0.3
+
+
+class SymbolIndex():
+    def __init__(
+        self,
+        *,
+        names: list[str],
+        suffix_order: list[int],
+        trigrams: dict[str, str],
+        trigram_counts: list[int],
+        files: list[str],
+        locations: list[list],
+    ) -> None:
+        self.names = names
+        self.suffix_order = suffix_order
+        self.trigrams = trigrams
+        self.trigram_counts = trigram_counts
+        self.files = files
+        self.locations = locations
+        self._folded_names = [n.lower() for n in names]
+        self._folded_reversed_names = [self._folded_names[i][::-1] for i in suffix_order]
+        self._postings_cache = {}
+
+    @classmethod
+    def build(cls, graph: dict) -> "SymbolIndex":
+        names = sorted(graph.keys(), key=lambda n: (n.lower(), n))
+        suffix_order = sorted(range(len(names)), key=lambda i: names[i].lower()[::-1])
+        trigrams = {}
+        trigram_counts = []
+        files = []
+        file_ids = {}
+        locations = []
+
+        for name_id, name in enumerate(names):
+            name_trigrams = set(_trigrams(_last_segment(name).lower()))
+            trigram_counts.append(len(name_trigrams))
+
+            for trigram in name_trigrams:
+                trigrams.setdefault(trigram, []).append(name_id)
+
+            node = graph[name]
+            filepath = node.get("filepath")
+
+            if filepath not in file_ids:
+                file_ids[filepath] = len(files)
+                files.append(filepath)
+
+            locations.append([file_ids[filepath], node.get("lineno", None), node.get("end_lineno", None)])
+
+        return cls(
+            names=names,
+            suffix_order=suffix_order,
+            trigrams={t: _encode_postings(name_ids) for t, name_ids in trigrams.items()},
+            trigram_counts=trigram_counts,
+            files=files,
+            locations=locations,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SymbolIndex":
+        if data.get("version") != SYMBOL_INDEX_VERSION:
+            raise ValueError(f"Unsupported symbol index version: {data.get('version')}")
+
+        return cls(
+            names=data["names"],
+            suffix_order=data["suffix_order"],
+            trigrams=data["trigrams"],
+            trigram_counts=data["trigram_counts"],
+            files=data["files"],
+            locations=data["locations"],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "version": SYMBOL_INDEX_VERSION,
+            "names": self.names,
+            "suffix_order": self.suffix_order,
+            "trigrams": self.trigrams,
+            "trigram_counts": self.trigram_counts,
+            "files": self.files,
+            "locations": self.locations,
+        }
+
+    def search(self, query: str, limit: int=10) -> list[SymbolMatch]:
+        folded_query = query.lower()
+        scores = {}
+
+        if not folded_query or limit < 1:
+            return []
+
+        def add(name_id, score):
+            if scores.get(name_id, 0) < score:
+                scores[name_id] = score
+
+        for name_id in self._prefixed(folded_query):
+            if self._folded_names[name_id] == folded_query:
+                add(name_id, EXACT_MATCH_SCORE)
+            else:
+                add(name_id, PREFIX_MATCH_SCORE)
+
+        for name_id in self._suffixed(folded_query):
+            if self._folded_names[name_id].endswith("." + folded_query):
+                add(name_id, NAME_MATCH_SCORE)
+            else:
+                add(name_id, SUFFIX_MATCH_SCORE)
+
+        # Substring and fuzzy matches rank below every other kind of match, so the trigram postings
+        # are only looked up when prefix and suffix matches don't already fill the limit
+        if len(scores) < limit:
+            for name_id, similarity in self._similar(_last_segment(folded_query)):
+                if folded_query in self._folded_names[name_id]:
+                    add(name_id, SUBSTRING_MATCH_SCORE)
+                elif similarity >= FUZZY_MATCH_MIN_SIMILARITY:
+                    add(name_id, FUZZY_MATCH_MAX_SCORE * similarity)
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda s: (-s[1], len(self.names[s[0]]), self.names[s[0]]))
+
+        return [self._match(name_id, score) for name_id, score in ranked]
+
+    def _match(self, name_id: int, score: float) -> SymbolMatch:
+        file_id, lineno, end_lineno = self.locations[name_id]
+
+        return SymbolMatch(
+            name=self.names[name_id],
+            score=round(score, 4),
+            filepath=self.files[file_id],
+            lineno=lineno,
+            end_lineno=end_lineno,
+        )
+
+    def _prefixed(self, folded_query: str):
+        start = bisect_left(self._folded_names, folded_query)
+
+        for name_id in range(start, len(self._folded_names)):
+            if not self._folded_names[name_id].startswith(folded_query):
+                break
+            yield name_id
+
+    def _suffixed(self, folded_query: str):
+        reversed_query = folded_query[::-1]
+        start = bisect_left(self._folded_reversed_names, reversed_query)
+
+        for position in range(start, len(self._folded_reversed_names)):
+            if not self._folded_reversed_names[position].startswith(reversed_query):
+                break
+            yield self.suffix_order[position]
+
+    def _postings(self, trigram: str) -> list[int]:
+        if trigram not in self._postings_cache:
+            encoded = self.trigrams.get(trigram)
+            self._postings_cache[trigram] = _decode_postings(encoded) if encoded else []
+
+        return self._postings_cache[trigram]
+
+    def _similar(self, folded_name: str) -> list[tuple[int, float]]:
+        query_trigrams = sorted(set(_trigrams(folded_name)), key=lambda t: len(self._postings(t)))
+
+        if not query_trigrams:
+            return []
+
+        min_shared = math.ceil(FUZZY_MATCH_MIN_SIMILARITY * len(query_trigrams))
+        # A name sharing min_shared trigrams with the query has at least one of its rarest
+        # len - min_shared + 1, so only the names in those postings are counted
+        rarest_count = len(query_trigrams) - min_shared + 1
+        hits = Counter()
+
+        for trigram in query_trigrams[:rarest_count]:
+            hits.update(self._postings(trigram))
+
+        for trigram in query_trigrams[rarest_count:]:
+            postings = self._postings(trigram)
+
+            # A few candidates are cheaper to look up in a long posting list than the other way around
+            if len(hits) * 16 < len(postings):
+                hits.update([name_id for name_id in hits if _is_posted(postings, name_id)])
+            else:
+                hits.update(hits.keys() & set(postings))
+
+        query_trigram_count = len(query_trigrams)
+        trigram_counts = self.trigram_counts
+
+        return [
+            (name_id, shared / (query_trigram_count + trigram_counts[name_id] - shared))
+            for name_id, shared in hits.items()
+            if shared >= min_shared
+        ]
+
+
+def _is_posted(postings: list[int], name_id: int) -> bool:
+    position = bisect_left(postings, name_id)
+
+    return position < len(postings) and postings[position] == name_id
+
+def _last_segment(name: str) -> str:
+    return name.rsplit(".", 1)[-1]
+
+def _trigrams(text: str) -> list[str]:
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+# Postings are delta encoded into the narrowest little-endian array type and base64 encoded,
+# which keeps the index small and lets JSON parse it as strings rather than millions of integers
+def _encode_postings(name_ids: list[int]) -> str:
+    deltas = [name_ids[0]] + [b - a for a, b in zip(name_ids, name_ids[1:])]
+    largest = max(deltas)
+    typecode = "B" if largest < 1 << 8 else "H" if largest < 1 << 16 else "I"
+    encoded = array(typecode, deltas)
+
+    if sys.byteorder == "big":
+        encoded.byteswap()
+
+    return typecode + base64.b64encode(encoded.tobytes()).decode("ascii")
+
+def _decode_postings(encoded: str) -> list[int]:
+    deltas = array(encoded[0])
+    deltas.frombytes(base64.b64decode(encoded[1:]))
+
+    if sys.byteorder == "big":
+        deltas.byteswap()
+
+    return list(accumulate(deltas))
@@ -0,0 +1,210 @@
+from collections import Counter
+import os
+import runpy
+import sys
+import threading
+
+DEFAULT_MAX_EDGES = 1_000_000
+MONITORING_TOOL_NAME = "nuanced"
+RUNTIME_CALLEES_ATTR = "runtime_callees"
+
+
+class CallTracer():
+    def __init__(self, root: str, *, max_edges: int=DEFAULT_MAX_EDGES) -> None:
+        self.root = os.path.abspath(root).rstrip(os.sep) + os.sep
+        self.max_edges = max_edges
+        self.calls = Counter()
+        self.dropped_calls = 0
+        self._code_keys = {}
+        self._tool_id = None
+
+    def __enter__(self) -> "CallTracer":
+        self.start()
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if hasattr(sys, "monitoring"):
+            self._start_monitoring()
+        else:
+            threading.setprofile(self._on_profile_event)
+            sys.setprofile(self._on_profile_event)
+
+    def stop(self) -> None:
+        if self._tool_id is not None:
+            sys.monitoring.set_events(self._tool_id, 0)
+            sys.monitoring.register_callback(self._tool_id, sys.monitoring.events.PY_START, None)
+            sys.monitoring.free_tool_id(self._tool_id)
+            sys.monitoring.restart_events()
+            self._tool_id = None
+        else:
+            sys.setprofile(None)
+            threading.setprofile(None)
+
+    def _start_monitoring(self) -> None:
+        for tool_id in (sys.monitoring.PROFILER_ID, sys.monitoring.OPTIMIZER_ID):
+            if sys.monitoring.get_tool(tool_id) is None:
+                self._tool_id = tool_id
+                break
+        else:
+            raise RuntimeError("No sys.monitoring tool id is available for tracing")
+
+        sys.monitoring.use_tool_id(self._tool_id, MONITORING_TOOL_NAME)
+        sys.monitoring.register_callback(self._tool_id, sys.monitoring.events.PY_START, self._on_py_start)
+        sys.monitoring.set_events(self._tool_id, sys.monitoring.events.PY_START)
+        # Code objects outside the root are disabled for the rest of the run, which also applies to later
+        # tracers until events are restarted
+        sys.monitoring.restart_events()
+
+    def _on_py_start(self, code, _instruction_offset):
+        callee_key = self._code_key(code)
+
+        if callee_key is None:
+            return sys.monitoring.DISABLE
+
+        caller_frame = sys._getframe(1).f_back
+
+        if caller_frame is not None:
+            self._record(caller_frame.f_code, callee_key)
+
+    def _on_profile_event(self, frame, event, _arg) -> None:
+        if event != "call":
+            return
+
+        callee_key = self._code_key(frame.f_code)
+
+        if callee_key is not None and frame.f_back is not None:
+            self._record(frame.f_back.f_code, callee_key)
+
+    def _record(self, caller_code, callee_key: tuple) -> None:
+        caller_key = self._code_key(caller_code)
+
+        if caller_key is None:
+            return
+
+        edge = (caller_key, callee_key)
+
+        if edge in self.calls or len(self.calls) < self.max_edges:
+            self.calls[edge] += 1
+        else:
+            self.dropped_calls += 1
+
+    def _code_key(self, code) -> tuple | None:
+        try:
+            return self._code_keys[code]
+        except KeyError:
+            pass
+
+        if code.co_filename.startswith(self.root):
+            code_key = (code.co_filename, code.co_firstlineno, getattr(code, "co_qualname", code.co_name))
+        else:
+            code_key = None
+
+        self._code_keys[code] = code_key
+
+        return code_key
+
+
+def run(command: list[str], call_tracer: CallTracer) -> int:
+    target, *_args = command
+    saved_argv, saved_path = sys.argv[:], sys.path[:]
+    sys.argv = list(command)
+
+    try:
+        with call_tracer:
+            if target.endswith(".py") or os.path.isfile(target):
+                sys.path.insert(0, os.path.dirname(os.path.abspath(target)))
+                runpy.run_path(os.path.abspath(target), run_name="__main__")
+            else:
+                sys.path.insert(0, os.getcwd())
+                runpy.run_module(target, run_name="__main__", alter_sys=True)
+    except SystemExit as exit:
+        if exit.code is None or isinstance(exit.code, int):
+            return exit.code or 0
+
+        return 1
+    finally:
+        sys.argv, sys.path[:] = saved_argv, saved_path
+
+    return 0
+
+def resolve(graph: dict, calls: Counter) -> Counter:
+    nodes_by_filepath = {}
+
+    for node_key, node_attrs in graph.items():
+        nodes_by_filepath.setdefault(node_attrs.get("filepath"), []).append(node_key)
+
+    node_keys_by_code_key = {}
+    edges = Counter()
+
+    for (caller_code_key, callee_code_key), count in calls.items():
+        caller = _node_key_for_code(graph, nodes_by_filepath, node_keys_by_code_key, caller_code_key)
+        callee = _node_key_for_code(graph, nodes_by_filepath, node_keys_by_code_key, callee_code_key)
+
+        if caller is None or callee is None or (caller == callee and caller_code_key != callee_code_key):
+            continue
+
+        edges[(caller, callee)] += count
+
+    return edges
+
+def merge(graph: dict, edges: Counter) -> dict:
+    new_edge_count = 0
+
+    for (caller, callee), _count in edges.items():
+        node_attrs = graph[caller]
+        runtime_callees = node_attrs.setdefault(RUNTIME_CALLEES_ATTR, [])
+
+        if callee not in runtime_callees:
+            runtime_callees.append(callee)
+
+        if callee not in node_attrs["callees"]:
+            node_attrs["callees"].append(callee)
+            new_edge_count += 1
+
+    for node_attrs in graph.values():
+        if RUNTIME_CALLEES_ATTR in node_attrs:
+            node_attrs[RUNTIME_CALLEES_ATTR].sort()
+
+    return {
+        "traced_edges": len(edges),
+        "new_edges": new_edge_count,
+    }
+
+def _node_key_for_code(graph: dict, nodes_by_filepath: dict, node_keys_by_code_key: dict, code_key: tuple) -> str | None:
+    if code_key in node_keys_by_code_key:
+        return node_keys_by_code_key[code_key]
+
+    filepath, first_lineno, qualname = code_key
+    candidates = nodes_by_filepath.get(filepath, [])
+    node_key = None
+
+    if qualname == "<module>":
+        node_key = min(candidates, key=len, default=None)
+    else:
+        qualified_suffix = "." + qualname.replace(".<locals>", "")
+        named_candidates = [n for n in candidates if n.endswith(qualified_suffix)]
+
+        if len(named_candidates) == 1:
+            node_key = named_candidates[0]
+
+    if node_key is None:
+        node_key = _innermost_node(graph, candidates, first_lineno)
+
+    node_keys_by_code_key[code_key] = node_key
+
+    return node_key
+
+def _innermost_node(graph: dict, candidates: list[str], lineno: int) -> str | None:
+    containing = []
+
+    for node_key in candidates:
+        node_attrs = graph[node_key]
+        start, end = node_attrs.get("lineno"), node_attrs.get("end_lineno")
+
+        if start is not None and end is not None and start <= lineno <= end:
+            containing.append((end - start, node_key))
+
+    return min(containing)[1] if containing else None
@@ -1,40 +1,136 @@
 from collections import namedtuple
 import multiprocessing
 import select
+import time
 
-WithTimeoutResult = namedtuple("WithTimeoutResult", ["errors", "value"])
-
-
-def send_target_return_value_to_conn(conn, target, args, kwargs):
-    return_value = target(args, **kwargs)
-    conn.send(return_value)
-    conn.close()
+try:
+    import resource
+except ImportError:
+    resource = None
 
+WithTimeoutResult = namedtuple("WithTimeoutResult", ["errors", "value"])
 
-def with_timeout(target, args, kwargs, timeout):
-    errors = []
-    value = None
-
-    parent_conn, child_conn = multiprocessing.Pipe()
-    process = multiprocessing.Process(
-       target=send_target_return_value_to_conn,
-       args=(child_conn, target, args, kwargs),
-    )
-    process.start()
-
-    readable, _, _ = select.select([parent_conn], [], [], timeout)
 
-    if readable:
-        value = parent_conn.recv()
-        parent_conn.close()
-    else:
-        process.terminate()
-        parent_conn.close()
-        errors.append(multiprocessing.TimeoutError("Operation timed out"))
+def send_target_return_value_to_conn(conn, target, args, kwargs, memory_limit_bytes=None, report_progress=False):
+    if memory_limit_bytes:
+        limit_memory(memory_limit_bytes)
 
-    process.join()
+    conn.send(run_target(conn, target, args, kwargs, memory_limit_bytes, report_progress))
+    conn.close()
 
-    return WithTimeoutResult(errors=errors, value=value)
+# Runs in the analysis process, for both forked processes and pooled workers
+def run_target(conn, target, args, kwargs, memory_limit_bytes=None, report_progress=False) -> WithTimeoutResult:
+    if report_progress:
+        kwargs = {**kwargs, "progress": conn.send}
+
+    try:
+        return WithTimeoutResult(errors=[], value=target(args, **kwargs))
+    except MemoryError as error:
+        if memory_limit_bytes:
+            error = MemoryError(f"Operation exceeded memory limit of {memory_limit_bytes // (1024 * 1024)} MB")
+
+        return WithTimeoutResult(errors=[error], value=None)
+
+
+def limit_memory(memory_limit_bytes: int) -> None:
+    if not resource:
+        return
+
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    except (ValueError, OSError):
+        pass
+
+
+def with_timeout(target, args, kwargs, timeout, memory_limit_bytes=None, progress=None, pool=None):
+    if pool is not None:
+        return pool.run(target, args, kwargs, timeout, memory_limit_bytes=memory_limit_bytes, progress=progress)
+
+    return with_timeouts([(target, args, kwargs, progress)], timeout, memory_limit_bytes=memory_limit_bytes)[0]
+
+# Every process is forked from the calling thread up front and all of them are waited on together, so
+# running several analyses at once needs neither threads nor a start method that re-imports __main__
+def with_timeouts(calls: list[tuple], timeout, memory_limit_bytes=None) -> list[WithTimeoutResult]:
+    conns = []
+    processes = []
+
+    try:
+        for target, args, kwargs, progress in calls:
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+               target=send_target_return_value_to_conn,
+               args=(child_conn, target, args, kwargs, memory_limit_bytes, progress is not None),
+            )
+            conns.append(parent_conn)
+            process.start()
+            processes.append(process)
+            child_conn.close()
+
+        results = wait_for_results(conns, processes, timeout, [progress for *_call, progress in calls])
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for conn in conns:
+            conn.close()
+
+        for process in processes:
+            process.join()
+
+    return results
+
+def wait_for_result(conn, process, timeout, progress=None) -> WithTimeoutResult:
+    return wait_for_results([conn], [process], timeout, [progress])[0]
+
+def wait_for_results(conns: list, processes: list, timeout, progresses: list) -> list[WithTimeoutResult]:
+    errors = [[] for _ in conns]
+    values = [None for _ in conns]
+    pending = dict(enumerate(conns))
+    deadline = time.monotonic() + timeout if timeout is not None else None
+
+    while pending:
+        remaining = max(deadline - time.monotonic(), 0) if deadline is not None else None
+        readable, _, _ = select.select(list(pending.values()), [], [], remaining)
+
+        if not readable:
+            for index in pending:
+                processes[index].terminate()
+                errors[index].append(multiprocessing.TimeoutError("Operation timed out"))
+            break
+
+        for index in [i for i, conn in pending.items() if conn in readable]:
+            process = processes[index]
+
+            try:
+                message = conns[index].recv()
+            except (EOFError, ConnectionResetError):
+                process.join()
+                errors[index].append(ChildProcessError(f"Operation exited unexpectedly with exit code {process.exitcode}"))
+                del pending[index]
+                continue
+
+            if isinstance(message, WithTimeoutResult):
+                errors[index].extend(message.errors)
+                values[index] = message.value
+                del pending[index]
+                continue
+
+            # The callback is the caller's code, so the processes are stopped before its exceptions propagate
+            try:
+                proceed = progresses[index](message)
+            except BaseException:
+                for pending_index in pending:
+                    processes[pending_index].terminate()
+                    processes[pending_index].join()
+                raise
+
+            if proceed is False:
+                process.terminate()
+                errors[index].append(InterruptedError("Operation aborted by progress callback"))
+                del pending[index]
+
+    return [WithTimeoutResult(errors=e, value=v) for e, v in zip(errors, values)]
 
 def grouped_by_package(file_paths: list[str]):
     packages = {}
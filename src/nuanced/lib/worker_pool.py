@@ -0,0 +1,138 @@
+import multiprocessing
+import threading
+from nuanced.lib.utils import WithTimeoutResult, run_target, wait_for_result
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_MAX_TASKS_PER_WORKER = 20
+DEFAULT_PRELOAD = ["jarviscg", "nuanced.lib.call_graph"]
+
+
+class WorkerPool():
+    def __init__(
+        self,
+        *,
+        max_tasks_per_worker: int=DEFAULT_MAX_TASKS_PER_WORKER,
+        preload: list[str] | None=None,
+    ) -> None:
+        if max_tasks_per_worker < 1:
+            raise ValueError(f"max_tasks_per_worker must be a positive integer, got {max_tasks_per_worker}")
+
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._context = _context(DEFAULT_PRELOAD if preload is None else preload)
+        self._idle_workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def run(self, target, args, kwargs, timeout, memory_limit_bytes=None, progress=None) -> WithTimeoutResult:
+        task = (target, args, kwargs, memory_limit_bytes, progress is not None)
+        worker = self._acquire()
+
+        try:
+            worker.conn.send(task)
+        except OSError:
+            # The idle worker died, e.g. killed by the OOM killer, so start a fresh one
+            worker.stop()
+            worker = _Worker(self._context, self.max_tasks_per_worker)
+            worker.conn.send(task)
+
+        worker.tasks += 1
+
+        try:
+            result = wait_for_result(worker.conn, worker.process, timeout, progress)
+        except BaseException:
+            worker.stop()
+            raise
+
+        # A worker that timed out, was aborted, crashed or failed is killed rather than reused
+        if len(result.errors) > 0 or worker.tasks >= self.max_tasks_per_worker:
+            worker.stop()
+        else:
+            self._release(worker)
+
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle_workers, self._idle_workers = self._idle_workers, []
+
+        for worker in idle_workers:
+            worker.stop()
+
+    def _acquire(self) -> "_Worker":
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is closed")
+
+            if self._idle_workers:
+                return self._idle_workers.pop()
+
+        return _Worker(self._context, self.max_tasks_per_worker)
+
+    def _release(self, worker: "_Worker") -> None:
+        with self._lock:
+            if not self._closed:
+                self._idle_workers.append(worker)
+                return
+
+        worker.stop()
+
+
+class _Worker():
+    def __init__(self, context, max_tasks: int) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=serve, args=(child_conn, max_tasks), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+
+        self.conn.close()
+        self.process.join()
+
+
+def serve(conn, max_tasks: int) -> None:
+    for _task in range(max_tasks):
+        try:
+            target, args, kwargs, memory_limit_bytes, report_progress = conn.recv()
+        except EOFError:
+            break
+
+        limit_memory_soft(memory_limit_bytes)
+        conn.send(run_target(conn, target, args, kwargs, memory_limit_bytes, report_progress))
+
+    conn.close()
+
+# Only the soft limit is lowered, so that a later task in the same worker can raise it again
+def limit_memory_soft(memory_limit_bytes: int | None) -> None:
+    if not resource:
+        return
+
+    _soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes or hard_limit, hard_limit))
+    except (ValueError, OSError):
+        pass
+
+def _context(preload: list[str]):
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(preload)
+
+    return context
@@ -249,3 +249,226 @@ def test_generate_output_includes_file_path_and_line_numbers() -> None:
 
     diff = DeepDiff(expected, call_graph_dict, ignore_order=True)
     assert diff == {}
+
+def test_generate_with_max_chunk_files_analyzes_package_in_chunks(mocker) -> None:
+    entry_points = [
+        "tests/package_fixtures/__init__.py",
+        "tests/package_fixtures/fixture_class.py",
+        "tests/package_fixtures/scripts/script.py",
+        "tests/package_fixtures/nested_package/__init__.py",
+        "tests/package_fixtures/nested_package/mod_one.py",
+        "tests/package_fixtures/nested_modules/nested_fixture_class.py",
+    ]
+    generate_package_spy = mocker.spy(call_graph, "_generate_package_call_graph")
+
+    unchunked_call_graph_dict = call_graph.generate(entry_points)
+    unchunked_calls = generate_package_spy.call_count
+    chunked_call_graph_dict = call_graph.generate(entry_points, max_chunk_files=2)
+
+    assert generate_package_spy.call_count - unchunked_calls == 4
+    assert set(chunked_call_graph_dict.keys()) == set(unchunked_call_graph_dict.keys())
+    diff = DeepDiff(
+        unchunked_call_graph_dict["tests.package_fixtures.scripts.script.run"]["callees"],
+        chunked_call_graph_dict["tests.package_fixtures.scripts.script.run"]["callees"],
+        ignore_order=True,
+    )
+    assert diff == {}
+
+def test_chunked_splits_by_sub_package() -> None:
+    file_paths = [
+        "pkg/__init__.py",
+        "pkg/a/__init__.py",
+        "pkg/a/one.py",
+        "pkg/a/two.py",
+        "pkg/a/deep/three.py",
+        "pkg/b/four.py",
+        "pkg/c.py",
+    ]
+
+    chunks = call_graph.chunked(file_paths, "pkg", 3)
+
+    assert chunks == [
+        ["pkg/a/__init__.py", "pkg/a/one.py", "pkg/a/two.py"],
+        ["pkg/a/deep/three.py"],
+        ["pkg/__init__.py", "pkg/c.py", "pkg/b/four.py"],
+    ]
+
+def test_stitched_resolves_partially_qualified_callees() -> None:
+    graph = {
+        "pkg.a.caller": { "filepath": "a.py", "callees": ["b.callee", "pkg.b.callee", "datetime.datetime.now", "b.ambiguous"] },
+        "pkg.b.callee": { "filepath": "b.py", "callees": [] },
+        "pkg.b.ambiguous": { "filepath": "b.py", "callees": [] },
+        "other.b.ambiguous": { "filepath": "other.py", "callees": [] },
+    }
+
+    stitched_graph = call_graph.stitched(graph)
+
+    assert stitched_graph["pkg.a.caller"]["callees"] == ["pkg.b.callee", "datetime.datetime.now", "b.ambiguous"]
+
+def test_stitched_resolves_class_callees_to_constructors() -> None:
+    graph = {
+        "pkg.a": { "filepath": "a.py", "callees": ["pkg.a.Thing", "pkg.a.Bare"] },
+        "pkg.a.Thing.__init__": { "filepath": "a.py", "callees": [] },
+        "pkg.b.make": { "filepath": "b.py", "callees": ["pkg.a.Thing", "a.Thing", "pkg.a.Bare", "pkg.c.Other"] },
+    }
+
+    stitched_graph = call_graph.stitched(graph)
+
+    assert stitched_graph["pkg.a"]["callees"] == ["pkg.a.Thing", "pkg.a.Bare"]
+    assert stitched_graph["pkg.b.make"]["callees"] == ["pkg.a.Thing.__init__", "pkg.c.Other"]
+
+def test_generate_with_max_chunk_files_keeps_constructor_calls_across_chunks(tmp_path, monkeypatch) -> None:
+    (tmp_path / "pkg" / "a").mkdir(parents=True)
+    (tmp_path / "pkg" / "b").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "a" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "a" / "one.py").write_text(
+        "class Thing:\n    def __init__(self):\n        self.value = helper()\n\n"
+        "def helper():\n    return 1\n\nclass Bare:\n    pass\n"
+    )
+    (tmp_path / "pkg" / "b" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "b" / "two.py").write_text(
+        "from pkg.a.one import Bare, Thing, helper\n\ndef make():\n    helper()\n    Bare()\n    return Thing()\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    entry_points = ["pkg/__init__.py", "pkg/a/__init__.py", "pkg/a/one.py", "pkg/b/__init__.py", "pkg/b/two.py"]
+
+    unchunked_call_graph_dict = call_graph.generate(entry_points)
+    chunked_call_graph_dict = call_graph.generate(entry_points, max_chunk_files=2)
+
+    assert "pkg.a.one.Thing.__init__" in unchunked_call_graph_dict["pkg.b.two.make"]["callees"]
+    assert DeepDiff(unchunked_call_graph_dict, chunked_call_graph_dict, ignore_order=True) == {}
+
+def test_groups_lists_package_groups_before_module_groups() -> None:
+    entry_points = [
+        "tests/module_fixtures/module_one.py",
+        "tests/package_fixtures/nested_package/__init__.py",
+        "tests/package_fixtures/nested_package/mod_one.py",
+    ]
+
+    groups = call_graph.groups(entry_points)
+
+    assert groups == [
+        call_graph.CallGraphGroup("package", "tests/package_fixtures/nested_package", entry_points[1:]),
+        call_graph.CallGraphGroup("modules", "tests/module_fixtures", entry_points[:1]),
+    ]
+
+def test_combine_replays_group_precedence() -> None:
+    package_one = call_graph.CallGraphGroup("package", "one", [])
+    package_two = call_graph.CallGraphGroup("package", "two", [])
+    modules_one = call_graph.CallGraphGroup("modules", "three", [])
+    modules_two = call_graph.CallGraphGroup("modules", "four", [])
+
+    graph = call_graph.combine([
+        (package_one, { "shared": "package_one", "package_one": "package_one" }),
+        (modules_one, { "shared": "modules_one", "modules": "modules_one" }),
+        (package_two, { "shared": "package_two" }),
+        (modules_two, { "modules": "modules_two", "modules_two": "modules_two" }),
+    ])
+
+    assert graph == {
+        "shared": "package_two",
+        "package_one": "package_one",
+        "modules": "modules_one",
+        "modules_two": "modules_two",
+    }
+
+def test_shard_group_indices_assigns_every_group_to_one_shard() -> None:
+    groups = [call_graph.CallGraphGroup("package", f"/repo/pkg{i}", ["f.py"] * (i + 1)) for i in range(7)]
+
+    shards = [call_graph.shard_group_indices(groups, i, 3, root="/repo") for i in range(1, 4)]
+
+    assert sorted(i for shard in shards for i in shard) == list(range(7))
+    assert shards == [call_graph.shard_group_indices(groups, i, 3, root="/repo") for i in range(1, 4)]
+    assert [sum(len(groups[i].file_paths) for i in shard) for shard in shards] == [10, 9, 9]
+
+def test_generate_shard_graphs_combine_to_generated_graph() -> None:
+    package_path = os.path.abspath("tests")
+    entry_points = [
+        os.path.abspath("tests/module_fixtures/module_one.py"),
+        os.path.abspath("tests/module_fixtures/module_two.py"),
+        os.path.abspath("tests/package_fixtures/nested_package/__init__.py"),
+        os.path.abspath("tests/package_fixtures/nested_package/mod_one.py"),
+    ]
+
+    group_graphs = [
+        g
+        for i in (1, 2)
+        for g in call_graph.generate_shard(entry_points, shard_index=i, shard_count=2, package_path=package_path)
+    ]
+    group_graphs.sort(key=lambda g: g["index"])
+    combined_graph = call_graph.combine([(call_graph.CallGraphGroup(g["kind"], g["dir_path"], []), g["graph"]) for g in group_graphs])
+
+    assert [g["dir_path"] for g in group_graphs] == ["package_fixtures/nested_package", "module_fixtures"]
+    assert combined_graph.keys() == call_graph.generate(entry_points, package_path=package_path).keys()
+
+def test_relativized_and_resolve_filepaths_round_trip() -> None:
+    graph = {
+        "pkg.mod.fn": { "filepath": "/repo/pkg/mod.py", "callees": [] },
+        "other.fn": { "filepath": "/elsewhere/other.py", "callees": [] },
+    }
+
+    relative_graph = call_graph.relativized(graph, "/repo")
+
+    assert relative_graph["pkg.mod.fn"]["filepath"] == "pkg/mod.py"
+    assert relative_graph["other.fn"]["filepath"] == "/elsewhere/other.py"
+    assert graph["pkg.mod.fn"]["filepath"] == "/repo/pkg/mod.py"
+    assert call_graph.resolve_filepaths(relative_graph, "/checkout")["pkg.mod.fn"]["filepath"] == "/checkout/pkg/mod.py"
+
+def test_generate_with_package_path_does_not_depend_on_cwd(tmp_path, monkeypatch) -> None:
+    package_path = os.path.abspath("tests/package_fixtures")
+    entry_points = [
+        os.path.abspath("tests/package_fixtures/nested_package/__init__.py"),
+        os.path.abspath("tests/package_fixtures/nested_package/mod_one.py"),
+        os.path.abspath("tests/package_fixtures/scripts/script.py"),
+    ]
+    call_graph_dict = call_graph.generate(entry_points, package_path=package_path)
+
+    monkeypatch.chdir(tmp_path)
+    call_graph_dict_from_tmp_path = call_graph.generate(entry_points, package_path=package_path)
+
+    assert "nested_package.mod_one" in call_graph_dict
+    assert call_graph_dict.keys() == call_graph_dict_from_tmp_path.keys()
+
+def write_dependent_packages(root) -> list[str]:
+    (root / "a").mkdir()
+    (root / "b").mkdir()
+    (root / "a" / "__init__.py").write_text("from a.m import f\n")
+    (root / "a" / "m.py").write_text("def f():\n    return g()\n\ndef g():\n    return 1\n")
+    (root / "b" / "__init__.py").write_text("")
+    (root / "b" / "n.py").write_text("from a.m import f\n\ndef h():\n    return f()\n")
+
+    return sorted(str(p) for p in root.glob("**/*.py"))
+
+def test_generate_groups_does_not_depend_on_group_order(tmp_path) -> None:
+    entry_points = write_dependent_packages(tmp_path)
+
+    in_order = call_graph.generate_groups(entry_points, group_indices=[0, 1], package_path=str(tmp_path))
+    reversed_order = call_graph.generate_groups(entry_points, group_indices=[1, 0], package_path=str(tmp_path))
+
+    assert sorted(in_order, key=lambda g: g["index"]) == sorted(reversed_order, key=lambda g: g["index"])
+    assert in_order[1]["graph"]["a.m.f"]["callees"] == ["a.m.g"]
+
+def test_generate_with_order_combines_in_group_order(tmp_path) -> None:
+    entry_points = write_dependent_packages(tmp_path)
+
+    call_graph_dict = call_graph.generate(entry_points, package_path=str(tmp_path), order=[1, 0])
+
+    assert call_graph_dict == call_graph.generate(entry_points, package_path=str(tmp_path))
+
+def test_generate_with_precision_levels_trades_edges_for_speed(tmp_path) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "mod.py").write_text("import json\n\ndef f():\n    return 1\n\ndef g():\n    return json.dumps(f())\n")
+    entry_points = sorted(str(p) for p in tmp_path.glob("**/*.py"))
+
+    graphs = {
+        level: call_graph.generate(entry_points, package_path=str(tmp_path), precision=level)
+        for level in call_graph.PRECISION_LEVELS
+    }
+
+    assert graphs["default"] == call_graph.generate(entry_points, package_path=str(tmp_path))
+    assert graphs["coarse"]["pkg.mod.g"]["callees"] == ["pkg.mod.f"]
+    assert sorted(graphs["default"]["pkg.mod.g"]["callees"]) == ["json.dumps", "pkg.mod.f"]
+    assert sorted(graphs["precise"]["pkg.mod.g"]["callees"]) == ["json.dumps", "pkg.mod.f"]
+    assert {n["filepath"] for n in graphs["precise"].values()} == set(entry_points)
@@ -1,10 +1,14 @@
 from deepdiff import DeepDiff
+import io
 import json
 import os
+from rich.console import Console
 from typer.testing import CliRunner
 from nuanced import CodeGraph, __version__
-from nuanced.cli import app
-from nuanced.code_graph import CodeGraphResult, EnrichmentResult, DEFAULT_INIT_TIMEOUT_SECONDS
+from nuanced.cli import app, _init_progress
+from nuanced.code_graph import BundleResult, CodeGraphResult, EnrichmentResult, PlanResult, ProfileResult, ShardResult
+from nuanced.lib.progress import ProgressEvent
+from nuanced.lib.pruning import PruningPolicy
 
 
 runner = CliRunner()
@@ -98,7 +102,7 @@ def test_enrich_fails_to_find_function_errors(mocker, monkeypatch):
     monkeypatch.setattr(
         code_graph,
         "enrich",
-        lambda file_path, function_name, include_builtins: error_result
+        lambda file_path, function_name, include_builtins, include_source, max_nodes, sort_by_importance: error_result
     )
     mocker.patch(
         "nuanced.cli.CodeGraph.load",
@@ -119,7 +123,7 @@ def test_enrich_fails_to_enrich_function_errors(mocker, monkeypatch):
     monkeypatch.setattr(
         code_graph,
         "enrich",
-        lambda file_path, function_name, include_builtins: error_result
+        lambda file_path, function_name, include_builtins, include_source, max_nodes, sort_by_importance: error_result
     )
     mocker.patch(
         "nuanced.cli.CodeGraph.load",
@@ -171,6 +175,9 @@ def test_enrich_supports_include_builtins_option(mocker):
         "file_path": "foo.py",
         "function_name": "bar",
         "include_builtins": True,
+        "include_source": False,
+        "max_nodes": None,
+        "sort_by_importance": False,
     }
     code_graph_spy = mocker.spy(code_graph, "enrich")
 
@@ -191,6 +198,9 @@ def test_enrich_disables_include_builtins_option_by_default(mocker):
         "file_path": "foo.py",
         "function_name": "bar",
         "include_builtins": False,
+        "include_source": False,
+        "max_nodes": None,
+        "sort_by_importance": False,
     }
     code_graph_spy = mocker.spy(code_graph, "enrich")
 
@@ -203,7 +213,7 @@ def test_init_applies_timeout_when_present(mocker) -> None:
     code_graph = mocker.MagicMock()
     mocker.patch(
         "nuanced.cli.CodeGraph.init",
-        lambda directory, timeout_seconds: CodeGraphResult(code_graph=code_graph, errors=[]),
+        lambda directory, **kwargs: CodeGraphResult(code_graph=code_graph, errors=[]),
     )
     init_spy = mocker.spy(CodeGraph, "init")
     path = "."
@@ -211,13 +221,14 @@ def test_init_applies_timeout_when_present(mocker) -> None:
 
     runner.invoke(app, ["init", path, "--timeout-seconds", "30"])
 
-    init_spy.assert_called_with(abspath, timeout_seconds=30)
+    assert init_spy.call_args.args == (abspath,)
+    assert init_spy.call_args.kwargs["timeout_seconds"] == 30
 
-def test_init_applies_default_timeout(mocker) -> None:
+def test_init_applies_planned_timeout(mocker) -> None:
     code_graph = mocker.MagicMock()
     mocker.patch(
         "nuanced.cli.CodeGraph.init",
-        lambda directory, timeout_seconds: CodeGraphResult(code_graph=code_graph, errors=[]),
+        lambda directory, **kwargs: CodeGraphResult(code_graph=code_graph, errors=[]),
     )
     init_spy = mocker.spy(CodeGraph, "init")
     path = "."
@@ -225,4 +236,430 @@ def test_init_applies_default_timeout(mocker) -> None:
 
     runner.invoke(app, ["init", path])
 
-    init_spy.assert_called_with(abspath, timeout_seconds=DEFAULT_INIT_TIMEOUT_SECONDS)
+    assert init_spy.call_args.args == (abspath,)
+    assert init_spy.call_args.kwargs["timeout_seconds"] is None
+
+def test_search_prints_matches(mocker):
+    graph = { "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 3, "end_lineno": 5 } }
+    code_graph = CodeGraph(graph=graph)
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["search", "bar", "--limit", "3"])
+    matches = json.loads(result.stdout)
+
+    assert result.exit_code == 0
+    assert matches[0]["name"] == "foo.bar"
+    assert matches[0]["filepath"] == os.path.abspath("foo.py")
+
+def test_search_fails_to_load_graph_errors(mocker):
+    error = FileNotFoundError(f"Nuanced Graph not found in {os.path.abspath('./')}")
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=None, errors=[error]),
+    )
+
+    result = runner.invoke(app, ["search", "bar"])
+
+    assert str(error) in result.stderr
+    assert result.exit_code == 1
+
+def test_enrich_supports_include_source_option(mocker):
+    code_graph = mocker.MagicMock()
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+    code_graph_spy = mocker.spy(code_graph, "enrich")
+
+    runner.invoke(app, ["enrich", "foo.py", "bar", "--include-source"])
+
+    assert code_graph_spy.mock_calls[0].kwargs["include_source"] == True
+    code_graph.__exit__.assert_called_once()
+
+def test_enrich_supports_compact_format_option(mocker):
+    graph = {
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": ["foo.baz"], "lineno": 3, "end_lineno": 5 },
+        "foo.baz": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 7, "end_lineno": 9 },
+    }
+    code_graph = CodeGraph(graph=graph)
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["enrich", "foo.py", "bar", "--format", "compact"])
+    output = json.loads(result.stdout)
+
+    assert result.exit_code == 0
+    assert output["files"] == [os.path.abspath("foo.py")]
+    assert output["nodes"]["foo.baz"]["file"] == 0
+
+def test_enrich_with_unsupported_format_errors(mocker):
+    load_spy = mocker.spy(CodeGraph, "load")
+
+    result = runner.invoke(app, ["enrich", "foo.py", "bar", "--format", "yaml"])
+
+    assert 'Unsupported format "yaml"' in result.stderr
+    assert result.exit_code == 1
+    load_spy.assert_not_called()
+
+def test_enrich_with_federated_option_loads_federated_graph(mocker):
+    graph = { "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 3, "end_lineno": 5 } }
+    code_graph = CodeGraph(graph=graph)
+    mocker.patch(
+        "nuanced.cli.FederatedCodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+    load_spy = mocker.spy(CodeGraph, "load")
+
+    result = runner.invoke(app, ["enrich", "foo.py", "bar", "--federated"])
+
+    assert result.exit_code == 0
+    assert "foo.bar" in json.loads(result.stdout)
+    load_spy.assert_not_called()
+
+def test_stats_prints_graph_stats(mocker):
+    graph = { "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": ["foo.bar"], "lineno": 3, "end_lineno": 5 } }
+    code_graph = CodeGraph(graph=graph)
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["stats"])
+    stats = json.loads(result.stdout)
+
+    assert result.exit_code == 0
+    assert stats["nodes"] == 1
+    assert stats["edges"] == 1
+
+def test_init_applies_pruning_options(mocker) -> None:
+    code_graph = mocker.MagicMock()
+    mocker.patch(
+        "nuanced.cli.CodeGraph.init",
+        lambda directory, **kwargs: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+    init_spy = mocker.spy(CodeGraph, "init")
+    expected_pruning_policy = PruningPolicy(
+        drop_builtins=True,
+        exclude_tests=True,
+        exclude_generated=False,
+        hub_fan_in_threshold=50,
+    )
+
+    runner.invoke(app, ["init", ".", "--drop-builtins", "--exclude-tests", "--collapse-hubs-above", "50"])
+
+    assert init_spy.call_args.kwargs["pruning_policy"] == expected_pruning_policy
+
+def test_enrich_supports_max_nodes_option(mocker):
+    code_graph = mocker.MagicMock()
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+    code_graph_spy = mocker.spy(code_graph, "enrich")
+
+    runner.invoke(app, ["enrich", "foo.py", "bar", "--max-nodes", "5", "--sort-by-importance"])
+
+    assert code_graph_spy.mock_calls[0].kwargs["max_nodes"] == 5
+    assert code_graph_spy.mock_calls[0].kwargs["sort_by_importance"] == True
+
+def test_trace_runs_command_and_merges_calls(mocker, tmp_path):
+    script_path = tmp_path / "script.py"
+    script_path.write_text("def main():\n    return 1\n\nmain()\n")
+    graph = {
+        "script": { "filepath": str(script_path), "callees": [], "lineno": 1, "end_lineno": 4 },
+        "script.main": { "filepath": str(script_path), "callees": [], "lineno": 1, "end_lineno": 2 },
+    }
+    nuanced_dirpath = str(tmp_path / CodeGraph.NUANCED_DIRNAME)
+    code_graph = CodeGraph._persist(nuanced_dirpath, graph)
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["trace", "--", str(script_path)])
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["new_edges"] == 1
+    assert code_graph.graph["script"]["runtime_callees"] == ["script.main"]
+
+def test_trace_exits_with_exit_code_of_command(mocker, tmp_path):
+    script_path = tmp_path / "script.py"
+    script_path.write_text("raise SystemExit(2)\n")
+    graph = { "script": { "filepath": str(script_path), "callees": [], "lineno": 1, "end_lineno": 1 } }
+    code_graph = CodeGraph._persist(str(tmp_path / CodeGraph.NUANCED_DIRNAME), graph)
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["trace", "--", str(script_path)])
+
+    assert result.exit_code == 2
+
+def test_init_with_shard_option_initializes_shard(mocker) -> None:
+    init_shard_spy = mocker.patch(
+        "nuanced.cli.CodeGraph.init_shard",
+        return_value=ShardResult(errors=[], result="shard-2-of-4.json"),
+    )
+
+    result = runner.invoke(app, ["init", ".", "--shard", "2/4"])
+
+    assert result.exit_code == 0
+    assert init_shard_spy.call_args.args[1:] == (2, 4)
+
+def test_init_with_invalid_shard_option_errors() -> None:
+    result = runner.invoke(app, ["init", ".", "--shard", "two"])
+
+    assert 'Invalid shard "two"' in result.stderr
+    assert result.exit_code == 1
+
+def test_merge_reports_errors(mocker) -> None:
+    error = ValueError("Missing shards")
+    mocker.patch(
+        "nuanced.cli.CodeGraph.merge_shards",
+        lambda path: CodeGraphResult(code_graph=None, errors=[error]),
+    )
+
+    result = runner.invoke(app, ["merge", "."])
+
+    assert "Missing shards" in result.stderr
+    assert result.exit_code == 1
+
+def test_export_prints_bundle_path(mocker):
+    code_graph = mocker.MagicMock()
+    code_graph.export_bundle.return_value = BundleResult(errors=[], result="/tmp/nuanced-abc123.tar.gz")
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["export", "--output", "/tmp", "--commit", "abc123"])
+
+    assert result.exit_code == 0
+    assert "nuanced-abc123.tar.gz" in result.stdout
+    assert code_graph.export_bundle.call_args.kwargs["commit"] == "abc123"
+
+def test_import_reports_errors(mocker):
+    error = ValueError("Bundle was built at commit abc123")
+    mocker.patch(
+        "nuanced.cli.CodeGraph.import_bundle",
+        lambda bundle_path, path, force: CodeGraphResult(code_graph=None, errors=[error]),
+    )
+
+    result = runner.invoke(app, ["import", "nuanced-abc123.tar.gz"])
+
+    assert str(error) in result.stderr
+    assert result.exit_code == 1
+
+def test_profile_prints_report(mocker) -> None:
+    report = { "groups": [], "over_budget_files": [], "quarantined": [] }
+    profile_spy = mocker.patch(
+        "nuanced.cli.CodeGraph.profile",
+        return_value=ProfileResult(errors=[], result=report),
+    )
+
+    result = runner.invoke(app, ["profile", ".", "--file-budget-seconds", "2.5", "--quarantine", "--precision", "coarse"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) == report
+    assert profile_spy.call_args.kwargs["file_budget_seconds"] == 2.5
+    assert profile_spy.call_args.kwargs["quarantine"] == True
+    assert profile_spy.call_args.kwargs["precision"] == "coarse"
+
+def test_init_applies_quarantine_above_option(mocker) -> None:
+    code_graph = mocker.MagicMock()
+    code_graph.metadata = { "quarantined": ["slow.py"] }
+    init_spy = mocker.patch(
+        "nuanced.cli.CodeGraph.init",
+        return_value=CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["init", ".", "--quarantine-above", "3"])
+
+    assert init_spy.call_args.kwargs["quarantine_above_seconds"] == 3.0
+    assert "Skipped 1 quarantined files" in result.stderr
+
+def test_init_progress_renders_progress_bar() -> None:
+    output = io.StringIO()
+    console = Console(force_terminal=True, file=output)
+    event = ProgressEvent(
+        kind="group_finished",
+        dir_path="pkg",
+        groups_done=1,
+        groups_total=2,
+        files_done=3,
+        files_total=4,
+        group_seconds=0.5,
+        elapsed_seconds=0.5,
+        eta_seconds=0.2,
+    )
+
+    with _init_progress(console) as on_progress:
+        on_progress(event)
+
+    assert "Analyzing pkg (1/2 groups)" in output.getvalue()
+    assert "3/4" in output.getvalue()
+
+def test_init_progress_without_terminal_is_disabled() -> None:
+    console = Console(file=io.StringIO())
+
+    with _init_progress(console) as on_progress:
+        assert on_progress is None
+
+def test_deps_prints_dependencies(mocker) -> None:
+    graph = {
+        "foo": { "filepath": os.path.abspath("foo.py"), "callees": [] },
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": ["baz.qux"] },
+        "baz": { "filepath": os.path.abspath("baz.py"), "callees": [] },
+        "baz.qux": { "filepath": os.path.abspath("baz.py"), "callees": [] },
+    }
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=CodeGraph(graph), errors=[]),
+    )
+
+    result = runner.invoke(app, ["deps", "baz", "--level", "module"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["callers"] == [{ "name": "foo", "calls": 1 }]
+
+def test_deps_with_invalid_level_errors() -> None:
+    result = runner.invoke(app, ["deps", "baz", "--level", "function"])
+
+    assert 'Unsupported level "function"' in result.stderr
+    assert result.exit_code == 1
+
+def test_unreachable_prints_unreachable_functions(mocker) -> None:
+    graph = {
+        "foo.main": { "filepath": os.path.abspath("foo.py"), "callees": ["foo.bar"] },
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": [] },
+        "foo.baz": { "filepath": os.path.abspath("foo.py"), "callees": [] },
+    }
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=CodeGraph(graph), errors=[]),
+    )
+
+    result = runner.invoke(app, ["unreachable", "--entry", "foo.main"])
+
+    assert result.exit_code == 0
+    assert [f["name"] for f in json.loads(result.stdout)["unreachable_functions"]] == ["foo.baz"]
+
+def test_unreachable_without_entry_points_errors(mocker) -> None:
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=CodeGraph({}), errors=[]),
+    )
+
+    result = runner.invoke(app, ["unreachable"])
+
+    assert "At least one entry point pattern is required" in result.stderr
+    assert result.exit_code == 1
+
+def test_affected_tests_prints_pytest_node_ids(mocker) -> None:
+    graph = {
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 },
+        "test_foo": { "filepath": os.path.abspath("test_foo.py"), "callees": [], "lineno": 1, "end_lineno": 9 },
+        "test_foo.test_bar": { "filepath": os.path.abspath("test_foo.py"), "callees": ["foo.bar"], "lineno": 1, "end_lineno": 2 },
+        "test_foo.test_baz": { "filepath": os.path.abspath("test_foo.py"), "callees": [], "lineno": 4, "end_lineno": 5 },
+    }
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=CodeGraph(graph), errors=[]),
+    )
+    diff = "--- a/foo.py\n+++ b/foo.py\n@@ -2 +2 @@\n-    return 1\n+    return 2\n"
+
+    result = runner.invoke(app, ["affected-tests", "--diff", "-"], input=diff)
+
+    assert result.exit_code == 0
+    assert result.stdout == "test_foo.py::test_bar\n"
+
+def test_affected_tests_reports_files_missing_from_graph(mocker) -> None:
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=CodeGraph({}), errors=[]),
+    )
+
+    result = runner.invoke(app, ["affected-tests", "--diff", "foo.py:3"])
+
+    assert result.exit_code == 0
+    assert "foo.py is not in the graph" in result.stderr
+
+def test_init_with_rev_passes_revision(mocker) -> None:
+    init_spy = mocker.patch("nuanced.cli.CodeGraph.init", return_value=CodeGraphResult(code_graph=None, errors=[]))
+
+    result = runner.invoke(app, ["init", ".", "--rev", "v1.0"])
+
+    assert result.exit_code == 0
+    assert init_spy.call_args.kwargs["rev"] == "v1.0"
+    assert f"Initializing {os.path.abspath('.')} at v1.0" in result.stdout
+
+def test_init_with_rev_and_shard_errors() -> None:
+    result = runner.invoke(app, ["init", ".", "--rev", "v1.0", "--shard", "1/2"])
+
+    assert "--rev cannot be combined" in result.stderr
+    assert result.exit_code == 1
+
+def test_init_with_precision_passes_level(mocker) -> None:
+    init_spy = mocker.patch("nuanced.cli.CodeGraph.init", return_value=CodeGraphResult(code_graph=None, errors=[]))
+
+    result = runner.invoke(app, ["init", ".", "--precision", "precise"])
+
+    assert result.exit_code == 0
+    assert init_spy.call_args.kwargs["precision"] == "precise"
+
+def test_init_with_unsupported_precision_errors() -> None:
+    result = runner.invoke(app, ["init", ".", "--precision", "exact"])
+
+    assert "Unsupported precision \"exact\"" in result.stderr
+    assert result.exit_code == 1
+
+def test_diff_prints_structural_diff(tmp_path) -> None:
+    (tmp_path / "old.json").write_text(json.dumps({ "foo.bar": { "filepath": "foo.py", "callees": [] } }))
+    (tmp_path / "new.json").write_text(json.dumps({}))
+
+    result = runner.invoke(app, ["diff", str(tmp_path / "old.json"), str(tmp_path / "new.json")])
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["functions_removed"][0]["name"] == "foo.bar"
+
+def test_diff_with_missing_graph_errors(tmp_path) -> None:
+    result = runner.invoke(app, ["diff", str(tmp_path / "old.json"), str(tmp_path / "new.json")])
+
+    assert "No such file or directory" in result.stderr
+    assert result.exit_code == 1
+
+def test_enrich_at_revision_uses_historical_graph(mocker) -> None:
+    code_graph = mocker.MagicMock()
+    historical_code_graph = mocker.MagicMock()
+    historical_code_graph.metadata = { "commit": "a1", "requested_commit": "b2" }
+    historical_code_graph.enrich.return_value = EnrichmentResult(errors=[], result={ "foo.bar": {} })
+    code_graph.at.return_value = CodeGraphResult(code_graph=historical_code_graph, errors=[])
+    mocker.patch(
+        "nuanced.cli.CodeGraph.load",
+        lambda directory: CodeGraphResult(code_graph=code_graph, errors=[]),
+    )
+
+    result = runner.invoke(app, ["enrich", "foo.py", "bar", "--at", "v1.0"])
+
+    assert result.exit_code == 0
+    assert code_graph.at.call_args.args == ("v1.0",)
+    assert "using the graph recorded at ancestor a1" in result.stderr
+    assert json.loads(result.stdout) == { "foo.bar": {} }
+
+def test_init_with_plan_option_prints_plan_without_initializing(mocker) -> None:
+    plan = { "workers": 2, "timeout_seconds": 90, "groups": [] }
+    plan_spy = mocker.patch("nuanced.cli.CodeGraph.plan", return_value=PlanResult(errors=[], result=plan))
+    init_spy = mocker.patch("nuanced.cli.CodeGraph.init")
+
+    result = runner.invoke(app, ["init", ".", "--plan", "--workers", "2"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) == plan
+    assert plan_spy.call_args.kwargs["workers"] == 2
+    assert not init_spy.called
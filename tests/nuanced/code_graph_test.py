@@ -2,25 +2,29 @@ import json
 import multiprocessing
 import os
 import pytest
+import subprocess
+import sys
+import threading
 from pathlib import Path, PosixPath
 import nuanced
 from nuanced import CodeGraph
-from nuanced.code_graph import DEFAULT_INIT_TIMEOUT_SECONDS
 from nuanced.lib.call_graph import generate, BUILTIN_FUNCTION_PREFIX
+from nuanced.lib.pruning import PruningPolicy
+from nuanced.lib.tracer import CallTracer
 from nuanced.lib.utils import WithTimeoutResult
 
-def generate_call_graph(target, args, kwargs, timeout):
-    call_graph_dict = target(args, **kwargs)
+def generate_call_graph(target, args, kwargs, timeout, memory_limit_bytes=None, progress=None, pool=None):
+    call_graph_dict = target(args, **kwargs, progress=progress)
     return WithTimeoutResult(errors=[], value=call_graph_dict)
 
-def timeout_call_graph_generation(target, args, kwargs, timeout):
+def timeout_call_graph_generation(target, args, kwargs, timeout, memory_limit_bytes=None, progress=None, pool=None):
     errors = [multiprocessing.TimeoutError("Operation timed out")]
     return WithTimeoutResult(errors=errors, value=None)
 
-def test_init_with_timeout_applies_timeout(mocker) -> None:
+def test_init_with_timeout_applies_timeout(mocker, package_fixtures_path) -> None:
     mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
     with_timeout_spy = mocker.spy(nuanced.code_graph, "with_timeout")
-    path = "tests/package_fixtures"
+    path = package_fixtures_path
     timeout_seconds = 1
 
     CodeGraph.init(path, timeout_seconds=timeout_seconds)
@@ -28,31 +32,34 @@ def test_init_with_timeout_applies_timeout(mocker) -> None:
     received_timeout = with_timeout_spy.call_args.kwargs["timeout"]
     assert received_timeout == timeout_seconds
 
-def test_init_without_timeout_applies_default_timeout(mocker) -> None:
+def test_init_without_timeout_applies_planned_timeout(mocker, package_fixtures_path) -> None:
     mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
     with_timeout_spy = mocker.spy(nuanced.code_graph, "with_timeout")
-    path = "tests/package_fixtures"
+    path = package_fixtures_path
+    planned_timeout = CodeGraph.plan(path).result["timeout_seconds"]
 
     CodeGraph.init(path)
 
     received_timeout = with_timeout_spy.call_args.kwargs["timeout"]
-    assert received_timeout == DEFAULT_INIT_TIMEOUT_SECONDS
+    assert received_timeout == planned_timeout
 
-def test_init_with_valid_path_generates_graph_with_expected_files(mocker) -> None:
+def test_init_with_valid_path_generates_graph_with_expected_files(mocker, package_fixtures_path) -> None:
+    os.makedirs(os.path.join(package_fixtures_path, CodeGraph.NUANCED_DIRNAME))
     mocker.patch("os.makedirs", lambda _dirname, exist_ok=True: None)
     mock_file = mocker.mock_open()
     mocker.patch("builtins.open", mock_file)
+    mocker.patch("nuanced.lib.atomic.write_atomic")
     mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
     call_graph_generate_spy = mocker.spy(nuanced.lib.call_graph, "generate")
-    path = "tests/package_fixtures"
+    path = package_fixtures_path
     expected_package = os.path.abspath(path)
     expected_filepaths = [
-        os.path.abspath("tests/package_fixtures/__init__.py"),
-        os.path.abspath("tests/package_fixtures/fixture_class.py"),
-        os.path.abspath("tests/package_fixtures/nested_modules/nested_fixture_class.py"),
-        os.path.abspath("tests/package_fixtures/scripts/script.py"),
-        os.path.abspath("tests/package_fixtures/nested_package/__init__.py"),
-        os.path.abspath("tests/package_fixtures/nested_package/mod_one.py"),
+        os.path.join(package_fixtures_path, "__init__.py"),
+        os.path.join(package_fixtures_path, "fixture_class.py"),
+        os.path.join(package_fixtures_path, "nested_modules/nested_fixture_class.py"),
+        os.path.join(package_fixtures_path, "scripts/script.py"),
+        os.path.join(package_fixtures_path, "nested_package/__init__.py"),
+        os.path.join(package_fixtures_path, "nested_package/mod_one.py"),
     ]
 
     CodeGraph.init(path)
@@ -72,8 +79,8 @@ def test_init_with_invalid_path_returns_errors(mocker) -> None:
     assert len(code_graph_result.errors) == 1
     assert type(code_graph_result.errors[0]) == FileNotFoundError
 
-def test_init_with_no_eligible_files_returns_errors(mocker) -> None:
-    no_eligible_files_path = "tests/package_fixtures/ineligible"
+def test_init_with_no_eligible_files_returns_errors(mocker, package_fixtures_path) -> None:
+    no_eligible_files_path = os.path.join(package_fixtures_path, "ineligible")
     os.mkdir(no_eligible_files_path)
 
     code_graph_result = CodeGraph.init(no_eligible_files_path)
@@ -82,27 +89,34 @@ def test_init_with_no_eligible_files_returns_errors(mocker) -> None:
     assert str(code_graph_result.errors[0]) == f"No eligible files found in {os.path.abspath(no_eligible_files_path)}"
     os.rmdir(no_eligible_files_path)
 
-def test_init_with_valid_path_persists_code_graph(mocker) -> None:
+def test_init_with_valid_path_persists_code_graph(mocker, package_fixtures_path) -> None:
+    os.makedirs(os.path.join(package_fixtures_path, CodeGraph.NUANCED_DIRNAME))
     mocker.patch("os.makedirs", lambda _dirname, exist_ok=True: None)
     os_spy = mocker.spy(os, "makedirs")
     mock_file = mocker.mock_open()
     mocker.patch("builtins.open", mock_file)
+    mocker.patch("nuanced.lib.atomic.write_atomic")
     mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
-    expected_path = os.path.abspath(f"tests/package_fixtures/{CodeGraph.NUANCED_DIRNAME}")
+    write_atomic_spy = nuanced.lib.atomic.write_atomic
+    expected_path = os.path.join(package_fixtures_path, CodeGraph.NUANCED_DIRNAME)
 
-    CodeGraph.init("tests/package_fixtures")
+    CodeGraph.init(package_fixtures_path)
 
     received_dir_path = os_spy.call_args.args[0]
+    written_paths = [c.args[0] for c in write_atomic_spy.call_args_list]
     assert received_dir_path == expected_path
-    mock_file.assert_called_with(f'{expected_path}/{CodeGraph.NUANCED_GRAPH_FILENAME}', "w+")
+    assert f'{expected_path}/{CodeGraph.NUANCED_GRAPH_FILENAME}' in written_paths
+    assert written_paths[-1] == f'{expected_path}/{CodeGraph.NUANCED_METADATA_FILENAME}'
 
-def test_init_with_valid_path_returns_code_graph(mocker) -> None:
+def test_init_with_valid_path_returns_code_graph(mocker, package_fixtures_path) -> None:
+    os.makedirs(os.path.join(package_fixtures_path, CodeGraph.NUANCED_DIRNAME))
     mocker.patch("os.makedirs", lambda _dirname, exist_ok=True: None)
     mock_file = mocker.mock_open()
     mocker.patch("builtins.open", mock_file)
+    mocker.patch("nuanced.lib.atomic.write_atomic")
     mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
-    path = "tests/package_fixtures"
-    expected_filepaths = [os.path.abspath("tests/package_fixtures/foo.py")]
+    path = package_fixtures_path
+    expected_filepaths = [os.path.join(package_fixtures_path, "foo.py")]
 
     code_graph_result = CodeGraph.init(path)
     code_graph = code_graph_result.code_graph
@@ -111,8 +125,8 @@ def test_init_with_valid_path_returns_code_graph(mocker) -> None:
     assert errors == []
     assert code_graph
 
-def test_init_timeout_returns_errors(mocker) -> None:
-    path = "tests/package_fixtures"
+def test_init_timeout_returns_errors(mocker, package_fixtures_path) -> None:
+    path = package_fixtures_path
     mocker.patch("nuanced.code_graph.with_timeout", timeout_call_graph_generation)
 
     code_graph_result = CodeGraph.init(path)
@@ -343,3 +357,771 @@ def test_load_file_not_found_errors(monkeypatch) -> None:
     assert len(result.errors) == 1
     assert type(result.errors[0]) == FileNotFoundError
     assert str(result.errors[0]) == f"Nuanced Graph not found in {os.path.abspath('.')}"
+
+def test_load_reads_graph_lazily(tmp_path) -> None:
+    nuanced_dirpath = tmp_path / CodeGraph.NUANCED_DIRNAME
+    nuanced_dirpath.mkdir()
+    graph = { "foo.bar": { "filepath": str(tmp_path / "foo.py"), "callees": [] } }
+    (nuanced_dirpath / CodeGraph.NUANCED_GRAPH_FILENAME).write_text(json.dumps(graph))
+
+    result = CodeGraph.load(directory=str(tmp_path))
+
+    assert result.code_graph._graph is None
+    assert result.code_graph.graph == graph
+
+def test_init_persists_symbol_index(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    package_path = tmp_path / "pkg"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    (package_path / "mod.py").write_text("def hello():\n    return 1\n")
+    symbol_index_path = package_path / CodeGraph.NUANCED_DIRNAME / CodeGraph.NUANCED_SYMBOL_INDEX_FILENAME
+
+    CodeGraph.init(str(package_path))
+    loaded = CodeGraph.load(directory=str(package_path)).code_graph
+    result = loaded.search("hello")
+
+    assert symbol_index_path.exists()
+    assert result.result[0]["name"].endswith("pkg.mod.hello")
+    assert loaded._graph is None
+
+def test_search_returns_ranked_matches_with_locations() -> None:
+    graph = {
+        "foo.bar": { "filepath": "foo.py", "callees": [], "lineno": 1, "end_lineno": 2 },
+        "foo.baz.bar": { "filepath": "baz.py", "callees": [], "lineno": 4, "end_lineno": 6 },
+        "hello.world": { "filepath": "hello.py", "callees": [], "lineno": 1, "end_lineno": 2 },
+    }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.search("bar", limit=5)
+
+    assert result.errors == []
+    assert [m["name"] for m in result.result] == ["foo.bar", "foo.baz.bar"]
+    assert result.result[1]["filepath"] == "baz.py"
+    assert result.result[1]["lineno"] == 4
+
+def test_search_with_invalid_limit_returns_errors() -> None:
+    code_graph = CodeGraph({})
+
+    result = code_graph.search("bar", limit=0)
+
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == ValueError
+
+def test_enrich_with_include_source_attaches_source(tmp_path) -> None:
+    filepath1 = str(tmp_path / "foo.py")
+    filepath2 = str(tmp_path / "hello.py")
+    (tmp_path / "foo.py").write_text("from hello import world\n\ndef bar():\n    return world()\n")
+    (tmp_path / "hello.py").write_text("def world():\n    return 1\n")
+    graph = {
+        "foo.bar": { "filepath": filepath1, "callees": ["hello.world"], "lineno": 3, "end_lineno": 4 },
+        "hello.world": { "filepath": filepath2, "callees": [], "lineno": 1, "end_lineno": 2 },
+    }
+
+    with CodeGraph(graph) as code_graph:
+        result = code_graph.enrich(file_path=filepath1, function_name="bar", include_source=True)
+
+    assert result.result["foo.bar"]["source"] == "def bar():\n    return world()"
+    assert result.result["hello.world"]["source"] == "def world():\n    return 1"
+
+def test_close_releases_source_files_and_keeps_graph_usable(tmp_path, mocker) -> None:
+    filepath = str(tmp_path / "foo.py")
+    (tmp_path / "foo.py").write_text("def bar():\n    return 1\n")
+    code_graph = CodeGraph({ "foo.bar": { "filepath": filepath, "callees": [], "lineno": 1, "end_lineno": 2 } })
+    code_graph.enrich(file_path=filepath, function_name="bar", include_source=True)
+    source_reader_close_spy = mocker.spy(code_graph.source_reader, "close")
+
+    code_graph.close()
+    result = code_graph.enrich(file_path=filepath, function_name="bar", include_source=True)
+    code_graph.close()
+
+    assert source_reader_close_spy.call_count == 1
+    assert result.result["foo.bar"]["source"] == "def bar():\n    return 1"
+
+def test_enrich_without_include_source_omits_source() -> None:
+    filepath1 = os.path.abspath("foo.py")
+    graph = { "foo.bar": { "filepath": filepath1, "callees": [], "lineno": 3, "end_lineno": 5 } }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.enrich(file_path=filepath1, function_name="bar")
+
+    assert "source" not in result.result["foo.bar"]
+
+def test_init_persists_module_names_in_metadata(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    package_path = tmp_path / "pkg"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    (package_path / "mod.py").write_text("def hello():\n    return 1\n")
+
+    CodeGraph.init(str(package_path))
+    code_graph = CodeGraph.load(directory=str(package_path)).code_graph
+
+    assert [m.rsplit(".", 1)[-1] for m in code_graph.metadata["modules"]] == ["pkg", "mod"]
+
+def test_stats_returns_graph_stats() -> None:
+    graph = {
+        "foo.bar": { "filepath": "foo.py", "callees": ["foo.baz", "<builtin>.len"] },
+        "foo.baz": { "filepath": "foo.py", "callees": [] },
+    }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.stats()
+
+    assert result.errors == []
+    assert result.result["nodes"] == 2
+    assert result.result["builtin_edges"] == 1
+    assert result.result["top_fan_in"] == [{ "name": "foo.baz", "fan_in": 1 }]
+
+def test_init_with_pruning_policy_records_pruning_in_metadata(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    call_graph_generate_spy = mocker.spy(nuanced.lib.call_graph, "generate")
+    package_path = tmp_path / "pkg"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    (package_path / "mod.py").write_text("def hello():\n    return len([])\n")
+    (package_path / "test_mod.py").write_text("from pkg.mod import hello\n\ndef test_hello():\n    hello()\n")
+    pruning_policy = PruningPolicy(drop_builtins=True, exclude_tests=True)
+
+    result = CodeGraph.init(str(package_path), pruning_policy=pruning_policy)
+    code_graph = CodeGraph.load(directory=str(package_path)).code_graph
+    hello_key = [k for k in code_graph.graph if k.endswith("pkg.mod.hello")][0]
+
+    assert result.errors == []
+    assert str(package_path / "test_mod.py") not in call_graph_generate_spy.call_args.args[0]
+    assert code_graph.graph[hello_key]["callees"] == []
+    assert code_graph.metadata["pruning"]["drop_builtins"] == True
+    assert code_graph.metadata["pruning"]["exclude_tests"] == True
+    assert code_graph.stats().result["pruning"]["removed_builtin_edges"] == 1
+
+def write_graph_directory(directory, graph) -> None:
+    nuanced_dirpath = directory / CodeGraph.NUANCED_DIRNAME
+    CodeGraph._persist(str(nuanced_dirpath), graph)
+
+def test_enrich_reuses_cached_result_without_loading_graph(tmp_path) -> None:
+    filepath = str(tmp_path / "foo.py")
+    graph = {
+        "foo.bar": { "filepath": filepath, "callees": ["foo.baz"], "lineno": 1, "end_lineno": 2 },
+        "foo.baz": { "filepath": filepath, "callees": [], "lineno": 4, "end_lineno": 5 },
+    }
+    write_graph_directory(tmp_path, graph)
+    first_result = CodeGraph.load(directory=str(tmp_path)).code_graph.enrich(file_path=filepath, function_name="bar")
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.enrich(file_path=filepath, function_name="bar")
+
+    assert result.result == first_result.result
+    assert not code_graph.is_loaded
+
+def test_enrich_cache_is_invalidated_when_graph_is_rewritten(tmp_path) -> None:
+    filepath = str(tmp_path / "foo.py")
+    graph = { "foo.bar": { "filepath": filepath, "callees": [], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(tmp_path, graph)
+    CodeGraph.load(directory=str(tmp_path)).code_graph.enrich(file_path=filepath, function_name="bar")
+    graph["foo.bar"]["callees"] = ["foo.baz"]
+    graph["foo.baz"] = { "filepath": filepath, "callees": [], "lineno": 4, "end_lineno": 5 }
+    write_graph_directory(tmp_path, graph)
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.enrich(file_path=filepath, function_name="bar")
+
+    assert set(result.result.keys()) == {"foo.bar", "foo.baz"}
+    assert code_graph.is_loaded
+
+def test_enrich_cache_is_keyed_by_options(tmp_path) -> None:
+    filepath = str(tmp_path / "foo.py")
+    graph = { "foo.bar": { "filepath": filepath, "callees": ["<builtin>.len"], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(tmp_path, graph)
+    CodeGraph.load(directory=str(tmp_path)).code_graph.enrich(file_path=filepath, function_name="bar")
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.enrich(file_path=filepath, function_name="bar", include_builtins=True)
+
+    assert result.result["foo.bar"]["callees"] == ["<builtin>.len"]
+
+def test_init_does_not_store_importance_on_nodes(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    package_path = tmp_path / "pkg"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    (package_path / "mod.py").write_text("def hello():\n    return world()\n\ndef world():\n    return 1\n")
+
+    code_graph = CodeGraph.init(str(package_path)).code_graph
+    filepath = str(package_path / "mod.py")
+
+    assert not any("importance" in v for v in code_graph.graph.values())
+    assert not any("importance" in v for v in code_graph.enrich(filepath, "hello").result.values())
+    ranked = code_graph.enrich(filepath, "hello", sort_by_importance=True).result
+    hello = next(v for k, v in ranked.items() if k.endswith("mod.hello"))
+    world = next(v for k, v in ranked.items() if k.endswith("mod.world"))
+    assert world["importance"] > hello["importance"]
+    assert not any("importance" in v for v in code_graph.enrich(filepath, "hello").result.values())
+
+def test_enrich_with_max_nodes_keeps_entrypoint_and_most_important_nodes() -> None:
+    graph = {
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": ["foo.baz", "foo.qux"], "lineno": 1, "end_lineno": 2, "importance": 0.1 },
+        "foo.baz": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 4, "end_lineno": 5, "importance": 0.2 },
+        "foo.qux": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 7, "end_lineno": 8, "importance": 0.7 },
+    }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.enrich(file_path="foo.py", function_name="bar", max_nodes=2)
+
+    assert list(result.result.keys()) == ["foo.bar", "foo.qux"]
+    assert result.result["foo.qux"]["importance"] == 0.7
+
+def test_enrich_sorts_by_importance_computed_for_graphs_without_scores() -> None:
+    graph = {
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": ["foo.baz", "foo.qux"], "lineno": 1, "end_lineno": 2 },
+        "foo.baz": { "filepath": os.path.abspath("foo.py"), "callees": ["foo.qux"], "lineno": 4, "end_lineno": 5 },
+        "foo.qux": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 7, "end_lineno": 8 },
+    }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.enrich(file_path="foo.py", function_name="bar", sort_by_importance=True)
+
+    assert list(result.result.keys()) == ["foo.bar", "foo.qux", "foo.baz"]
+
+def test_enrich_with_invalid_max_nodes_returns_errors() -> None:
+    code_graph = CodeGraph({})
+
+    result = code_graph.enrich(file_path="foo.py", function_name="bar", max_nodes=0)
+
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == ValueError
+
+def test_persist_increments_generation(tmp_path) -> None:
+    graph = { "foo.bar": { "filepath": "foo.py", "callees": [], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(tmp_path, graph)
+    write_graph_directory(tmp_path, graph)
+
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    assert code_graph.generation == 2
+
+def test_refresh_reloads_graph_after_it_is_rewritten(tmp_path) -> None:
+    graph = { "foo.bar": { "filepath": str(tmp_path / "foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(tmp_path, graph)
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+    assert code_graph.graph == graph
+    assert not code_graph.refresh()
+
+    graph["foo.baz"] = { "filepath": str(tmp_path / "foo.py"), "callees": [], "lineno": 4, "end_lineno": 5 }
+    write_graph_directory(tmp_path, graph)
+
+    assert code_graph.is_stale
+    assert code_graph.refresh()
+    assert code_graph.graph == graph
+    assert code_graph.generation == 2
+    assert not code_graph.is_stale
+
+def test_merge_trace_persists_runtime_callees(tmp_path) -> None:
+    filepath = str(tmp_path / "foo.py")
+    graph = {
+        "foo.bar": { "filepath": filepath, "callees": [], "lineno": 1, "end_lineno": 2 },
+        "foo.baz": { "filepath": filepath, "callees": [], "lineno": 4, "end_lineno": 5 },
+    }
+    write_graph_directory(tmp_path, graph)
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+    call_tracer = CallTracer(str(tmp_path))
+    call_tracer.calls[((filepath, 1, "bar"), (filepath, 4, "baz"))] += 1
+
+    result = code_graph.merge_trace(call_tracer)
+    reloaded = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    assert result.errors == []
+    assert result.result == { "traced_edges": 1, "new_edges": 1, "dropped_calls": 0 }
+    assert reloaded.graph["foo.bar"]["callees"] == ["foo.baz"]
+    assert reloaded.graph["foo.bar"]["runtime_callees"] == ["foo.baz"]
+    assert reloaded.metadata["trace"] == result.result
+    assert reloaded.generation == 2
+    assert reloaded.enrich(file_path=filepath, function_name="bar").result.keys() == {"foo.bar", "foo.baz"}
+
+def test_merge_trace_without_persisted_graph_returns_errors() -> None:
+    code_graph = CodeGraph({})
+
+    result = code_graph.merge_trace(CallTracer("."))
+
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == ValueError
+
+def write_sharded_package(package_path) -> None:
+    for package_name in ("pkg_one", "pkg_two"):
+        (package_path / package_name).mkdir(parents=True)
+        (package_path / package_name / "__init__.py").write_text("")
+        (package_path / package_name / "mod.py").write_text("def hello():\n    return world()\n\ndef world():\n    return 1\n")
+
+def test_init_shard_and_merge_shards_builds_full_graph(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    write_sharded_package(tmp_path)
+    unsharded_graph = CodeGraph.init(str(tmp_path)).code_graph.graph
+
+    shard_results = [CodeGraph.init_shard(str(tmp_path), i, 2) for i in (1, 2)]
+    result = CodeGraph.merge_shards(str(tmp_path))
+
+    assert [r.errors for r in shard_results] == [[], []]
+    assert os.path.basename(shard_results[1].result) == "shard-2-of-2.json"
+    assert result.errors == []
+    assert result.code_graph.graph.keys() == unsharded_graph.keys()
+    assert result.code_graph.generation == 2
+    assert not (tmp_path / CodeGraph.NUANCED_DIRNAME / CodeGraph.NUANCED_SHARDS_DIRNAME).exists()
+
+def test_merge_shards_with_missing_shard_returns_errors(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    write_sharded_package(tmp_path)
+    CodeGraph.init_shard(str(tmp_path), 2, 3)
+
+    result = CodeGraph.merge_shards(str(tmp_path))
+
+    assert result.code_graph is None
+    assert str(result.errors[0]).endswith("1/3, 3/3")
+
+def test_init_shard_with_invalid_shard_returns_errors(tmp_path) -> None:
+    result = CodeGraph.init_shard(str(tmp_path), 3, 2)
+
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == ValueError
+
+def test_persist_stores_root_relative_filepaths(tmp_path) -> None:
+    filepath = str(tmp_path / "pkg" / "foo.py")
+    graph = { "pkg.foo.bar": { "filepath": filepath, "callees": [], "lineno": 1, "end_lineno": 2 } }
+
+    write_graph_directory(tmp_path, graph)
+    nuanced_dirpath = tmp_path / CodeGraph.NUANCED_DIRNAME
+    persisted_graph = json.loads((nuanced_dirpath / CodeGraph.NUANCED_GRAPH_FILENAME).read_text())
+    metadata = json.loads((nuanced_dirpath / CodeGraph.NUANCED_METADATA_FILENAME).read_text())
+
+    assert persisted_graph["pkg.foo.bar"]["filepath"] == "pkg/foo.py"
+    assert metadata["root"] == str(tmp_path)
+
+def test_load_resolves_filepaths_against_new_location(tmp_path) -> None:
+    original_path = tmp_path / "original"
+    moved_path = tmp_path / "moved"
+    graph = { "pkg.foo.bar": { "filepath": str(original_path / "pkg" / "foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(original_path, graph)
+    original_path.rename(moved_path)
+    code_graph = CodeGraph.load(directory=str(moved_path)).code_graph
+
+    enrich_result = code_graph.enrich(file_path=str(moved_path / "pkg" / "foo.py"), function_name="bar")
+    search_result = code_graph.search("bar")
+
+    assert enrich_result.result["pkg.foo.bar"]["filepath"] == str(moved_path / "pkg" / "foo.py")
+    assert search_result.result[0]["filepath"] == str(moved_path / "pkg" / "foo.py")
+
+def test_enrich_finds_functions_in_non_consecutive_nodes_of_file() -> None:
+    filepath = os.path.abspath("foo.py")
+    graph = {
+        "foo.bar": { "filepath": filepath, "callees": [], "lineno": 1, "end_lineno": 2 },
+        "hello.world": { "filepath": os.path.abspath("hello.py"), "callees": [], "lineno": 1, "end_lineno": 2 },
+        "foo.baz": { "filepath": filepath, "callees": [], "lineno": 4, "end_lineno": 5 },
+    }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.enrich(file_path="foo.py", function_name="bar")
+
+    assert list(result.result.keys()) == ["foo.bar"]
+
+def test_export_and_import_bundle_round_trip(tmp_path) -> None:
+    source_path = tmp_path / "ci"
+    target_path = tmp_path / "dev"
+    target_path.mkdir()
+    graph = { "pkg.foo.bar": { "filepath": str(source_path / "pkg" / "foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(source_path, graph)
+    code_graph = CodeGraph.load(directory=str(source_path)).code_graph
+
+    export_result = code_graph.export_bundle(str(tmp_path), commit="abc123")
+    import_result = CodeGraph.import_bundle(str(tmp_path / "nuanced-abc123.tar.gz"), str(target_path))
+    imported = CodeGraph.load(directory=str(target_path)).code_graph
+
+    assert export_result.errors == []
+    assert import_result.errors == []
+    assert imported.graph["pkg.foo.bar"]["filepath"] == str(target_path / "pkg" / "foo.py")
+    assert imported.metadata["commit"] == "abc123"
+    assert imported.metadata["root"] == str(target_path)
+
+def test_import_bundle_from_different_commit_returns_errors(tmp_path, mocker) -> None:
+    graph = { "pkg.foo.bar": { "filepath": str(tmp_path / "pkg" / "foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(tmp_path, graph)
+    CodeGraph.load(directory=str(tmp_path)).code_graph.export_bundle(str(tmp_path), commit="abc123")
+    mocker.patch("nuanced.lib.bundle.current_commit", return_value="def456")
+
+    result = CodeGraph.import_bundle(str(tmp_path / "nuanced-abc123.tar.gz"), str(tmp_path))
+    forced_result = CodeGraph.import_bundle(str(tmp_path / "nuanced-abc123.tar.gz"), str(tmp_path), force=True)
+
+    assert "abc123" in str(result.errors[0])
+    assert forced_result.errors == []
+
+def test_import_bundle_selects_bundle_for_current_commit(tmp_path, mocker) -> None:
+    graph = { "pkg.foo.bar": { "filepath": str(tmp_path / "pkg" / "foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 } }
+    write_graph_directory(tmp_path, graph)
+    bundles_path = tmp_path / "bundles"
+    bundles_path.mkdir()
+    CodeGraph.load(directory=str(tmp_path)).code_graph.export_bundle(str(bundles_path), commit="abc123")
+    mocker.patch("nuanced.lib.bundle.current_commit", return_value="abc123")
+
+    result = CodeGraph.import_bundle(str(bundles_path), str(tmp_path))
+
+    assert result.errors == []
+    assert result.code_graph.metadata["commit"] == "abc123"
+
+def write_slow_package(package_path) -> None:
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    (package_path / "mod.py").write_text("def hello():\n    return 1\n")
+    (package_path / "slow.py").write_text("def slow():\n    return 1\n")
+
+def measure_slow_file(group, file_paths, root, timeout_seconds, max_chunk_files=None, precision="default"):
+    if any(p.endswith("slow.py") for p in file_paths):
+        return timeout_seconds, True
+
+    return 0.1, False
+
+def test_init_skips_quarantined_files(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    mocker.patch("nuanced.lib.profiling.measure", side_effect=measure_slow_file)
+    call_graph_generate_spy = mocker.spy(nuanced.lib.call_graph, "generate")
+    package_path = tmp_path / "pkg"
+    write_slow_package(package_path)
+    CodeGraph.profile(str(package_path), timeout_seconds=5, file_budget_seconds=1.0, quarantine=True)
+
+    result = CodeGraph.init(str(package_path))
+
+    assert result.errors == []
+    assert str(package_path / "slow.py") not in call_graph_generate_spy.call_args.args[0]
+    assert result.code_graph.metadata["quarantined"] == ["slow.py"]
+
+def test_init_with_quarantine_above_retries_without_slow_files(tmp_path, mocker) -> None:
+    with_timeout_results = iter([timeout_call_graph_generation, generate_call_graph])
+    mocker.patch(
+        "nuanced.code_graph.with_timeout",
+        lambda *args, **kwargs: next(with_timeout_results)(*args, **kwargs),
+    )
+    mocker.patch("nuanced.lib.profiling.measure", side_effect=measure_slow_file)
+    package_path = tmp_path / "pkg"
+    write_slow_package(package_path)
+
+    result = CodeGraph.init(str(package_path), timeout_seconds=5, quarantine_above_seconds=1.0)
+    report_path = package_path / CodeGraph.NUANCED_DIRNAME / CodeGraph.NUANCED_PROFILE_REPORT_FILENAME
+
+    assert result.errors == []
+    assert result.code_graph.metadata["quarantined"] == ["slow.py"]
+    assert not any(k.endswith("slow.slow") for k in result.code_graph.graph)
+    assert json.loads(report_path.read_text())["quarantined"] == ["slow.py"]
+
+def test_init_with_quarantine_above_profiles_at_requested_precision(tmp_path, mocker) -> None:
+    with_timeout_results = iter([timeout_call_graph_generation, generate_call_graph])
+    mocker.patch(
+        "nuanced.code_graph.with_timeout",
+        lambda *args, **kwargs: next(with_timeout_results)(*args, **kwargs),
+    )
+    measure_spy = mocker.patch("nuanced.lib.profiling.measure", side_effect=measure_slow_file)
+    package_path = tmp_path / "pkg"
+    write_slow_package(package_path)
+
+    result = CodeGraph.init(str(package_path), timeout_seconds=5, quarantine_above_seconds=1.0, precision="precise")
+
+    assert result.errors == []
+    assert {c.args[5] for c in measure_spy.call_args_list} == {"precise"}
+
+def test_profile_quarantine_without_budget_returns_errors(tmp_path) -> None:
+    result = CodeGraph.profile(str(tmp_path), quarantine=True)
+
+    assert len(result.errors) == 1
+    assert result.result is None
+
+def test_init_reports_progress_for_each_group(mocker, package_fixtures_path) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    events = []
+
+    CodeGraph.init(package_fixtures_path, progress=events.append)
+
+    assert [e.kind for e in events] == ["group_started", "group_finished"]
+    assert events[-1].groups_done == events[-1].groups_total == 1
+    assert events[-1].files_done == events[-1].files_total == 6
+    assert events[-1].eta_seconds == 0
+
+def test_module_graph_is_read_without_loading_graph(tmp_path) -> None:
+    graph = {
+        "foo": { "filepath": str(tmp_path / "foo.py"), "callees": [] },
+        "foo.bar": { "filepath": str(tmp_path / "foo.py"), "callees": ["baz.qux"] },
+        "baz": { "filepath": str(tmp_path / "baz.py"), "callees": [] },
+        "baz.qux": { "filepath": str(tmp_path / "baz.py"), "callees": [] },
+    }
+    write_graph_directory(tmp_path, graph)
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.deps("foo")
+
+    assert result.errors == []
+    assert result.result["callees"] == [{ "name": "baz", "calls": 1 }]
+    assert code_graph.module_graph()["modules"]["baz"]["callers"] == { "foo": 1 }
+    assert not code_graph.is_loaded
+
+def test_deps_with_unknown_module_returns_errors() -> None:
+    graph = { "foo": { "filepath": os.path.abspath("foo.py"), "callees": [] } }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.deps("bar")
+
+    assert len(result.errors) == 1
+    assert result.result is None
+
+def test_unreachable_returns_functions_not_reached_from_entry_points() -> None:
+    graph = {
+        "foo": { "filepath": os.path.abspath("foo.py"), "callees": [] },
+        "foo.main": { "filepath": os.path.abspath("foo.py"), "callees": ["foo.bar"], "lineno": 1 },
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 4 },
+        "foo.baz": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 7 },
+    }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.unreachable(["foo.main"])
+
+    assert result.errors == []
+    assert [f["name"] for f in result.result["unreachable_functions"]] == ["foo.baz"]
+
+def test_unreachable_without_matching_entry_points_returns_errors() -> None:
+    graph = { "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": [] } }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.unreachable(["qux.*"])
+
+    assert str(result.errors[0]) == "No functions match the entry point patterns: qux.*"
+    assert result.result is None
+
+def test_affected_tests_returns_tests_reaching_changed_functions() -> None:
+    graph = {
+        "foo.bar": { "filepath": os.path.abspath("foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 },
+        "test_foo.test_bar": { "filepath": os.path.abspath("test_foo.py"), "callees": ["foo.bar"], "lineno": 1, "end_lineno": 2 },
+        "test_foo": { "filepath": os.path.abspath("test_foo.py"), "callees": [], "lineno": 1, "end_lineno": 2 },
+    }
+    code_graph = CodeGraph(graph)
+
+    result = code_graph.affected_tests("foo.py:2")
+
+    assert result.errors == []
+    assert result.result["tests"] == ["test_foo.py::test_bar"]
+
+def test_affected_tests_with_invalid_diff_returns_errors() -> None:
+    code_graph = CodeGraph({})
+
+    result = code_graph.affected_tests("not a diff")
+
+    assert len(result.errors) == 1
+    assert result.result is None
+
+def test_diff_with_graph_files_and_directories(tmp_path) -> None:
+    old_nuanced_dirpath = tmp_path / "old" / CodeGraph.NUANCED_DIRNAME
+    old_nuanced_dirpath.mkdir(parents=True)
+    (old_nuanced_dirpath / CodeGraph.NUANCED_GRAPH_FILENAME).write_text(json.dumps({
+        "foo.bar": { "filepath": "foo.py", "callees": [], "lineno": 1, "end_lineno": 2 },
+    }))
+    (tmp_path / "new.json").write_text(json.dumps({
+        "foo.bar": { "filepath": "foo.py", "callees": ["foo.baz"], "lineno": 1, "end_lineno": 2 },
+        "foo.baz": { "filepath": "foo.py", "callees": [], "lineno": 4, "end_lineno": 5 },
+    }))
+
+    result = CodeGraph.diff(str(tmp_path / "old"), str(tmp_path / "new.json"))
+
+    assert result.errors == []
+    assert result.result["edges_added"] == [{ "caller": "foo.bar", "callee": "foo.baz" }]
+
+def test_diff_with_missing_graph_returns_errors(tmp_path) -> None:
+    result = CodeGraph.diff(str(tmp_path / "old.json"), str(tmp_path / "new.json"))
+
+    assert isinstance(result.errors[0], FileNotFoundError)
+    assert result.result is None
+
+def commit_all(repo_path) -> str:
+    git = ["git", "-C", str(repo_path), "-c", "user.name=nuanced", "-c", "user.email=nuanced@example.com"]
+    subprocess.run([*git, "add", "-A"], check=True, capture_output=True)
+    subprocess.run([*git, "commit", "-q", "--allow-empty", "-m", "commit"], check=True, capture_output=True)
+
+    return subprocess.run([*git, "rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+
+def test_at_reconstructs_graph_recorded_at_revision(tmp_path) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    filepath = str(tmp_path / "foo.py")
+    nuanced_dirpath = str(tmp_path / CodeGraph.NUANCED_DIRNAME)
+    old_graph = {
+        "foo.bar": { "filepath": filepath, "callees": ["foo.baz"], "lineno": 1, "end_lineno": 2 },
+        "foo.baz": { "filepath": filepath, "callees": [], "lineno": 4, "end_lineno": 5 },
+    }
+    new_graph = { "foo.bar": { "filepath": filepath, "callees": [], "lineno": 1, "end_lineno": 2 } }
+    old_commit = commit_all(tmp_path)
+    CodeGraph._record_history(nuanced_dirpath, old_graph, old_commit)
+    commit_all(tmp_path)
+    new_commit = commit_all(tmp_path)
+    CodeGraph._record_history(nuanced_dirpath, new_graph, new_commit)
+    write_graph_directory(tmp_path, new_graph)
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.at("HEAD~1")
+    enrichment = result.code_graph.enrich(file_path=filepath, function_name="bar")
+
+    assert result.errors == []
+    assert result.code_graph.metadata["commit"] == old_commit
+    assert set(enrichment.result.keys()) == {"foo.bar", "foo.baz"}
+    assert code_graph.at("HEAD").code_graph.graph == new_graph
+
+def test_at_without_recorded_history_returns_errors(tmp_path) -> None:
+    write_graph_directory(tmp_path, { "foo.bar": { "filepath": str(tmp_path / "foo.py"), "callees": [] } })
+    code_graph = CodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.at("HEAD")
+
+    assert len(result.errors) == 1
+    assert result.code_graph is None
+
+def test_init_with_workers_matches_single_worker_graph_and_records_timings(tmp_path) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "__init__.py").write_text("")
+    (tmp_path / "a" / "m.py").write_text("def f():\n    return g()\n\ndef g():\n    return 1\n")
+    (tmp_path / "b" / "__init__.py").write_text("")
+    (tmp_path / "b" / "n.py").write_text("from a.m import f\n\ndef h():\n    return f()\n")
+    events = []
+
+    single_worker_graph = CodeGraph.init(str(tmp_path), workers=1).code_graph.graph
+    result = CodeGraph.init(str(tmp_path), workers=2, progress=events.append)
+
+    assert result.errors == []
+    assert result.code_graph.graph == single_worker_graph
+    assert set(result.code_graph.metadata["timings"]["default"]) == {"a", "b"}
+    assert events[-1].groups_done == events[-1].groups_total == 2
+    assert events[-1].files_done == events[-1].files_total == 4
+
+def test_init_with_workers_does_not_fork_from_threads(tmp_path, mocker) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "m.py").write_text("def f():\n    return 1\n")
+    (tmp_path / "b" / "n.py").write_text("def g():\n    return 1\n")
+    start = multiprocessing.Process.start
+    starting_threads = []
+
+    def record_starting_thread(process):
+        starting_threads.append(threading.current_thread())
+        start(process)
+
+    mocker.patch.object(multiprocessing.Process, "start", record_starting_thread)
+
+    result = CodeGraph.init(str(tmp_path), workers=2)
+
+    assert result.errors == []
+    assert set(result.code_graph.graph) == {"a.m", "a.m.f", "b.n", "b.n.g"}
+    assert starting_threads == [threading.main_thread(), threading.main_thread()]
+
+def test_init_with_workers_from_unguarded_script(tmp_path) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "m.py").write_text("def f():\n    return 1\n")
+    (tmp_path / "b" / "n.py").write_text("def g():\n    return 1\n")
+    (tmp_path / "script.py").write_text(
+        "from nuanced import CodeGraph\n"
+        "print('top level')\n"
+        f"result = CodeGraph.init({str(tmp_path)!r}, workers=2)\n"
+        "print(result.errors, sorted(result.code_graph.graph))\n"
+    )
+
+    completed = subprocess.run([sys.executable, str(tmp_path / "script.py")], capture_output=True, text=True, cwd=str(tmp_path))
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.splitlines() == ["top level", "[] ['a.m', 'a.m.f', 'b.n', 'b.n.g', 'script']"]
+
+def test_init_with_rev_analyzes_revision_without_checkout(tmp_path) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "mod.py").write_text("def f():\n    return g()\n\ndef g():\n    return 1\n")
+    old_commit = commit_all(tmp_path)
+    (tmp_path / "pkg" / "mod.py").write_text("def f():\n    return 1\n")
+    working_tree_graph = CodeGraph.init(str(tmp_path)).code_graph.graph
+
+    result = CodeGraph.init(str(tmp_path), rev=old_commit)
+
+    assert result.errors == []
+    assert result.code_graph.metadata["commit"] == old_commit
+    assert result.code_graph.graph["pkg.mod.f"]["callees"] == ["pkg.mod.g"]
+    assert result.code_graph.graph["pkg.mod.f"]["filepath"] == str(tmp_path / "pkg" / "mod.py")
+    assert set(result.code_graph.graph) == set(working_tree_graph) | {"pkg.mod.g"}
+
+def test_init_records_commit_and_history_only_for_a_clean_tree(tmp_path) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "mod.py").write_text("def f():\n    return 1\n")
+    commit_all(tmp_path)
+    (tmp_path / "mod.py").write_text("def f():\n    return g()\n\ndef g():\n    return 1\n")
+    history_index_path = tmp_path / CodeGraph.NUANCED_DIRNAME / CodeGraph.NUANCED_HISTORY_DIRNAME / "index.json"
+
+    dirty_code_graph = CodeGraph.init(str(tmp_path)).code_graph
+    export_result = dirty_code_graph.export_bundle(str(tmp_path))
+
+    assert "commit" not in dirty_code_graph.metadata
+    assert not history_index_path.exists()
+    assert len(export_result.errors) == 1
+
+    clean_commit = commit_all(tmp_path)
+    clean_code_graph = CodeGraph.init(str(tmp_path)).code_graph
+
+    assert clean_code_graph.metadata["commit"] == clean_commit
+    assert [e["commit"] for e in json.loads(history_index_path.read_text())["entries"]] == [clean_commit]
+    assert clean_code_graph.export_bundle(str(tmp_path)).errors == []
+
+def test_init_with_precision_records_level_in_metadata(tmp_path, mocker) -> None:
+    with_timeout_spy = mocker.patch("nuanced.code_graph.with_timeout", side_effect=generate_call_graph)
+    (tmp_path / "mod.py").write_text("def hello():\n    return 1\n")
+
+    result = CodeGraph.init(str(tmp_path), precision="coarse")
+
+    assert result.errors == []
+    assert with_timeout_spy.call_args.kwargs["kwargs"]["precision"] == "coarse"
+    assert result.code_graph.metadata["precision"] == "coarse"
+    assert CodeGraph.load(directory=str(tmp_path)).code_graph.metadata["precision"] == "coarse"
+
+def test_plan_uses_only_timings_of_requested_precision(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    (tmp_path / "mod.py").write_text("def hello():\n    return 1\n")
+    CodeGraph.init(str(tmp_path))
+
+    assert CodeGraph.plan(str(tmp_path)).result["calibrated"] == True
+    assert CodeGraph.plan(str(tmp_path), precision="precise").result["calibrated"] == False
+
+    CodeGraph.init(str(tmp_path), precision="precise")
+    timings = CodeGraph.load(directory=str(tmp_path)).code_graph.metadata["timings"]
+
+    assert set(timings) == {"default", "precise"}
+    assert CodeGraph.plan(str(tmp_path)).result["calibrated"] == True
+    assert CodeGraph.plan(str(tmp_path), precision="precise").result["calibrated"] == True
+
+def test_plan_ignores_timings_not_keyed_by_precision(tmp_path) -> None:
+    (tmp_path / "mod.py").write_text("def hello():\n    return 1\n")
+    CodeGraph._persist(str(tmp_path / CodeGraph.NUANCED_DIRNAME), {}, { "timings": { ".": 1.0 } })
+
+    assert CodeGraph.plan(str(tmp_path)).result["calibrated"] == False
+
+def test_init_with_unsupported_precision_returns_errors(tmp_path) -> None:
+    result = CodeGraph.init(str(tmp_path), precision="exact")
+
+    assert str(result.errors[0]) == "Unsupported precision \"exact\", expected one of: coarse, default, precise"
+    assert result.code_graph is None
+
+def test_init_with_unknown_rev_returns_errors(tmp_path) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+
+    result = CodeGraph.init(str(tmp_path), rev="v9.9")
+
+    assert str(result.errors[0]) == f"Cannot resolve revision v9.9 in {tmp_path}"
+    assert result.code_graph is None
+
+def test_plan_uses_timings_from_previous_init(tmp_path, mocker) -> None:
+    mocker.patch("nuanced.code_graph.with_timeout", generate_call_graph)
+    package_path = tmp_path / "pkg"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    (package_path / "mod.py").write_text("def hello():\n    return 1\n")
+    CodeGraph.init(str(package_path))
+
+    result = CodeGraph.plan(str(package_path))
+
+    assert result.errors == []
+    assert result.result["calibrated"] == True
+    assert result.result["groups"][0]["previous_seconds"] is not None
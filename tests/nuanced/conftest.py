@@ -0,0 +1,13 @@
+import os
+import shutil
+import pytest
+
+PACKAGE_FIXTURES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "package_fixtures")
+
+# Tests that init or load the package fixtures work on a copy so generated .nuanced output stays out of the tree
+@pytest.fixture
+def package_fixtures_path(tmp_path) -> str:
+    path = tmp_path / "package_fixtures"
+    shutil.copytree(PACKAGE_FIXTURES_PATH, path, ignore=shutil.ignore_patterns(".nuanced", "__pycache__"))
+
+    return str(path)
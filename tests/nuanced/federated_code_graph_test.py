@@ -0,0 +1,108 @@
+import json
+import os
+from nuanced import CodeGraph, FederatedCodeGraph
+
+def write_graph(directory, graph, modules=None) -> None:
+    nuanced_dirpath = directory / CodeGraph.NUANCED_DIRNAME
+    nuanced_dirpath.mkdir(parents=True)
+    (nuanced_dirpath / CodeGraph.NUANCED_GRAPH_FILENAME).write_text(json.dumps(graph))
+
+    if modules is not None:
+        metadata = { "modules": modules }
+        (nuanced_dirpath / CodeGraph.NUANCED_METADATA_FILENAME).write_text(json.dumps(metadata))
+
+def write_monorepo(tmp_path) -> dict:
+    billing_path = tmp_path / "services" / "billing"
+    shared_path = tmp_path / "libs" / "shared"
+    users_path = tmp_path / "services" / "users"
+    billing_file = str(billing_path / "api.py")
+    shared_file = str(shared_path / "money.py")
+    users_file = str(users_path / "api.py")
+    write_graph(billing_path, {
+        "billing.api": { "filepath": billing_file, "callees": [], "lineno": 1, "end_lineno": 9 },
+        "billing.api.charge": { "filepath": billing_file, "callees": ["shared.money.to_cents", "datetime.datetime.now"], "lineno": 3, "end_lineno": 5 },
+        "billing.api.refund": { "filepath": billing_file, "callees": [], "lineno": 7, "end_lineno": 9 },
+    }, modules=["billing.api"])
+    write_graph(shared_path, {
+        "shared.money": { "filepath": shared_file, "callees": [], "lineno": 1, "end_lineno": 5 },
+        "shared.money.to_cents": { "filepath": shared_file, "callees": ["shared.money.round_half_even"], "lineno": 1, "end_lineno": 2 },
+        "shared.money.round_half_even": { "filepath": shared_file, "callees": [], "lineno": 4, "end_lineno": 5 },
+    }, modules=["shared.money"])
+    write_graph(users_path, {
+        "users.api": { "filepath": users_file, "callees": [], "lineno": 1, "end_lineno": 3 },
+        "users.api.create_user": { "filepath": users_file, "callees": [], "lineno": 1, "end_lineno": 3 },
+    }, modules=["users.api"])
+
+    return { "billing": billing_file, "shared": shared_file, "users": users_file }
+
+def members_by_root(code_graph, tmp_path) -> dict:
+    return { os.path.relpath(m.root, tmp_path): m for m in code_graph.members }
+
+def test_load_with_multiple_graphs_returns_federated_code_graph(tmp_path) -> None:
+    write_monorepo(tmp_path)
+
+    result = FederatedCodeGraph.load(directory=str(tmp_path))
+
+    assert result.errors == []
+    assert len(result.code_graph.members) == 3
+    assert not any(m.is_loaded for m in result.code_graph.members)
+
+def test_load_without_graphs_errors(tmp_path) -> None:
+    result = FederatedCodeGraph.load(directory=str(tmp_path))
+
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == FileNotFoundError
+
+def test_enrich_follows_calls_across_graphs(tmp_path) -> None:
+    filepaths = write_monorepo(tmp_path)
+    code_graph = FederatedCodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.enrich(file_path=filepaths["billing"], function_name="charge")
+
+    assert set(result.result.keys()) == {
+        "billing.api.charge",
+        "shared.money.to_cents",
+        "shared.money.round_half_even",
+    }
+    assert result.result["shared.money.to_cents"]["filepath"] == filepaths["shared"]
+
+def test_enrich_loads_only_graphs_reached_by_traversal(tmp_path) -> None:
+    filepaths = write_monorepo(tmp_path)
+    code_graph = FederatedCodeGraph.load(directory=str(tmp_path)).code_graph
+    members = members_by_root(code_graph, tmp_path)
+
+    code_graph.enrich(file_path=filepaths["billing"], function_name="refund")
+
+    assert members["services/billing"].is_loaded
+    assert not members["libs/shared"].is_loaded
+    assert not members["services/users"].is_loaded
+
+    code_graph.enrich(file_path=filepaths["billing"], function_name="charge")
+
+    assert members["libs/shared"].is_loaded
+    assert not members["services/users"].is_loaded
+
+def test_enrich_probes_graphs_without_module_metadata(tmp_path) -> None:
+    filepaths = write_monorepo(tmp_path)
+    legacy_path = tmp_path / "legacy"
+    legacy_file = str(legacy_path / "mod.py")
+    write_graph(legacy_path, {
+        "legacy.mod.helper": { "filepath": legacy_file, "callees": [], "lineno": 1, "end_lineno": 2 },
+    })
+    billing_graph_path = tmp_path / "services" / "billing" / CodeGraph.NUANCED_DIRNAME / CodeGraph.NUANCED_GRAPH_FILENAME
+    billing_graph = json.loads(billing_graph_path.read_text())
+    billing_graph["billing.api.refund"]["callees"] = ["legacy.mod.helper"]
+    billing_graph_path.write_text(json.dumps(billing_graph))
+    code_graph = FederatedCodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.enrich(file_path=filepaths["billing"], function_name="refund")
+
+    assert "legacy.mod.helper" in result.result
+
+def test_search_merges_matches_from_all_graphs(tmp_path) -> None:
+    write_monorepo(tmp_path)
+    code_graph = FederatedCodeGraph.load(directory=str(tmp_path)).code_graph
+
+    result = code_graph.search("api", limit=2)
+
+    assert [m["name"] for m in result.result] == ["users.api", "billing.api"]
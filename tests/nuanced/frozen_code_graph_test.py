@@ -0,0 +1,96 @@
+import os
+import pytest
+import sys
+import sysconfig
+import time
+from nuanced import CodeGraph, FrozenCodeGraph
+
+def is_free_threaded() -> bool:
+    return bool(sysconfig.get_config_var("Py_GIL_DISABLED")) and not sys._is_gil_enabled()
+
+def build_chain_graph(filepath: str, length: int, width: int) -> dict:
+    graph = {}
+
+    for i in range(length):
+        callees = [f"app.f{j}" for j in range(i + 1, min(i + 1 + width, length))]
+        graph[f"app.f{i}"] = { "filepath": filepath, "callees": callees + ["<builtin>.len"], "lineno": i * 3 + 1, "end_lineno": i * 3 + 2 }
+
+    return graph
+
+def test_enrich_matches_code_graph(package_fixtures_path) -> None:
+    fixture_filepath = os.path.join(package_fixtures_path, "fixture_class.py")
+    code_graph = CodeGraph.init(package_fixtures_path).code_graph
+    code_graph.result_cache = None
+    frozen_code_graph = FrozenCodeGraph.from_code_graph(code_graph)
+
+    with code_graph:
+        for function_name in ["foo", "bar", "__init__", "helper_function"]:
+            for kwargs in [{}, { "include_builtins": True }, { "max_nodes": 2 }, { "sort_by_importance": True, "include_source": True }]:
+                result = code_graph.enrich(fixture_filepath, function_name, **kwargs)
+
+                assert result.result is not None
+                assert frozen_code_graph.enrich(fixture_filepath, function_name, **kwargs) == result
+
+    assert frozen_code_graph.enrich(fixture_filepath, "baz").result is None
+
+def test_enrich_with_multiple_definitions_returns_errors() -> None:
+    filepath = os.path.abspath("foo.py")
+    frozen_code_graph = FrozenCodeGraph({
+        "foo.bar": { "filepath": filepath, "callees": [] },
+        "foo.baz.bar": { "filepath": filepath, "callees": [] },
+    })
+
+    result = frozen_code_graph.enrich("foo.py", "bar")
+
+    assert str(result.errors[0]) == "Multiple definitions for bar found in foo.py: foo.bar, foo.baz.bar"
+    assert result.result is None
+
+def test_graph_and_metadata_are_read_only() -> None:
+    filepath = os.path.abspath("foo.py")
+    frozen_code_graph = FrozenCodeGraph(
+        { "foo.bar": { "filepath": filepath, "callees": ["foo.baz"] } },
+        metadata={ "timings": { "foo": 1.0 } },
+    )
+
+    with pytest.raises(TypeError):
+        frozen_code_graph.graph["foo.qux"] = {}
+
+    with pytest.raises(TypeError):
+        frozen_code_graph.graph["foo.bar"]["callees"] = []
+
+    with pytest.raises(TypeError):
+        frozen_code_graph.metadata["timings"]["foo"] = 2.0
+
+    assert frozen_code_graph.graph["foo.bar"]["callees"] == ("foo.baz",)
+
+def test_enrich_results_do_not_share_state() -> None:
+    filepath = os.path.abspath("foo.py")
+    frozen_code_graph = FrozenCodeGraph({ "foo.bar": { "filepath": filepath, "callees": ["foo.baz"] } })
+
+    frozen_code_graph.enrich("foo.py", "bar").result["foo.bar"]["callees"].append("foo.qux")
+
+    assert frozen_code_graph.enrich("foo.py", "bar").result["foo.bar"]["callees"] == ["foo.baz"]
+
+def test_enrich_concurrent_matches_sequential_enrich() -> None:
+    filepath = os.path.abspath("app.py")
+    frozen_code_graph = FrozenCodeGraph(build_chain_graph(filepath, 200, 3))
+    queries = [("app.py", f"f{i % 200}") for i in range(2000)]
+
+    results = frozen_code_graph.enrich_concurrent(queries, max_workers=8, max_nodes=50)
+
+    assert results == [frozen_code_graph.enrich(*q, max_nodes=50) for q in queries]
+
+@pytest.mark.skipif(not is_free_threaded() or (os.cpu_count() or 1) < 4, reason="requires a free-threaded build with 4 CPUs")
+def test_enrich_concurrent_scales_linearly_across_threads() -> None:
+    filepath = os.path.abspath("app.py")
+    frozen_code_graph = FrozenCodeGraph(build_chain_graph(filepath, 2000, 4))
+    queries = [("app.py", f"f{i % 100}") for i in range(400)]
+    frozen_code_graph.enrich_concurrent(queries[:8], max_workers=4)
+    seconds_by_workers = {}
+
+    for workers in (1, 4):
+        started_at = time.perf_counter()
+        frozen_code_graph.enrich_concurrent(queries, max_workers=workers)
+        seconds_by_workers[workers] = time.perf_counter() - started_at
+
+    assert seconds_by_workers[1] / seconds_by_workers[4] > 3
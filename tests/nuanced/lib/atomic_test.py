@@ -0,0 +1,43 @@
+import os
+import threading
+import pytest
+from nuanced.lib import atomic
+
+def test_write_atomic_replaces_file_contents(tmp_path) -> None:
+    path = tmp_path / "graph.json"
+    path.write_text("old")
+
+    atomic.write_atomic(str(path), "new")
+
+    assert path.read_text() == "new"
+    assert os.listdir(tmp_path) == ["graph.json"]
+
+def test_write_atomic_keeps_original_file_when_write_fails(tmp_path, mocker) -> None:
+    path = tmp_path / "graph.json"
+    path.write_text("old")
+    mocker.patch("os.replace", side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError):
+        atomic.write_atomic(str(path), "new")
+
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["graph.json"]
+
+@pytest.mark.skipif(atomic.fcntl is None, reason="advisory locks require fcntl")
+def test_exclusive_lock_blocks_second_holder(tmp_path) -> None:
+    lock_path = str(tmp_path / "nuanced.lock")
+    events = []
+
+    def hold_lock() -> None:
+        with atomic.exclusive_lock(lock_path):
+            events.append("second")
+
+    with atomic.exclusive_lock(lock_path):
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        thread.join(timeout=0.2)
+        events.append("first")
+
+    thread.join()
+
+    assert events == ["first", "second"]
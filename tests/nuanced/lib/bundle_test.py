@@ -0,0 +1,23 @@
+import pytest
+from nuanced.lib import bundle
+
+def test_write_and_read_round_trip(tmp_path) -> None:
+    bundle_path = str(tmp_path / bundle.bundle_filename("abc123"))
+    files = { "nuanced-graph.json": b"{}", "nuanced-metadata.json": b'{"commit": "abc123"}' }
+
+    bundle.write(bundle_path, "abc123", files)
+    manifest, read_files = bundle.read(bundle_path)
+
+    assert bundle_path.endswith("nuanced-abc123.tar.gz")
+    assert manifest == { "version": bundle.BUNDLE_VERSION, "commit": "abc123", "files": sorted(files) }
+    assert read_files == files
+
+def test_read_invalid_bundle_raises_value_error(tmp_path) -> None:
+    bundle_path = tmp_path / "nuanced-abc123.tar.gz"
+    bundle_path.write_bytes(b"not a bundle")
+
+    with pytest.raises(ValueError):
+        bundle.read(str(bundle_path))
+
+def test_current_commit_outside_git_checkout_returns_none(tmp_path) -> None:
+    assert bundle.current_commit(str(tmp_path)) is None
@@ -0,0 +1,55 @@
+import json
+import pytest
+from nuanced.lib import encoders
+
+result = {
+    "foo.bar": { "filepath": "/repo/foo.py", "callees": ["foo.baz", "hello.world"], "lineno": 3, "end_lineno": 5 },
+    "foo.baz": { "filepath": "/repo/foo.py", "callees": [], "lineno": 7, "end_lineno": 9 },
+    "hello.world": { "filepath": "/repo/hello.py", "callees": [], "lineno": 1, "end_lineno": 2 },
+}
+
+def test_compact_uses_shared_file_table() -> None:
+    compact_result = encoders.compact(result)
+
+    assert compact_result["files"] == ["/repo/foo.py", "/repo/hello.py"]
+    assert compact_result["nodes"]["foo.baz"] == { "file": 0, "callees": [], "lineno": 7, "end_lineno": 9 }
+    assert compact_result["nodes"]["hello.world"]["file"] == 1
+
+def test_expand_reverses_compact() -> None:
+    assert encoders.expand(encoders.compact(result)) == result
+
+@pytest.mark.parametrize("fast_json", [True, False])
+def test_encode_json_and_compact_round_trip(monkeypatch, fast_json) -> None:
+    if not fast_json:
+        monkeypatch.setattr(encoders, "orjson", None)
+
+    json_output = encoders.encode(result, "json")
+    compact_output = encoders.encode(result, "compact")
+
+    assert json.loads(json_output) == result
+    assert encoders.expand(json.loads(compact_output)) == result
+    assert len(compact_output) < len(json_output)
+    assert b"\n" not in compact_output
+
+def test_encode_msgpack_round_trips() -> None:
+    msgpack = pytest.importorskip("msgpack")
+
+    output = encoders.encode(result, "msgpack")
+
+    assert encoders.expand(msgpack.unpackb(output)) == result
+
+def test_encode_msgpack_without_msgpack_errors(monkeypatch) -> None:
+    monkeypatch.setattr(encoders, "msgpack", None)
+
+    with pytest.raises(ModuleNotFoundError):
+        encoders.encode(result, "msgpack")
+
+def test_encode_with_unsupported_format_errors() -> None:
+    with pytest.raises(ValueError):
+        encoders.encode(result, "yaml")
+
+def test_register_encoder_adds_format(monkeypatch) -> None:
+    monkeypatch.setattr(encoders, "ENCODERS", dict(encoders.ENCODERS))
+    encoders.register_encoder("names", lambda r: "\n".join(r).encode("utf-8"))
+
+    assert encoders.encode(result, "names") == b"foo.bar\nfoo.baz\nhello.world"
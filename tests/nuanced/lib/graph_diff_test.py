@@ -0,0 +1,61 @@
+import json
+from nuanced.lib import graph_diff
+
+def build_graph() -> dict:
+    return {
+        "app.a": { "filepath": "app.py", "lineno": 1, "end_lineno": 3, "callees": ["app.b", "app.c"], "importance": 0.2 },
+        "app.b": { "filepath": "app.py", "lineno": 5, "end_lineno": 6, "callees": [], "importance": 0.3 },
+        "app.c": { "filepath": "app.py", "lineno": 8, "end_lineno": 9, "callees": ["app.b"], "importance": 0.5 },
+    }
+
+def test_diff_reports_functions_and_edges() -> None:
+    old_graph = build_graph()
+    new_graph = build_graph()
+    del new_graph["app.c"]
+    new_graph["app.a"]["callees"] = ["app.b", "app.d"]
+    new_graph["app.b"].update({ "lineno": 6, "end_lineno": 7 })
+    new_graph["app.d"] = { "filepath": "app.py", "lineno": 9, "end_lineno": 10, "callees": [] }
+
+    result = graph_diff.diff(graph_diff.digest(old_graph), graph_diff.digest(new_graph))
+
+    assert result["summary"] == {
+        "functions_added": 1,
+        "functions_removed": 1,
+        "functions_moved": 1,
+        "edges_added": 1,
+        "edges_removed": 2,
+    }
+    assert result["functions_added"] == [{ "name": "app.d", "filepath": "app.py", "lineno": 9, "end_lineno": 10 }]
+    assert result["functions_removed"] == [{ "name": "app.c", "filepath": "app.py", "lineno": 8, "end_lineno": 9 }]
+    assert result["functions_moved"] == [{
+        "name": "app.b",
+        "old": { "filepath": "app.py", "lineno": 5, "end_lineno": 6 },
+        "new": { "filepath": "app.py", "lineno": 6, "end_lineno": 7 },
+    }]
+    assert result["edges_added"] == [{ "caller": "app.a", "callee": "app.d" }]
+    assert result["edges_removed"] == [{ "caller": "app.a", "callee": "app.c" }, { "caller": "app.c", "callee": "app.b" }]
+
+def test_diff_ignores_importance_changes() -> None:
+    new_graph = build_graph()
+    new_graph["app.a"]["importance"] = 0.9
+
+    result = graph_diff.diff(graph_diff.digest(build_graph()), graph_diff.digest(new_graph))
+
+    assert all(count == 0 for count in result["summary"].values())
+
+def test_merge_edges() -> None:
+    old_edges = [("a", "b"), ("a", "c"), ("b", "c")]
+    new_edges = [("a", "c"), ("a", "d"), ("c", "a")]
+
+    assert graph_diff.merge_edges(old_edges, new_edges) == ([("a", "d"), ("c", "a")], [("a", "b"), ("b", "c")])
+
+def test_diff_files(tmp_path) -> None:
+    new_graph = build_graph()
+    del new_graph["app.b"]
+    (tmp_path / "old.json").write_text(json.dumps(build_graph()))
+    (tmp_path / "new.json").write_text(json.dumps(new_graph))
+
+    result = graph_diff.diff_files(str(tmp_path / "old.json"), str(tmp_path / "new.json"))
+
+    assert [f["name"] for f in result["functions_removed"]] == ["app.b"]
+    assert result["summary"]["edges_removed"] == 0
@@ -0,0 +1,45 @@
+from nuanced.lib import graph_stats
+
+graph = {
+    "app.a": { "filepath": "/app/a.py", "callees": ["app.b", "app.c", "<builtin>.len"] },
+    "app.b": { "filepath": "/app/a.py", "callees": ["app.c", "requests.get"] },
+    "app.c": { "filepath": "/app/c.py", "callees": ["app.a"] },
+    "lib.d": { "filepath": "/lib/d.py", "callees": ["app.c", "lib.d"] },
+}
+
+def test_compute_counts_nodes_and_edges() -> None:
+    stats = graph_stats.compute(graph)
+
+    assert stats["nodes"] == 4
+    assert stats["edges"] == 8
+    assert stats["internal_edges"] == 6
+    assert stats["builtin_edges"] == 1
+    assert stats["unresolved_edges"] == 1
+    assert stats["files"] == 3
+    assert stats["top_unresolved_callees"] == [{ "name": "requests.get", "count": 1 }]
+
+def test_compute_fan_in_and_fan_out() -> None:
+    stats = graph_stats.compute(graph, top=1)
+
+    assert stats["top_fan_in"] == [{ "name": "app.c", "fan_in": 3 }]
+    assert stats["top_fan_out"] == [{ "name": "app.a", "fan_out": 3 }]
+    assert stats["fan_in"] == { "min": 1, "max": 3, "mean": 1.5, "p50": 1, "p90": 3, "p99": 3 }
+
+def test_compute_largest_sccs_and_packages() -> None:
+    stats = graph_stats.compute(graph)
+
+    assert stats["cyclic_sccs"] == 1
+    assert stats["largest_sccs"] == [{ "size": 3, "nodes": ["app.a", "app.b", "app.c"] }]
+    assert stats["packages"] == { "app": 3, "lib": 1 }
+
+def test_strongly_connected_components_handles_deep_chains() -> None:
+    chain = { f"n{i}": { "filepath": "f.py", "callees": [f"n{i + 1}"] } for i in range(5000) }
+    chain["n5000"] = { "filepath": "f.py", "callees": ["n0"] }
+
+    components = graph_stats.strongly_connected_components(chain)
+
+    assert len(components) == 1
+    assert len(components[0]) == 5001
+
+def test_distribution_of_empty_values() -> None:
+    assert graph_stats.distribution([])["max"] == 0
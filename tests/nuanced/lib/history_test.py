@@ -0,0 +1,109 @@
+import json
+from nuanced.lib import history
+
+def graph_at(version: int) -> dict:
+    graphs = [
+        {
+            "foo": { "filepath": "foo.py", "callees": [] },
+            "foo.bar": { "filepath": "foo.py", "callees": ["foo.baz"], "lineno": 1, "importance": 0.5 },
+            "foo.baz": { "filepath": "foo.py", "callees": [], "lineno": 4, "importance": 0.5 },
+        },
+        {
+            "foo": { "filepath": "foo.py", "callees": [] },
+            "foo.bar": { "filepath": "foo.py", "callees": ["foo.baz", "foo.qux"], "lineno": 1, "importance": 0.3 },
+            "foo.qux": { "filepath": "foo.py", "callees": [], "lineno": 7, "importance": 0.7 },
+        },
+        {
+            "foo": { "filepath": "foo.py", "callees": [] },
+            "foo.bar": { "filepath": "foo.py", "callees": ["foo.qux", "foo.baz"], "lineno": 2 },
+            "foo.baz": { "filepath": "foo.py", "callees": [], "lineno": 9 },
+            "foo.qux": { "filepath": "foo.py", "callees": [], "lineno": 7 },
+        },
+    ]
+
+    return graphs[version]
+
+def test_diff_and_apply_round_trip() -> None:
+    for old_version, new_version in [(0, 1), (1, 2), (2, 0)]:
+        old_graph = history.stable(graph_at(old_version))
+        new_graph = history.stable(graph_at(new_version))
+
+        delta = history.diff(old_graph, new_graph)
+
+        assert history.apply(json.loads(json.dumps(old_graph)), delta) == new_graph
+
+def test_diff_records_edges_and_nodes() -> None:
+    delta = history.diff(history.stable(graph_at(0)), history.stable(graph_at(1)))
+
+    assert delta == {
+        "nodes_added": { "foo.qux": { "filepath": "foo.py", "callees": [], "lineno": 7 } },
+        "nodes_removed": ["foo.baz"],
+        "nodes_changed": {},
+        "edges_added": { "foo.bar": ["foo.qux"] },
+        "edges_removed": {},
+    }
+
+def test_record_stores_base_and_deltas_and_reconstructs_snapshots(tmp_path) -> None:
+    history_dirpath = str(tmp_path / "history")
+
+    for version, commit in enumerate(["a1", "b2", "c3"]):
+        history.record(history_dirpath, commit, graph_at(version))
+
+    index = history.load_index(history_dirpath)
+
+    assert [e["commit"] for e in index["entries"]] == ["a1", "b2", "c3"]
+    assert index["entries"][0]["delta"] is None
+    assert (tmp_path / "history" / "deltas" / "c3.json").exists()
+
+    for version, commit in enumerate(["a1", "b2", "c3"]):
+        assert history.snapshot(history_dirpath, commit) == history.stable(graph_at(version))
+
+def test_record_replaces_latest_commit_and_skips_older_commits(tmp_path) -> None:
+    history_dirpath = str(tmp_path / "history")
+    history.record(history_dirpath, "a1", graph_at(0))
+    history.record(history_dirpath, "b2", graph_at(1))
+
+    assert history.record(history_dirpath, "b2", graph_at(2))["commit"] == "b2"
+    assert history.record(history_dirpath, "a1", graph_at(2)) is None
+    assert history.snapshot(history_dirpath, "b2") == history.stable(graph_at(2))
+    assert history.snapshot(history_dirpath, "a1") == history.stable(graph_at(0))
+
+def test_snapshot_of_unrecorded_commit_returns_none(tmp_path) -> None:
+    history_dirpath = str(tmp_path / "history")
+    history.record(history_dirpath, "a1", graph_at(0))
+
+    assert history.snapshot(history_dirpath, "zz") is None
+
+def test_recorded_commit_returns_first_recorded_candidate() -> None:
+    index = { "entries": [{ "commit": "a1" }, { "commit": "b2" }] }
+
+    assert history.recorded_commit(index, ["c3", "b2", "a1"]) == "b2"
+    assert history.recorded_commit(index, ["c3"]) is None
+
+def test_record_stores_periodic_snapshots(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(history, "SNAPSHOT_INTERVAL", 2)
+    history_dirpath = str(tmp_path / "history")
+    commits = ["a1", "b2", "c3", "d4", "e5"]
+
+    for position, commit in enumerate(commits):
+        history.record(history_dirpath, commit, graph_at(position % 3))
+
+    entries = history.load_index(history_dirpath)["entries"]
+
+    assert [e.get("snapshot") for e in entries] == ["base.json", None, "snapshots/c3.json", None, "snapshots/e5.json"]
+
+    for position, commit in enumerate(commits):
+        assert history.snapshot(history_dirpath, commit) == history.stable(graph_at(position % 3))
+
+def test_snapshot_of_index_without_periodic_snapshots_replays_from_base(tmp_path) -> None:
+    history_dirpath = str(tmp_path / "history")
+
+    for version, commit in enumerate(["a1", "b2", "c3"]):
+        history.record(history_dirpath, commit, graph_at(version))
+
+    index = history.load_index(history_dirpath)
+
+    for entry in index["entries"]:
+        entry.pop("snapshot", None)
+
+    assert history.snapshot(history_dirpath, "c3", index=index) == history.stable(graph_at(2))
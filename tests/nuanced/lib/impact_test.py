@@ -0,0 +1,81 @@
+import pytest
+from nuanced.lib import impact
+
+def build_graph() -> dict:
+    return {
+        "app.core": { "filepath": "/repo/app/core.py", "callees": [], "lineno": 1, "end_lineno": 12 },
+        "app.core.helper": { "filepath": "/repo/app/core.py", "callees": [], "lineno": 3, "end_lineno": 4 },
+        "app.core.run": { "filepath": "/repo/app/core.py", "callees": ["app.core.helper"], "lineno": 6, "end_lineno": 8 },
+        "app.core.run.inner": { "filepath": "/repo/app/core.py", "callees": [], "lineno": 7, "end_lineno": 8 },
+        "app.core.other": { "filepath": "/repo/app/core.py", "callees": [], "lineno": 10, "end_lineno": 12 },
+        "tests.test_core": { "filepath": "/repo/tests/test_core.py", "callees": [], "lineno": 1, "end_lineno": 20 },
+        "tests.test_core.test_run": { "filepath": "/repo/tests/test_core.py", "callees": ["app.core.run"], "lineno": 3, "end_lineno": 4 },
+        "tests.test_core.TestOther.test_other": { "filepath": "/repo/tests/test_core.py", "callees": ["tests.test_core.TestOther.setup"], "lineno": 7, "end_lineno": 8 },
+        "tests.test_core.TestOther.setup": { "filepath": "/repo/tests/test_core.py", "callees": ["app.core.other"], "lineno": 10, "end_lineno": 11 },
+    }
+
+def test_parse_changes_with_unified_diff() -> None:
+    diff = "\n".join([
+        "diff --git a/app/core.py b/app/core.py",
+        "--- a/app/core.py",
+        "+++ b/app/core.py",
+        "@@ -3,3 +3,3 @@ def helper():",
+        " def helper():",
+        "-    return 1",
+        "+    return 2",
+        " ",
+        "@@ -20,2 +20,1 @@",
+        " x = 1",
+        "-y = 2",
+        "diff --git a/old.py b/old.py",
+        "--- a/old.py",
+        "+++ /dev/null",
+        "@@ -1 +0,0 @@",
+        "-z = 3",
+    ])
+
+    assert impact.parse_changes(diff) == { "app/core.py": [(3, 4), (20, 21)] }
+
+def test_parse_changes_with_line_ranges() -> None:
+    assert impact.parse_changes("app/core.py:4 app/core.py:7-8\nlib.py:9-2") == {
+        "app/core.py": [(4, 4), (7, 8)],
+        "lib.py": [(2, 9)],
+    }
+
+def test_parse_changes_with_invalid_entry_raises() -> None:
+    with pytest.raises(ValueError, match='Invalid change "core.py"'):
+        impact.parse_changes("core.py")
+
+def test_affected_tests_walks_callers_to_tests() -> None:
+    result = impact.affected_tests(build_graph(), { "app/core.py": [(4, 4)] }, root="/repo")
+
+    assert result["changed_functions"] == ["app.core.helper"]
+    assert result["tests"] == ["tests/test_core.py::test_run"]
+
+def test_affected_tests_maps_lines_to_innermost_function() -> None:
+    result = impact.affected_tests(build_graph(), { "app/core.py": [(8, 8)] }, root="/repo")
+
+    assert result["changed_functions"] == ["app.core.run.inner"]
+    assert result["tests"] == []
+
+def test_affected_tests_with_module_level_change_covers_whole_file() -> None:
+    result = impact.affected_tests(build_graph(), { "app/core.py": [(1, 1)] }, root="/repo")
+
+    assert result["tests"] == ["tests/test_core.py::TestOther::test_other", "tests/test_core.py::test_run"]
+
+def test_affected_tests_resolves_paths_relative_to_repository_root() -> None:
+    result = impact.affected_tests(
+        build_graph(),
+        { "services/api/app/core.py": [(11, 11)], "services/api/README.md": [(1, 1)], "services/api/setup.py": [(1, 1)] },
+        root="/repo",
+    )
+
+    assert result["tests"] == ["tests/test_core.py::TestOther::test_other"]
+    assert result["unmapped_files"] == ["services/api/setup.py"]
+
+def test_pytest_node_id_ignores_non_test_functions() -> None:
+    graph = build_graph()
+    module_names = { "/repo/app/core.py": "app.core", "/repo/tests/test_core.py": "tests.test_core" }
+
+    assert impact.pytest_node_id(graph, "tests.test_core.TestOther.setup", module_names, "/repo") is None
+    assert impact.pytest_node_id(graph, "app.core.run", module_names, "/repo") is None
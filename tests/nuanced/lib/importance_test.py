@@ -0,0 +1,36 @@
+import pytest
+from nuanced.lib import importance
+
+graph = {
+    "app.a": { "filepath": "/app/a.py", "callees": ["app.c", "<builtin>.len"] },
+    "app.b": { "filepath": "/app/a.py", "callees": ["app.c", "app.c"] },
+    "app.c": { "filepath": "/app/c.py", "callees": ["app.d"] },
+    "app.d": { "filepath": "/app/c.py", "callees": [] },
+    "app.e": { "filepath": "/app/e.py", "callees": ["app.a"] },
+}
+
+def test_pagerank_ranks_widely_called_functions_highest() -> None:
+    scores = importance.pagerank(graph)
+
+    assert sum(scores.values()) == pytest.approx(1.0)
+    assert max(scores, key=scores.get) == "app.d"
+    assert scores["app.c"] > scores["app.a"] > scores["app.e"]
+    assert scores["app.b"] == scores["app.e"]
+
+def test_pagerank_without_numpy_matches_numpy(monkeypatch) -> None:
+    pytest.importorskip("numpy")
+    expected = importance.pagerank(graph)
+    monkeypatch.setattr(importance, "numpy", None)
+
+    assert importance.pagerank(graph) == pytest.approx(expected)
+
+def test_pagerank_of_empty_graph() -> None:
+    assert importance.pagerank({}) == {}
+
+def test_annotate_stores_scores_on_nodes() -> None:
+    annotated_graph = { k: { **v } for k, v in graph.items() }
+
+    importance.annotate(annotated_graph)
+
+    assert importance.scores(annotated_graph) == importance.pagerank(graph)
+    assert all("importance" in v for v in annotated_graph.values())
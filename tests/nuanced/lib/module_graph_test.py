@@ -0,0 +1,42 @@
+from nuanced.lib import module_graph
+
+def build_graph() -> dict:
+    return {
+        "billing": { "filepath": "/repo/billing/__init__.py", "callees": [] },
+        "billing.api": { "filepath": "/repo/billing/api.py", "callees": [] },
+        "billing.api.charge": { "filepath": "/repo/billing/api.py", "callees": ["billing.api.validate", "ledger.post", "ledger.post", "<builtin>.len"] },
+        "billing.api.validate": { "filepath": "/repo/billing/api.py", "callees": ["ledger.balance"] },
+        "ledger": { "filepath": "/repo/ledger.py", "callees": [] },
+        "ledger.post": { "filepath": "/repo/ledger.py", "callees": [] },
+        "ledger.balance": { "filepath": "/repo/ledger.py", "callees": [] },
+    }
+
+def test_compute_rolls_up_calls_by_module_and_package() -> None:
+    result = module_graph.compute(build_graph(), root="/repo")
+
+    assert result["modules"]["billing.api"] == {
+        "filepath": "billing/api.py",
+        "package": "billing",
+        "functions": 3,
+        "internal_calls": 1,
+        "callees": { "ledger": 3 },
+        "callers": {},
+    }
+    assert result["modules"]["ledger"]["callers"] == { "billing.api": 3 }
+    assert result["packages"]["billing"]["modules"] == 2
+    assert result["packages"]["billing"]["callees"] == { "ledger": 3 }
+
+def test_dependencies_prefers_package_level() -> None:
+    result = module_graph.dependencies(module_graph.compute(build_graph()), "billing")
+
+    assert result["level"] == "package"
+    assert result["callees"] == [{ "name": "ledger", "calls": 3 }]
+
+def test_dependencies_with_module_level() -> None:
+    result = module_graph.dependencies(module_graph.compute(build_graph()), "billing", level="module")
+
+    assert result["level"] == "module"
+    assert result["callees"] == []
+
+def test_dependencies_with_unknown_name_returns_none() -> None:
+    assert module_graph.dependencies(module_graph.compute(build_graph()), "shipping") is None
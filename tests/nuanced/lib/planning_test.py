@@ -0,0 +1,63 @@
+from nuanced.lib import planning
+
+def write_packages(root) -> list[str]:
+    for package_name, file_count in [("small", 1), ("large", 4)]:
+        (root / package_name).mkdir()
+        (root / package_name / "__init__.py").write_text("")
+
+        for i in range(file_count):
+            (root / package_name / f"mod_{i}.py").write_text("def f():\n    return 1\n" * 50)
+
+    return sorted(str(p) for p in root.glob("**/*.py"))
+
+def test_plan_without_timings_schedules_largest_groups_first(tmp_path) -> None:
+    entry_points = write_packages(tmp_path)
+
+    plan = planning.plan(entry_points, root=str(tmp_path))
+
+    assert [g["dir_path"] for g in plan["groups"]] == ["large", "small"]
+    assert plan["groups"][0]["files"] == 5
+    assert plan["calibrated"] == False
+    assert plan["seconds_per_megabyte"] == planning.DEFAULT_SECONDS_PER_MEGABYTE
+    assert plan["workers"] == 1
+    assert plan["timeout_seconds"] == planning.MIN_TIMEOUT_SECONDS
+
+def test_plan_with_timings_calibrates_estimates(tmp_path, mocker) -> None:
+    mocker.patch("os.cpu_count", return_value=8)
+    entry_points = write_packages(tmp_path)
+    timings = { "large": 40.0, "small": 30.0 }
+
+    plan = planning.plan(entry_points, root=str(tmp_path), timings=timings)
+
+    assert plan["calibrated"] == True
+    assert [(g["dir_path"], g["estimated_seconds"]) for g in plan["groups"]] == [("large", 40.0), ("small", 30.0)]
+    assert plan["workers"] == 2
+    assert plan["estimated_seconds"] == 40.0
+    assert plan["timeout_seconds"] == 80
+
+def test_plan_with_partial_timings_uses_observed_rate(tmp_path) -> None:
+    entry_points = write_packages(tmp_path)
+
+    plan = planning.plan(entry_points, root=str(tmp_path), timings={ "large": 50.0 })
+    small = next(g for g in plan["groups"] if g["dir_path"] == "small")
+    large = next(g for g in plan["groups"] if g["dir_path"] == "large")
+
+    assert plan["calibrated"] == False
+    assert small["estimated_seconds"] == round(50.0 * small["bytes"] / large["bytes"], 3)
+
+def test_plan_respects_explicit_workers_and_timeout(tmp_path) -> None:
+    entry_points = write_packages(tmp_path)
+
+    plan = planning.plan(entry_points, root=str(tmp_path), workers=2, timeout_seconds=5)
+
+    assert plan["workers"] == 2
+    assert plan["timeout_seconds"] == 5
+    assert sorted(planning.worker_group_indices(plan)) == [[0], [1]]
+
+def test_assign_balances_estimated_seconds() -> None:
+    group_reports = [{ "estimated_seconds": s } for s in [8, 5, 4, 3]]
+
+    worker_seconds = planning.assign(group_reports, 2)
+
+    assert worker_seconds == [11, 9]
+    assert [g["worker"] for g in group_reports] == [0, 1, 1, 0]
@@ -0,0 +1,105 @@
+import json
+import os
+from nuanced.lib import call_graph, profiling
+from nuanced.lib.utils import WithTimeoutResult
+
+def write_package(package_path) -> None:
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+
+    for name in ["a", "b", "c", "d", "slow"]:
+        (package_path / f"{name}.py").write_text(f"def {name}():\n    return 1\n")
+
+def measure_slow_file(group, file_paths, root, timeout_seconds, max_chunk_files=None, precision="default"):
+    if any(p.endswith("slow.py") for p in file_paths):
+        return timeout_seconds, True
+
+    return 0.1 * len(file_paths), False
+
+def test_bisect_attributes_slowness_to_file(tmp_path, mocker) -> None:
+    package_path = tmp_path / "pkg"
+    write_package(package_path)
+    measure_spy = mocker.patch("nuanced.lib.profiling.measure", side_effect=measure_slow_file)
+    file_paths = sorted(str(p) for p in package_path.glob("*.py"))
+    group = call_graph.CallGraphGroup(call_graph.PACKAGE_GROUP, str(package_path), file_paths)
+
+    file_reports, probe_count = profiling.bisect(group, str(tmp_path), 5, 1.0)
+
+    assert { "filepath": "pkg/slow.py", "seconds": 5, "failed": True } in file_reports
+    assert all(str(package_path / "__init__.py") in c.args[1] for c in measure_spy.call_args_list)
+    assert probe_count == measure_spy.call_count
+
+def test_bisect_stops_after_max_probes(tmp_path, mocker) -> None:
+    package_path = tmp_path / "pkg"
+    write_package(package_path)
+    mocker.patch("nuanced.lib.profiling.measure", side_effect=measure_slow_file)
+    file_paths = sorted(str(p) for p in package_path.glob("*.py"))
+    group = call_graph.CallGraphGroup(call_graph.PACKAGE_GROUP, str(package_path), file_paths)
+
+    _file_reports, probe_count = profiling.bisect(group, str(tmp_path), 5, 1.0, max_probes=2)
+
+    assert probe_count == 2
+
+def test_profile_reports_over_budget_files(tmp_path, mocker) -> None:
+    package_path = tmp_path / "pkg"
+    write_package(package_path)
+    mocker.patch("nuanced.lib.profiling.measure", side_effect=measure_slow_file)
+    entry_points = sorted(str(p) for p in package_path.glob("*.py"))
+
+    report = profiling.profile(entry_points, package_path=str(package_path), timeout_seconds=5, file_budget_seconds=1.0)
+
+    assert report["groups"][0]["failed"] == True
+    assert [r["filepath"] for r in report["over_budget_files"]] == ["slow.py"]
+    assert report["slowest_files"][0]["filepath"] == "slow.py"
+
+def test_profile_measures_at_requested_precision(tmp_path, mocker) -> None:
+    package_path = tmp_path / "pkg"
+    write_package(package_path)
+    measure_spy = mocker.patch("nuanced.lib.profiling.measure", side_effect=measure_slow_file)
+    entry_points = sorted(str(p) for p in package_path.glob("*.py"))
+
+    report = profiling.profile(entry_points, package_path=str(package_path), timeout_seconds=5, file_budget_seconds=1.0, precision="coarse")
+
+    assert report["precision"] == "coarse"
+    assert measure_spy.call_count > 1
+    assert {c.args[5] for c in measure_spy.call_args_list} == {"coarse"}
+
+def test_measure_generates_group_at_precision(tmp_path, mocker) -> None:
+    with_timeout_spy = mocker.patch("nuanced.lib.profiling.with_timeout", return_value=WithTimeoutResult(errors=[], value=0.5))
+    file_paths = [str(tmp_path / "a.py")]
+    group = call_graph.CallGraphGroup(call_graph.MODULES_GROUP, str(tmp_path), file_paths)
+
+    seconds, failed = profiling.measure(group, file_paths, str(tmp_path), 30, precision="precise")
+
+    assert (seconds, failed) == (0.5, False)
+    assert with_timeout_spy.call_args.kwargs["kwargs"]["precision"] == "precise"
+
+def test_measure_times_group_generation(tmp_path) -> None:
+    package_path = tmp_path / "pkg"
+    write_package(package_path)
+    file_paths = [str(package_path / "__init__.py"), str(package_path / "a.py")]
+    group = call_graph.CallGraphGroup(call_graph.PACKAGE_GROUP, str(package_path), file_paths)
+
+    seconds, failed = profiling.measure(group, file_paths, str(tmp_path), 30)
+
+    assert failed == False
+    assert seconds >= 0
+
+def test_quarantine_is_invalidated_when_file_changes(tmp_path) -> None:
+    package_path = tmp_path / "pkg"
+    write_package(package_path)
+    quarantine_path = str(tmp_path / "quarantine.json")
+    report = { "over_budget_files": [{ "filepath": "slow.py", "seconds": 5, "failed": True }] }
+
+    quarantined = profiling.quarantine_files(quarantine_path, report, str(package_path))
+    quarantine = profiling.load_quarantine(quarantine_path)
+
+    assert quarantined == ["slow.py"]
+    assert profiling.quarantined_filepaths(quarantine, str(package_path)) == { str(package_path / "slow.py") }
+
+    (package_path / "slow.py").write_text("def slow():\n    return 2\n")
+
+    assert profiling.quarantined_filepaths(quarantine, str(package_path)) == set()
+
+def test_load_quarantine_without_file_returns_empty_quarantine(tmp_path) -> None:
+    assert profiling.load_quarantine(str(tmp_path / "missing.json")) == { "files": {} }
@@ -0,0 +1,66 @@
+from nuanced.lib import pruning
+from nuanced.lib.pruning import PruningPolicy
+
+graph = {
+    "app.a": { "filepath": "/repo/app/a.py", "callees": ["app.log", "<builtin>.len", "app.gen.pb_fn"] },
+    "app.b": { "filepath": "/repo/app/b.py", "callees": ["app.log"] },
+    "app.log": { "filepath": "/repo/app/log.py", "callees": ["app.format", "<builtin>.print"] },
+    "app.format": { "filepath": "/repo/app/log.py", "callees": [] },
+    "app.gen.pb_fn": { "filepath": "/repo/app/gen_pb2.py", "callees": [] },
+    "tests.test_a.test_a": { "filepath": "/repo/tests/test_a.py", "callees": ["app.a", "app.log"] },
+}
+
+def test_is_test_file() -> None:
+    assert pruning.is_test_file("tests/unit/helpers.py")
+    assert pruning.is_test_file("app/test_models.py")
+    assert pruning.is_test_file("app/models_test.py")
+    assert pruning.is_test_file("conftest.py")
+    assert not pruning.is_test_file("app/contest.py")
+
+def test_is_generated_file(tmp_path) -> None:
+    generated_path = tmp_path / "client.py"
+    generated_path.write_text("# Code generated by openapi-generator. DO NOT EDIT.\nx = 1\n")
+    handwritten_path = tmp_path / "models.py"
+    handwritten_path.write_text("x = 1\n")
+
+    assert pruning.is_generated_file(str(generated_path))
+    assert pruning.is_generated_file(str(tmp_path / "service_pb2.py"))
+    assert not pruning.is_generated_file(str(handwritten_path))
+
+def test_excluded_filepaths_uses_paths_relative_to_root() -> None:
+    filepaths = ["/home/tests/repo/app/a.py", "/home/tests/repo/tests/test_a.py"]
+    policy = PruningPolicy(exclude_tests=True)
+
+    excluded = pruning.excluded_filepaths(filepaths, policy, root="/home/tests/repo")
+
+    assert excluded == {"/home/tests/repo/tests/test_a.py"}
+
+def test_prune_drops_builtins_and_excluded_nodes() -> None:
+    policy = PruningPolicy(drop_builtins=True, exclude_tests=True, exclude_generated=True)
+    excluded = {"/repo/tests/test_a.py", "/repo/app/gen_pb2.py"}
+
+    pruned_graph, summary = pruning.prune(graph, policy, excluded=excluded)
+
+    assert set(pruned_graph.keys()) == {"app.a", "app.b", "app.log", "app.format"}
+    assert pruned_graph["app.a"]["callees"] == ["app.log"]
+    assert pruned_graph["app.log"]["callees"] == ["app.format"]
+    assert graph["app.a"]["callees"] == ["app.log", "<builtin>.len", "app.gen.pb_fn"]
+    assert summary["removed_nodes"] == 2
+    assert summary["removed_builtin_edges"] == 2
+    assert summary["removed_edges"] == 1
+    assert summary["drop_builtins"] == True
+
+def test_prune_collapses_hubs_above_fan_in_threshold() -> None:
+    policy = PruningPolicy(hub_fan_in_threshold=2)
+
+    pruned_graph, summary = pruning.prune(graph, policy)
+
+    assert pruned_graph["app.log"]["callees"] == []
+    assert pruned_graph["app.log"]["collapsed"] == True
+    assert "collapsed" not in pruned_graph["app.a"]
+    assert summary["collapsed_hubs"] == ["app.log"]
+
+def test_is_enabled_with_zero_hub_fan_in_threshold() -> None:
+    assert pruning.is_enabled(PruningPolicy(hub_fan_in_threshold=0)) == True
+    assert pruning.is_enabled(PruningPolicy()) == False
+    assert pruning.is_enabled(None) == False
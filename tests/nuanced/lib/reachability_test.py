@@ -0,0 +1,60 @@
+import pytest
+from nuanced.lib import reachability
+
+def build_graph() -> dict:
+    return {
+        "app": { "filepath": "/repo/app.py", "callees": ["app.setup"], "lineno": 1 },
+        "app.main": { "filepath": "/repo/app.py", "callees": ["app.run", "<builtin>.print"], "lineno": 3 },
+        "app.run": { "filepath": "/repo/app.py", "callees": ["app.run", "app.helper"], "lineno": 6 },
+        "app.helper": { "filepath": "/repo/app.py", "callees": [], "lineno": 9 },
+        "app.setup": { "filepath": "/repo/app.py", "callees": [], "lineno": 12 },
+        "app.dead": { "filepath": "/repo/app.py", "callees": ["app.helper"], "lineno": 15 },
+        "tests": { "filepath": "/repo/tests.py", "callees": [] },
+        "tests.test_setup": { "filepath": "/repo/tests.py", "callees": ["app.setup"], "lineno": 1 },
+    }
+
+def test_unreachable_lists_functions_not_reached_from_entry_points() -> None:
+    result = reachability.unreachable(build_graph(), ["app.main"], root="/repo")
+
+    assert result["entries"] == 1
+    assert result["functions"] == 6
+    assert result["reachable_functions"] == 3
+    assert [f["name"] for f in result["unreachable_functions"]] == ["app.setup", "app.dead", "tests.test_setup"]
+    assert result["unreachable_functions"][0] == { "name": "app.setup", "filepath": "app.py", "lineno": 12 }
+
+def test_unreachable_with_several_entry_patterns_and_filepath_globs() -> None:
+    result = reachability.unreachable(build_graph(), ["app.main", "tests*.py"], root="/repo")
+
+    assert [f["name"] for f in result["unreachable_functions"]] == ["app.dead"]
+
+def test_unreachable_with_module_entries() -> None:
+    result = reachability.unreachable(build_graph(), [], root="/repo", module_entries=True)
+
+    assert [f["name"] for f in result["unreachable_functions"]] == ["app.main", "app.run", "app.helper", "app.dead", "tests.test_setup"]
+
+def test_reachable_implementations_agree() -> None:
+    pytest.importorskip("numpy")
+    graph = build_graph()
+    indptr, indices = reachability.csr_adjacency(graph, list(graph))
+
+    for sources in ([], [1], [1, 5], [0, 6, 7]):
+        assert reachability._python_reachable(indptr, indices, sources) == reachability._numpy_reachable(indptr, indices, sources)
+
+def test_reachable_without_numpy_uses_python_traversal(monkeypatch, mocker) -> None:
+    graph = build_graph()
+    indptr, indices = reachability.csr_adjacency(graph, list(graph))
+    monkeypatch.setattr(reachability, "numpy", None)
+    python_reachable_spy = mocker.spy(reachability, "_python_reachable")
+
+    visited = reachability.reachable(indptr, indices, [1])
+
+    assert python_reachable_spy.call_count == 1
+    assert [k for k, v in zip(graph, visited) if v] == ["app.main", "app.run", "app.helper"]
+
+def test_csr_adjacency_with_reverse() -> None:
+    graph = build_graph()
+    node_keys = list(graph)
+    indptr, indices = reachability.csr_adjacency(graph, node_keys, reverse=True)
+    helper_id = node_keys.index("app.helper")
+
+    assert sorted(node_keys[i] for i in indices[indptr[helper_id]:indptr[helper_id + 1]]) == ["app.dead", "app.run"]
@@ -0,0 +1,53 @@
+import os
+from nuanced.lib.result_cache import ResultCache
+
+def test_put_and_get_round_trip(tmp_path) -> None:
+    result_cache = ResultCache(str(tmp_path / "cache"))
+    key = { "function_name": "bar", "include_builtins": False }
+
+    result_cache.put("v1", key, { "foo.bar": { "callees": [] } })
+
+    assert result_cache.get("v1", key) == { "foo.bar": { "callees": [] } }
+    assert result_cache.get("v1", { **key, "include_builtins": True }) is None
+    assert result_cache.get("v2", key) is None
+
+def test_put_removes_entries_for_other_graph_versions(tmp_path) -> None:
+    result_cache = ResultCache(str(tmp_path / "cache"))
+    key = { "function_name": "bar" }
+    result_cache.put("v1", key, 1)
+
+    result_cache.put("v2", key, 2)
+
+    assert os.listdir(tmp_path / "cache") == ["v2"]
+    assert result_cache.get("v1", key) is None
+
+def test_put_evicts_least_recently_used_entries(tmp_path) -> None:
+    result_cache = ResultCache(str(tmp_path / "cache"), max_entries=2)
+
+    for i in range(3):
+        result_cache.put("v1", { "i": i }, i)
+        entry_path = result_cache._entry_path("v1", { "i": i })
+        os.utime(entry_path, ns=(i * 10**9, i * 10**9))
+
+    result_cache.put("v1", { "i": 3 }, 3)
+
+    assert result_cache.get("v1", { "i": 0 }) is None
+    assert result_cache.get("v1", { "i": 1 }) is None
+    assert result_cache.get("v1", { "i": 2 }) == 2
+    assert result_cache.get("v1", { "i": 3 }) == 3
+
+def test_put_evicts_entries_above_max_bytes(tmp_path) -> None:
+    result_cache = ResultCache(str(tmp_path / "cache"), max_bytes=100)
+
+    result_cache.put("v1", { "i": 0 }, "x" * 80)
+    result_cache.put("v1", { "i": 1 }, "y" * 80)
+
+    assert len(os.listdir(tmp_path / "cache" / "v1")) == 1
+
+def test_clear_removes_cache_directory(tmp_path) -> None:
+    result_cache = ResultCache(str(tmp_path / "cache"))
+    result_cache.put("v1", { "i": 0 }, 0)
+
+    result_cache.clear()
+
+    assert not os.path.exists(tmp_path / "cache")
@@ -0,0 +1,53 @@
+import os
+import subprocess
+from nuanced.lib import git, revision
+
+def commit_all(repo_path) -> str:
+    git_command = ["git", "-C", str(repo_path), "-c", "user.name=nuanced", "-c", "user.email=nuanced@example.com"]
+    subprocess.run([*git_command, "add", "-A"], check=True, capture_output=True)
+    subprocess.run([*git_command, "commit", "-q", "-m", "commit"], check=True, capture_output=True)
+
+    return subprocess.run([*git_command, "rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+
+def test_materialize_writes_python_files_of_revision(tmp_path) -> None:
+    repo_path = tmp_path / "repo"
+    dest_path = tmp_path / "dest"
+    (repo_path / "pkg" / ".hidden").mkdir(parents=True)
+    subprocess.run(["git", "init", "-q", str(repo_path)], check=True)
+    (repo_path / "pkg" / "__init__.py").write_text("")
+    (repo_path / "pkg" / "mod.py").write_text("def f():\n    return 1\n")
+    (repo_path / "pkg" / "copy.py").write_text("def f():\n    return 1\n")
+    (repo_path / "pkg" / ".hidden" / "secret.py").write_text("")
+    (repo_path / "README.md").write_text("")
+    os.symlink("mod.py", repo_path / "pkg" / "link.py")
+    commit = commit_all(repo_path)
+    (repo_path / "pkg" / "mod.py").write_text("def f():\n    return 2\n")
+    (repo_path / "pkg" / "untracked.py").write_text("")
+
+    filepaths = revision.materialize(str(repo_path), commit, str(dest_path))
+
+    assert [os.path.relpath(p, dest_path) for p in filepaths] == ["pkg/__init__.py", "pkg/copy.py", "pkg/mod.py"]
+    assert (dest_path / "pkg" / "mod.py").read_text() == "def f():\n    return 1\n"
+
+def test_materialize_from_subdirectory_is_relative_to_it(tmp_path) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "service" / "app").mkdir(parents=True)
+    (tmp_path / "service" / "app" / "api.py").write_text("")
+    (tmp_path / "other.py").write_text("")
+    commit = commit_all(tmp_path)
+
+    filepaths = revision.materialize(str(tmp_path / "service"), commit, str(tmp_path / "dest"))
+
+    assert filepaths == [str(tmp_path / "dest" / "app" / "api.py")]
+
+def test_cat_file_streams_objects_in_order(tmp_path) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 2\n")
+    commit = commit_all(tmp_path)
+    entries = git.ls_tree(str(tmp_path), commit)
+
+    objects = list(git.cat_file(str(tmp_path), [e.object_id for e in entries]))
+
+    assert [e.path for e in entries] == ["a.py", "b.py"]
+    assert [data for _object_id, data in objects] == [b"a = 1\n", b"b = 2\n"]
@@ -0,0 +1,51 @@
+import os
+from nuanced.lib.source_reader import SourceReader
+
+def test_read_span_returns_exact_lines(tmp_path) -> None:
+    source_path = tmp_path / "mod.py"
+    source_path.write_text("import os\n\ndef foo():\n    return os.getcwd()\n\ndef bar():\n    pass")
+
+    with SourceReader() as source_reader:
+        assert source_reader.read_span(str(source_path), 3, 4) == "def foo():\n    return os.getcwd()"
+        assert source_reader.read_span(str(source_path), 6, 7) == "def bar():\n    pass"
+        assert source_reader.read_span(str(source_path), 6, 99) == "def bar():\n    pass"
+
+def test_read_spans_with_missing_file_or_lines_returns_none(tmp_path) -> None:
+    source_path = tmp_path / "mod.py"
+    source_path.write_text("def foo():\n    pass\n")
+
+    with SourceReader() as source_reader:
+        assert source_reader.read_spans(str(tmp_path / "missing.py"), [(1, 2)]) == [None]
+        assert source_reader.read_spans(str(source_path), [(None, None), (5, 6)]) == [None, None]
+
+def test_read_span_with_empty_file_returns_none(tmp_path) -> None:
+    source_path = tmp_path / "empty.py"
+    source_path.write_text("")
+
+    with SourceReader() as source_reader:
+        assert source_reader.read_span(str(source_path), 1, 1) is None
+
+def test_open_files_are_bounded(tmp_path) -> None:
+    source_paths = []
+
+    with SourceReader(max_open_files=2) as source_reader:
+        for i in range(3):
+            source_path = tmp_path / f"mod_{i}.py"
+            source_path.write_text(f"x = {i}\n")
+            source_paths.append(str(source_path))
+            source_reader.read_span(str(source_path), 1, 1)
+
+        assert list(source_reader._files.keys()) == source_paths[1:]
+
+    assert len(source_reader._files) == 0
+
+def test_read_span_reflects_rewritten_file(tmp_path) -> None:
+    source_path = tmp_path / "mod.py"
+    source_path.write_text("x = 1\n")
+
+    with SourceReader() as source_reader:
+        source_reader.read_span(str(source_path), 1, 1)
+        source_path.write_text("x = 22\n")
+        os.utime(source_path, ns=(0, 0))
+
+        assert source_reader.read_span(str(source_path), 1, 1) == "x = 22"
@@ -0,0 +1,103 @@
+import json
+import time
+from nuanced.lib.symbol_index import SymbolIndex, EXACT_MATCH_SCORE, NAME_MATCH_SCORE
+
+graph = {
+    "app.billing.invoices": { "filepath": "/app/billing/invoices.py", "callees": [], "lineno": 1, "end_lineno": 20 },
+    "app.billing.invoices.create_invoice": { "filepath": "/app/billing/invoices.py", "callees": [], "lineno": 3, "end_lineno": 8 },
+    "app.billing.invoices.InvoiceBuilder.build": { "filepath": "/app/billing/invoices.py", "callees": [], "lineno": 12, "end_lineno": 20 },
+    "app.users.create": { "filepath": "/app/users.py", "callees": [], "lineno": 1, "end_lineno": 4 },
+    "app.users.create_user": { "filepath": "/app/users.py", "callees": [], "lineno": 6, "end_lineno": 9 },
+}
+
+def test_search_exact_name_ranks_first() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    matches = symbol_index.search("app.users.create")
+
+    assert matches[0].name == "app.users.create"
+    assert matches[0].score == EXACT_MATCH_SCORE
+
+def test_search_by_function_name_matches_any_file() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    matches = symbol_index.search("create_invoice")
+
+    assert matches[0].name == "app.billing.invoices.create_invoice"
+    assert matches[0].score == NAME_MATCH_SCORE
+    assert matches[0].filepath == "/app/billing/invoices.py"
+    assert matches[0].lineno == 3
+    assert matches[0].end_lineno == 8
+
+def test_search_by_prefix() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    names = [m.name for m in symbol_index.search("app.billing", limit=10)]
+
+    assert set(names) == {
+        "app.billing.invoices",
+        "app.billing.invoices.create_invoice",
+        "app.billing.invoices.InvoiceBuilder.build",
+    }
+
+def test_search_by_suffix() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    names = [m.name for m in symbol_index.search("Builder.build")]
+
+    assert names == ["app.billing.invoices.InvoiceBuilder.build"]
+
+def test_search_is_case_insensitive_and_fuzzy() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    names = [m.name for m in symbol_index.search("CreateInvoices")]
+
+    assert names[0] == "app.billing.invoices.create_invoice"
+
+def test_search_respects_limit() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    matches = symbol_index.search("create", limit=2)
+
+    assert [m.name for m in matches] == ["app.users.create", "app.users.create_user"]
+
+def test_search_without_matches_returns_empty_list() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    assert symbol_index.search("zzz") == []
+
+def test_to_dict_round_trips_through_json() -> None:
+    symbol_index = SymbolIndex.build(graph)
+
+    loaded = SymbolIndex.from_dict(json.loads(json.dumps(symbol_index.to_dict())))
+
+    assert loaded.search("create_invoice") == symbol_index.search("create_invoice")
+
+def test_search_does_not_look_up_trigrams_when_prefix_matches_fill_the_limit(mocker) -> None:
+    symbol_index = SymbolIndex.build(graph)
+    postings_spy = mocker.spy(symbol_index, "_postings")
+
+    matches = symbol_index.search("app.billing", limit=2)
+
+    assert len(matches) == 2
+    assert postings_spy.call_count == 0
+
+def test_search_time_does_not_grow_with_names_sharing_only_common_trigrams() -> None:
+    def best_search_seconds(symbol_index: SymbolIndex) -> float:
+        symbol_index.search("create_invoice")
+        seconds = []
+
+        for _ in range(5):
+            started_at = time.perf_counter()
+            symbol_index.search("create_invoice")
+            seconds.append(time.perf_counter() - started_at)
+
+        return min(seconds)
+
+    invoices = { f"app.billing{i}.create_invoice_{i}": { "filepath": "/app.py", "callees": [] } for i in range(1000) }
+    slices = { f"app.media{i}.slice_{i}": { "filepath": "/app.py", "callees": [] } for i in range(200_000) }
+    small_index = SymbolIndex.build(invoices)
+    large_index = SymbolIndex.build({ **invoices, **slices })
+
+    assert large_index.search("create_invoice") == small_index.search("create_invoice")
+    assert best_search_seconds(large_index) < 3 * best_search_seconds(small_index)
@@ -0,0 +1,95 @@
+import os
+from collections import Counter
+from nuanced.lib import tracer
+
+TESTS_DIRPATH = os.path.dirname(os.path.abspath(__file__))
+
+def callee() -> int:
+    return 1
+
+def caller() -> int:
+    return callee() + callee()
+
+def test_call_tracer_records_calls_within_root() -> None:
+    call_tracer = tracer.CallTracer(TESTS_DIRPATH)
+
+    with call_tracer:
+        caller()
+
+    calls = {(a[2], b[2]): c for (a, b), c in call_tracer.calls.items()}
+    assert calls[("caller", "callee")] == 2
+    assert ("test_call_tracer_records_calls_within_root", "caller") in calls
+    assert all(a[0] == __file__ and b[0] == __file__ for a, b in call_tracer.calls)
+
+def test_call_tracer_ignores_calls_outside_root(tmp_path) -> None:
+    call_tracer = tracer.CallTracer(str(tmp_path))
+
+    with call_tracer:
+        caller()
+
+    assert call_tracer.calls == Counter()
+
+def test_call_tracers_run_back_to_back_record_the_same_calls(tmp_path) -> None:
+    tracer_outside_root = tracer.CallTracer(str(tmp_path))
+    first_tracer = tracer.CallTracer(TESTS_DIRPATH)
+    second_tracer = tracer.CallTracer(TESTS_DIRPATH)
+
+    for call_tracer in [tracer_outside_root, first_tracer, second_tracer]:
+        with call_tracer:
+            caller()
+
+    assert tracer_outside_root.calls == Counter()
+    assert len(first_tracer.calls) > 0
+    assert {(a[2], b[2]) for a, b in second_tracer.calls} == {(a[2], b[2]) for a, b in first_tracer.calls}
+
+def test_call_tracer_drops_calls_above_max_edges() -> None:
+    call_tracer = tracer.CallTracer(TESTS_DIRPATH, max_edges=1)
+
+    with call_tracer:
+        caller()
+
+    assert len(call_tracer.calls) == 1
+    assert call_tracer.dropped_calls > 0
+
+def test_run_returns_exit_code_of_script(tmp_path) -> None:
+    script_path = tmp_path / "script.py"
+    script_path.write_text("import sys\n\ndef main():\n    sys.exit(3)\n\nmain()\n")
+    call_tracer = tracer.CallTracer(str(tmp_path))
+
+    exit_code = tracer.run([str(script_path)], call_tracer)
+
+    assert exit_code == 3
+    assert list(call_tracer.calls) == [((str(script_path), 1, "<module>"), (str(script_path), 3, "main"))]
+
+def test_resolve_maps_code_to_nodes_by_qualified_name_and_span() -> None:
+    graph = {
+        "app.plugins": { "filepath": "/app/plugins.py", "callees": [], "lineno": 1, "end_lineno": 20 },
+        "app.plugins.Registry.dispatch": { "filepath": "/app/plugins.py", "callees": [], "lineno": 5, "end_lineno": 7 },
+        "app.plugins.hello": { "filepath": "/app/plugins.py", "callees": [], "lineno": 10, "end_lineno": 12 },
+    }
+    calls = Counter({
+        (("/app/plugins.py", 5, "Registry.dispatch"), ("/app/plugins.py", 9, "hello")): 2,
+        (("/app/plugins.py", 1, "<module>"), ("/app/plugins.py", 5, "Registry.dispatch")): 1,
+        (("/app/plugins.py", 10, "hello"), ("/other.py", 1, "unknown")): 1,
+    })
+
+    edges = tracer.resolve(graph, calls)
+
+    assert edges == Counter({
+        ("app.plugins.Registry.dispatch", "app.plugins.hello"): 2,
+        ("app.plugins", "app.plugins.Registry.dispatch"): 1,
+    })
+
+def test_merge_adds_callees_and_records_provenance() -> None:
+    graph = {
+        "app.dispatch": { "filepath": "/app.py", "callees": ["app.helper"] },
+        "app.hello": { "filepath": "/app.py", "callees": [] },
+        "app.helper": { "filepath": "/app.py", "callees": [] },
+    }
+
+    summary = tracer.merge(graph, Counter({ ("app.dispatch", "app.hello"): 1, ("app.dispatch", "app.helper"): 1 }))
+
+    assert summary == { "traced_edges": 2, "new_edges": 1 }
+    assert graph["app.dispatch"]["callees"] == ["app.helper", "app.hello"]
+    assert graph["app.dispatch"]["runtime_callees"] == ["app.hello", "app.helper"]
+    assert "runtime_callees" not in graph["app.hello"]
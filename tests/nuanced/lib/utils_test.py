@@ -1,5 +1,8 @@
+import multiprocessing
+import os
 import pytest
-from nuanced.lib.utils import grouped_by_package, grouped_by_directory
+import time
+from nuanced.lib.utils import WithTimeoutResult, grouped_by_package, grouped_by_directory, with_timeout, with_timeouts
 from deepdiff import DeepDiff
 
 def test_grouped_by_package() -> None:
@@ -64,3 +67,115 @@ def test_grouped_by_directory() -> None:
 
     diff = DeepDiff(expected, groups, ignore_order=True)
     assert diff == {}
+
+def allocate(size, **kwargs):
+    return len(bytearray(size))
+
+def exit_abruptly(args, **kwargs):
+    os._exit(3)
+
+def raise_memory_error(args, **kwargs):
+    raise MemoryError("Cannot allocate memory")
+
+def test_with_timeout_returns_value() -> None:
+    result = with_timeout(target=allocate, args=(16), kwargs={}, timeout=10)
+
+    assert result.errors == []
+    assert result.value == 16
+
+def test_with_timeout_with_memory_limit_returns_memory_error() -> None:
+    memory_limit_bytes = 512 * 1024 * 1024
+
+    result = with_timeout(
+        target=allocate,
+        args=(2 * memory_limit_bytes),
+        kwargs={},
+        timeout=10,
+        memory_limit_bytes=memory_limit_bytes,
+    )
+
+    assert result.value is None
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == MemoryError
+    assert str(result.errors[0]) == "Operation exceeded memory limit of 512 MB"
+
+def test_with_timeout_without_memory_limit_returns_original_memory_error() -> None:
+    result = with_timeout(target=raise_memory_error, args=(), kwargs={}, timeout=10)
+
+    assert result.value is None
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == MemoryError
+    assert str(result.errors[0]) == "Cannot allocate memory"
+
+def test_with_timeout_when_process_exits_returns_error_without_waiting() -> None:
+    started_at = time.monotonic()
+
+    result = with_timeout(target=exit_abruptly, args=(), kwargs={}, timeout=30)
+
+    assert time.monotonic() - started_at < 10
+    assert len(result.errors) == 1
+    assert type(result.errors[0]) == ChildProcessError
+
+def sleep_then_return(seconds, **kwargs):
+    time.sleep(seconds)
+    return seconds
+
+def test_with_timeouts_runs_calls_concurrently_and_returns_results_in_order() -> None:
+    started_at = time.monotonic()
+
+    results = with_timeouts([(sleep_then_return, 1, {}, None), (sleep_then_return, 0.5, {}, None), (exit_abruptly, (), {}, None)], timeout=30)
+
+    assert time.monotonic() - started_at < 1.9
+    assert [r.value for r in results] == [1, 0.5, None]
+    assert type(results[2].errors[0]) == ChildProcessError
+
+def test_with_timeouts_times_out_only_unfinished_calls() -> None:
+    results = with_timeouts([(sleep_then_return, 0, {}, None), (sleep_then_return, 30, {}, None)], timeout=1)
+
+    assert results[0] == WithTimeoutResult(errors=[], value=0)
+    assert type(results[1].errors[0]) == multiprocessing.TimeoutError
+
+def count_with_progress(count, progress=None, **kwargs):
+    for i in range(count):
+        progress(i)
+
+    return count
+
+def report_pid_then_sleep(seconds, progress=None, **kwargs):
+    progress(os.getpid())
+    time.sleep(seconds)
+
+def test_with_timeout_when_progress_callback_raises_stops_process() -> None:
+    pids = []
+
+    def fail(pid):
+        pids.append(pid)
+        raise ValueError("callback failed")
+
+    with pytest.raises(ValueError):
+        with_timeout(target=report_pid_then_sleep, args=(30), kwargs={}, timeout=60, progress=fail)
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(pids[0], 0)
+
+def test_with_timeout_forwards_progress_events() -> None:
+    events = []
+
+    result = with_timeout(target=count_with_progress, args=(3), kwargs={}, timeout=10, progress=events.append)
+
+    assert result.errors == []
+    assert result.value == 3
+    assert events == [0, 1, 2]
+
+def test_with_timeout_aborts_when_progress_returns_false() -> None:
+    events = []
+
+    def abort_after_first_event(event):
+        events.append(event)
+        return False
+
+    result = with_timeout(target=count_with_progress, args=(3), kwargs={}, timeout=10, progress=abort_after_first_event)
+
+    assert result.value is None
+    assert events == [0]
+    assert type(result.errors[0]) == InterruptedError
@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+import pytest
+import time
+from nuanced import CodeGraph
+from nuanced.lib.utils import with_timeout
+from nuanced.lib.worker_pool import WorkerPool
+
+def worker_pid(_args) -> int:
+    return os.getpid()
+
+def count_with_progress(count, progress=None):
+    for i in range(count):
+        progress(i)
+
+    return count
+
+def exit_abruptly(_args):
+    os._exit(3)
+
+def report_pid_then_sleep(seconds, progress=None):
+    progress(os.getpid())
+    time.sleep(seconds)
+
+def raise_memory_error(_args):
+    raise MemoryError("Cannot allocate memory")
+
+@pytest.fixture
+def pool():
+    with WorkerPool(max_tasks_per_worker=3, preload=[]) as worker_pool:
+        yield worker_pool
+
+def test_run_reuses_worker(pool) -> None:
+    pids = [pool.run(worker_pid, (), {}, timeout=30).value for _ in range(3)]
+
+    assert len(set(pids)) == 1
+    assert pids[0] != os.getpid()
+
+def test_run_replaces_worker_after_max_tasks(pool) -> None:
+    pids = [pool.run(worker_pid, (), {}, timeout=30).value for _ in range(4)]
+
+    assert pids[0] == pids[2]
+    assert pids[3] != pids[2]
+
+def test_run_with_timeout_kills_worker(pool) -> None:
+    pid = pool.run(worker_pid, (), {}, timeout=30).value
+    started_at = time.monotonic()
+
+    result = pool.run(time.sleep, 10, {}, timeout=0.5)
+
+    assert time.monotonic() - started_at < 5
+    assert type(result.errors[0]) == multiprocessing.TimeoutError
+    assert pool.run(worker_pid, (), {}, timeout=30).value != pid
+
+def test_run_when_worker_exits_returns_error(pool) -> None:
+    result = pool.run(exit_abruptly, (), {}, timeout=30)
+
+    assert type(result.errors[0]) == ChildProcessError
+    assert pool.run(worker_pid, (), {}, timeout=30).errors == []
+
+def test_run_without_memory_limit_returns_original_memory_error(pool) -> None:
+    result = pool.run(raise_memory_error, (), {}, timeout=30)
+
+    assert type(result.errors[0]) == MemoryError
+    assert str(result.errors[0]) == "Cannot allocate memory"
+
+def test_run_forwards_progress_and_aborts(pool) -> None:
+    events = []
+
+    result = pool.run(count_with_progress, 3, {}, timeout=30, progress=events.append)
+    aborted_result = pool.run(count_with_progress, 3, {}, timeout=30, progress=lambda _event: False)
+
+    assert result.value == 3
+    assert events == [0, 1, 2]
+    assert type(aborted_result.errors[0]) == InterruptedError
+
+def test_run_when_progress_callback_raises_stops_worker(pool) -> None:
+    pids = []
+
+    def fail(pid):
+        pids.append(pid)
+        raise ValueError("callback failed")
+
+    with pytest.raises(ValueError):
+        pool.run(report_pid_then_sleep, 30, {}, timeout=60, progress=fail)
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(pids[0], 0)
+
+    assert pool.run(worker_pid, (), {}, timeout=30).value != pids[0]
+
+def test_with_timeout_runs_in_pool(pool) -> None:
+    pid = pool.run(worker_pid, (), {}, timeout=30).value
+
+    assert with_timeout(target=worker_pid, args=(), kwargs={}, timeout=30, pool=pool).value == pid
+
+def test_run_after_close_raises() -> None:
+    pool = WorkerPool(preload=[])
+    pool.close()
+
+    with pytest.raises(RuntimeError):
+        pool.run(worker_pid, (), {}, timeout=30)
+
+def test_init_with_worker_pool_matches_init_without(tmp_path) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "mod.py").write_text("def f():\n    return g()\n\ndef g():\n    return len([])\n")
+    graph = CodeGraph.init(str(tmp_path)).code_graph.graph
+
+    with WorkerPool() as worker_pool:
+        results = [CodeGraph.init(str(tmp_path), worker_pool=worker_pool) for _ in range(2)]
+
+    for result in results:
+        assert result.errors == []
+        assert { k: sorted(v["callees"]) for k, v in result.code_graph.graph.items() } == { k: sorted(v["callees"]) for k, v in graph.items() }